@@ -1,6 +1,7 @@
 # pylint: disable=no-member
 import datetime
 
+from django.conf import settings
 from django.db.models import (
     CASCADE,
     SET_NULL,
@@ -10,6 +11,7 @@ from django.db.models import (
     Q,
     TextField,
 )
+from django.http import HttpResponsePermanentRedirect
 from django.template.loader import render_to_string
 
 import readtime
@@ -31,14 +33,23 @@ from wagtail.core.models import Orderable
 from wagtail.images.edit_handlers import ImageChooserPanel
 
 from ..common.blocks import ExternalAuthorBlock, ExternalLinkBlock
+from ..common.cache_policy import LONG_LIVED_POLICY
 from ..common.constants import (
+    PAGINATION_CURSOR_QUERYSTRING_KEY,
     PAGINATION_QUERYSTRING_KEY,
     RICH_TEXT_FEATURES_SIMPLE,
     TOPIC_QUERYSTRING_KEY,
 )
 from ..common.fields import CustomStreamField
 from ..common.models import BasePage
-from ..common.utils import get_combined_articles_and_videos, paginate_resources
+from ..common.utils import (
+    get_combined_articles_and_videos,
+    get_keyset_redirect_url,
+    get_resource_cards,
+    get_topic_pks,
+    paginate_resources,
+    use_resource_cards,
+)
 
 
 class ArticlesTag(TaggedItemBase):
@@ -111,25 +122,48 @@ class Articles(BasePage):
         # Allow only one instance of this page type
         return super().can_create_at(parent) and not cls.objects.exists()
 
+    def serve(self, request, *args, **kwargs):
+        if settings.KEYSET_PAGINATION:
+            redirect_url = get_keyset_redirect_url(
+                request,
+                self.get_unpaginated_resources(request),
+                per_page=self.RESOURCES_PER_PAGE,
+            )
+            if redirect_url:
+                return HttpResponsePermanentRedirect(redirect_url)
+        return super().serve(request, *args, **kwargs)
+
     def get_context(self, request):
         context = super().get_context(request)
         context["filters"] = self.get_filters()
         context["resources"] = self.get_resources(request)
         return context
 
-    def get_resources(self, request):
+    def get_unpaginated_resources(self, request):
         # This Page class will show both Articles/Posts and Videos in its listing
 
         # We can't use __in in this deeply related query, so we have to make
         # a custom Q object instead and pass is in as a filter, then deal with
         # it later
         topics = request.GET.getlist(TOPIC_QUERYSTRING_KEY)
-        topics_q = Q(topics__topic__slug__in=topics) if topics else Q()
-        resources = get_combined_articles_and_videos(self, q_object=topics_q)
+        if use_resource_cards():
+            resources = get_resource_cards(
+                self, ["article", "video"], topic_pks=get_topic_pks(topics)
+            )
+        else:
+            topics_q = Q(topics__topic__slug__in=topics) if topics else Q()
+            resources = get_combined_articles_and_videos(
+                self, q_object=topics_q, as_union=True
+            )
+        return resources
+
+    def get_resources(self, request):
         resources = paginate_resources(
-            resources,
+            self.get_unpaginated_resources(request),
             page_ref=request.GET.get(PAGINATION_QUERYSTRING_KEY),
             per_page=self.RESOURCES_PER_PAGE,
+            cursor=request.GET.get(PAGINATION_CURSOR_QUERYSTRING_KEY),
+            keyset=settings.KEYSET_PAGINATION,
         )
 
         return resources
@@ -160,6 +194,7 @@ class Article(BasePage):
     parent_page_types = ["Articles"]
     subpage_types = []
     template = "article.html"
+    cache_policy = LONG_LIVED_POLICY
 
     class Meta:
         verbose_name = "post"  # NB
@@ -333,6 +368,8 @@ class Article(BasePage):
         """Returns resources that are related to the current resource, i.e.
         live, public Articles and Videos which have the same Topics."""
         topic_pks = [topic.topic.pk for topic in self.topics.all()]
+        if use_resource_cards():
+            return get_resource_cards(self, ["article", "video"], topic_pks=topic_pks)
         return get_combined_articles_and_videos(self, topics__topic__pk__in=topic_pks)
 
     @property
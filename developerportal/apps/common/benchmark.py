@@ -0,0 +1,277 @@
+"""Seed a synthetic page tree and measure what it costs to render public pages.
+
+Used by the `benchmark` management command, which runs all of this in a
+throwaway test database.
+"""
+
+import datetime
+import json
+import logging
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from wagtail.core.models import Page
+
+from ..articles.models import Article, Articles, ArticleTopic
+from ..events.models import Event, Events, EventTopic
+from ..externalcontent.models import (
+    ExternalArticle,
+    ExternalArticleTopic,
+    ExternalEvent,
+    ExternalEventTopic,
+    ExternalVideo,
+    ExternalVideoTopic,
+)
+from ..home.models import HomePage
+from ..people.models import People, Person, PersonTopic
+from ..topics.models import ParentTopic, Topic, Topics
+from ..videos.models import Video, Videos, VideoTopic
+from .constants import (
+    COUNTRY_QUERYSTRING_KEY,
+    DATE_PARAMS_QUERYSTRING_KEY,
+    TOPIC_QUERYSTRING_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = {
+    "articles": 5000,
+    "videos": 2000,
+    "events": 1000,
+    "people": 500,
+    "topics": 50,
+    "external_articles": 1000,
+    "external_videos": 500,
+    "external_events": 200,
+}
+
+COUNTRIES = ["DE", "FR", "GB", "IN", "JP", "US", "ZA"]
+
+
+class TreeSeeder:
+    """Builds a tree of published pages under the default HomePage, with
+    authors, speakers and topics picked at random from a fixed seed, so that
+    repeated runs produce the same tree."""
+
+    def __init__(self, sizes, seed=0):
+        self.sizes = sizes
+        self.random = random.Random(seed)
+        self.today = datetime.date.today()
+
+    def seed(self):
+        home = HomePage.objects.first()
+        self.root = Page.objects.get(depth=1)
+
+        self.topics = self.seed_topics(self._add_index(home, Topics, "topics"))
+        self.people = self.seed_people(self._add_index(home, People, "people"))
+        self.seed_articles(self._add_index(home, Articles, "posts"))
+        self.seed_videos(self._add_index(home, Videos, "videos"))
+        self.seed_events(self._add_index(home, Events, "events"))
+        self.seed_external_content()
+
+    def _add_index(self, home, model, slug):
+        return home.add_child(instance=model(title=slug.title(), slug=slug))
+
+    def _log(self, name):
+        logger.info(f"Seeding {self.sizes[name]} {name}")
+
+    def _date(self, days_before=365 * 5, days_after=0):
+        offset = self.random.randint(-days_before, days_after)
+        return self.today + datetime.timedelta(days=offset)
+
+    def _topics(self, through_model, maximum=3):
+        count = self.random.randint(1, maximum)
+        topics = self.random.sample(self.topics, min(count, len(self.topics)))
+        return [through_model(topic=topic) for topic in topics]
+
+    def _credits(self, block_type, maximum=3):
+        count = self.random.randint(0, maximum)
+        people = self.random.sample(self.people, min(count, len(self.people)))
+        return json.dumps([{"type": block_type, "value": p.pk} for p in people])
+
+    def seed_topics(self, topics_page):
+        self._log("topics")
+        topics = []
+        for i in range(self.sizes["topics"]):
+            topics.append(
+                topics_page.add_child(
+                    instance=Topic(title=f"Topic {i}", slug=f"topic-{i}")
+                )
+            )
+        # The first few topics are parents to all of the others
+        parents = topics[: max(1, len(topics) // 10)]
+        for topic in topics:
+            if topic not in parents:
+                ParentTopic(child=topic, parent=self.random.choice(parents)).save()
+        return topics
+
+    def seed_people(self, people_page):
+        self._log("people")
+        return [
+            people_page.add_child(
+                instance=Person(
+                    title=f"Person {i}",
+                    slug=f"person-{i}",
+                    job_title="Developer",
+                    country=self.random.choice(COUNTRIES),
+                    topics=self._topics(PersonTopic),
+                )
+            )
+            for i in range(self.sizes["people"])
+        ]
+
+    def seed_articles(self, articles_page):
+        self._log("articles")
+        for i in range(self.sizes["articles"]):
+            articles_page.add_child(
+                instance=Article(
+                    title=f"Article {i}",
+                    slug=f"article-{i}",
+                    date=self._date(),
+                    description=f"Description of article {i}",
+                    authors=self._credits("author"),
+                    topics=self._topics(ArticleTopic),
+                )
+            )
+
+    def seed_videos(self, videos_page):
+        self._log("videos")
+        for i in range(self.sizes["videos"]):
+            videos_page.add_child(
+                instance=Video(
+                    title=f"Video {i}",
+                    slug=f"video-{i}",
+                    date=self._date(),
+                    video_url=json.dumps(
+                        [{"type": "embed", "value": f"https://example.com/v/{i}"}]
+                    ),
+                    speakers=self._credits("speaker"),
+                    topics=self._topics(VideoTopic),
+                )
+            )
+
+    def seed_events(self, events_page):
+        self._log("events")
+        for i in range(self.sizes["events"]):
+            events_page.add_child(
+                instance=Event(
+                    title=f"Event {i}",
+                    slug=f"event-{i}",
+                    start_date=self._date(days_before=365 * 2, days_after=365),
+                    country=self.random.choice(COUNTRIES),
+                    speakers=self._credits("speaker"),
+                    topics=self._topics(EventTopic),
+                )
+            )
+
+    def seed_external_content(self):
+        # Like ingested content, these live under the root page
+        for name, model, through_model, date_field in (
+            ("external_articles", ExternalArticle, ExternalArticleTopic, "date"),
+            ("external_videos", ExternalVideo, ExternalVideoTopic, "date"),
+            ("external_events", ExternalEvent, ExternalEventTopic, "start_date"),
+        ):
+            self._log(name)
+            for i in range(self.sizes[name]):
+                slug = f"{name.replace('_', '-')}-{i}"
+                self.root.add_child(
+                    instance=model(
+                        title=f"{model._meta.verbose_name} {i}",
+                        slug=slug,
+                        external_url=f"https://example.com/{slug}",
+                        topics=self._topics(through_model),
+                        **{date_field: self._date()},
+                    )
+                )
+
+
+def get_benchmark_urls():
+    """Return a dict of benchmark name: URL for the seeded tree"""
+    events = Events.published_objects.first()
+    # The Person credited on the most pages
+    person = (
+        Person.published_objects.annotate(credits=Count("contributions"))
+        .order_by("-credits")
+        .first()
+    )
+    # A parent topic, if there are any, as they list their children's resources
+    topic = (
+        Topic.published_objects.filter(child_topics__isnull=False).first()
+        or Topic.published_objects.first()
+    )
+    next_month = datetime.date.today() + datetime.timedelta(days=31)
+    events_filters = (
+        f"?{COUNTRY_QUERYSTRING_KEY}={COUNTRIES[0]}"
+        f"&{DATE_PARAMS_QUERYSTRING_KEY}={next_month:%Y-%m}"
+        f"&{TOPIC_QUERYSTRING_KEY}={topic.slug}"
+    )
+    return {
+        "home": HomePage.objects.first().url,
+        "articles": Articles.published_objects.first().url,
+        "articles_page_20": Articles.published_objects.first().url + "?page=20",
+        "topic": topic.url,
+        "person": person.url,
+        "people": People.published_objects.first().url,
+        "events": events.url,
+        "events_filtered": events.url + events_filters,
+        "rss_feed": "/posts-feed/",
+        "sitemap": "/sitemap.xml",
+    }
+
+
+def measure(client, url, repeat=3):
+    """Request the URL with an empty cache, then `repeat` more times, and return
+    the timings, query counts and peak memory use"""
+    cache.clear()
+    cold = _request(client, url)
+    warm = [_request(client, url) for _ in range(repeat)]
+
+    tracemalloc.start()
+    try:
+        client.get(url, follow=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "url": url,
+        "status_code": cold["status_code"],
+        "cold_ms": cold["ms"],
+        "cold_queries": cold["queries"],
+        "warm_ms_median": round(statistics.median(r["ms"] for r in warm), 2),
+        "warm_ms_min": min(r["ms"] for r in warm),
+        "warm_queries": warm[-1]["queries"],
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def _request(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url, follow=True)
+        elapsed = time.perf_counter() - start
+    return {
+        "status_code": response.status_code,
+        "ms": round(elapsed * 1000, 2),
+        "queries": len(queries),
+    }
+
+
+def run_benchmarks(repeat=3, names=None):
+    client = Client()
+    urls = get_benchmark_urls()
+    # Load the URLconf and templates, so they aren't counted in the first result
+    client.get(urls["home"])
+    return {
+        name: measure(client, url, repeat=repeat)
+        for name, url in urls.items()
+        if not names or name in names
+    }
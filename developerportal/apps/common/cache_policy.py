@@ -0,0 +1,101 @@
+"""Cache-Control policies for Wagtail pages, declared per page type.
+
+Each BasePage subclass has a `cache_policy`: how long browsers (max-age) and
+the CDN (s-maxage) may keep a copy of its pages, and for how long after that
+they may serve the stale copy while fetching a fresh one in the background
+(stale-while-revalidate), or if the site is erroring (stale-if-error). All are
+in seconds, and None leaves out that directive.
+
+Any of them can be overridden per environment with
+settings.CACHE_CONTROL_POLICIES, keyed by the "app_label.ModelName" of the
+page type. The policies in effect are listed in the Wagtail admin, under
+Settings.
+"""
+
+from collections import namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+CachePolicy = namedtuple(
+    "CachePolicy", ["max_age", "s_maxage", "stale_while_revalidate", "stale_if_error"],
+)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+DEFAULT_POLICY = CachePolicy(
+    max_age=5 * MINUTE,
+    s_maxage=HOUR,
+    stale_while_revalidate=MINUTE,
+    stale_if_error=DAY,
+)
+# For pages which rarely change once published, and are invalidated in the CDN
+# when they do (see taskqueue.invalidation)
+LONG_LIVED_POLICY = CachePolicy(
+    max_age=HOUR, s_maxage=DAY, stale_while_revalidate=HOUR, stale_if_error=7 * DAY,
+)
+# For pages showing upcoming events, which change as time passes, rather than
+# when something is published
+SHORT_LIVED_POLICY = CachePolicy(
+    max_age=MINUTE,
+    s_maxage=15 * MINUTE,
+    stale_while_revalidate=MINUTE,
+    stale_if_error=DAY,
+)
+
+
+def get_cache_policy(page_class):
+    """Return the CachePolicy for the given page type, with any overrides from
+    settings.CACHE_CONTROL_POLICIES applied"""
+    overrides = settings.CACHE_CONTROL_POLICIES.get(page_class._meta.label, {})
+    return page_class.cache_policy._replace(**overrides)
+
+
+def get_cache_policies():
+    """Return a list of (page type, its CachePolicy, whether it's overridden in
+    settings) for every concrete BasePage subclass, sorted by label"""
+    from .models import BasePage
+
+    page_classes = sorted(
+        (
+            model
+            for model in apps.get_models()
+            if issubclass(model, BasePage) and not model._meta.abstract
+        ),
+        key=lambda model: model._meta.label,
+    )
+    return [
+        (
+            page_class,
+            get_cache_policy(page_class),
+            page_class._meta.label in settings.CACHE_CONTROL_POLICIES,
+        )
+        for page_class in page_classes
+    ]
+
+
+def apply_cache_policy(request, response, page_class):
+    """Add the Cache-Control header for the given page type to the response to
+    an anonymous GET or HEAD request, unless it already has one. Responses to
+    requests with a session, which can include things like the Wagtail userbar,
+    are marked private instead."""
+    if (
+        request.method not in ("GET", "HEAD")
+        or response.status_code not in (200, 304)
+        or response.has_header("Cache-Control")
+    ):
+        return
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        patch_cache_control(response, private=True)
+        return
+
+    policy = get_cache_policy(page_class)
+    directives = {
+        directive: value
+        for directive, value in policy._asdict().items()
+        if value is not None
+    }
+    patch_cache_control(response, public=True, **directives)
@@ -0,0 +1,78 @@
+"""ETag and Last-Modified validators for Wagtail pages, which can be checked
+without rendering the page, so conditional GET requests (from CloudFront
+revalidating its copy, or browsers) can be answered with a 304 cheaply.
+
+When a page is rendered, the dependency tags recorded for it (see
+common.response_cache) are stored, with their versions as of when rendering
+started, as its validator. The ETag is made from the page's latest revision and
+those versions, so it changes whenever the page, or anything it depends on,
+such as the pages in a listing, the menu, the directory pages or the past event
+cutoff, changes. The Last-Modified time is when the validator was stored. Until
+one of the tags is invalidated, a later request can be compared against the
+validator before rendering. If one was invalidated while the page was being
+rendered, no validator is stored, as the response may already be out of date.
+
+See BasePage.serve for how it's used.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import response_cache
+
+CACHE_KEY_VALIDATOR = "page-validator:{}"
+
+
+def is_conditional_get_request(request):
+    """Return True if validators can be used for the given request: an anonymous
+    GET or HEAD request, with settings.CONDITIONAL_GET turned on. Responses to
+    logged-in users can include things, like the Wagtail userbar, which aren't
+    in the tags."""
+    return (
+        settings.CONDITIONAL_GET
+        and request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def _get_cache_key(request):
+    return CACHE_KEY_VALIDATOR.format(response_cache.get_cache_key(request))
+
+
+def _make_etag(page, tag_versions):
+    validator = hashlib.md5(
+        f"{page.pk}:{page.latest_revision_created_at}".encode("utf-8")
+    )
+    for tag, version in sorted(tag_versions.items()):
+        validator.update(f":{tag}={version}".encode("utf-8"))
+    return f'"{validator.hexdigest()}"'
+
+
+def get_validators(request, page):
+    """Return the ETag and Last-Modified timestamp for the page's response to
+    the request, if it has been rendered before and nothing it depends on has
+    changed since; otherwise None, None."""
+    validator = cache.get(_get_cache_key(request))
+    if validator is None or not response_cache.are_current(validator["tags"]):
+        return None, None
+    return _make_etag(page, validator["tags"]), validator["last_modified"]
+
+
+def store_validators(request, page, recorder):
+    """Store the validator for the page's response to the request, from the
+    tags the recorder recorded while rendering it, and return its ETag and
+    Last-Modified timestamp; or None, None if any of them has changed since
+    rendering started."""
+    tag_versions = recorder.get_tag_versions()
+    if tag_versions is None:
+        return None, None
+
+    validator = {
+        "tags": tag_versions,
+        "last_modified": int(time.time()),
+    }
+    cache.set(_get_cache_key(request), validator, settings.CACHE_TIME_LONG)
+    return _make_etag(page, validator["tags"]), validator["last_modified"]
@@ -76,6 +76,7 @@ VIDEO_TYPE = (
 
 
 PAGINATION_QUERYSTRING_KEY = "page"
+PAGINATION_CURSOR_QUERYSTRING_KEY = "cursor"
 TOPIC_QUERYSTRING_KEY = "topic"
 ROLE_QUERYSTRING_KEY = "role"
 COUNTRY_QUERYSTRING_KEY = "country"
@@ -0,0 +1,104 @@
+"""A registry of the site's "directory" pages: the singleton index pages for
+articles, events, people and topics, which templates link to from all over the
+site via the `directory_pages` context processor.
+
+Their ids, URLs and titles are cached at two levels: in this process, and in
+the shared cache (Redis), along with a version token. Each lookup only has to
+fetch the token from the shared cache to check whether the copy in this process
+is still current, so it costs no database queries. Publishing, unpublishing,
+moving or deleting the relevant pages replaces the token, which makes every
+process reload the pages on its next lookup.
+"""
+
+import logging
+import uuid
+from collections import namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+from wagtail.core.models import Page
+
+from . import response_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_DIRECTORY_PAGES = "directory-pages"
+CACHE_KEY_DIRECTORY_PAGES_VERSION = "directory-pages-version"
+
+# The directory pages, by the name they have in the `directory_pages` context
+DIRECTORY_PAGE_MODELS = {
+    "articles": "articles.Articles",
+    "events": "events.Events",
+    "people": "people.People",
+    "topics": "topics.Topics",
+}
+
+DirectoryPage = namedtuple("DirectoryPage", ["id", "url", "title"])
+
+# The copy of the registry held in this process, and the version it came from
+_local = {"version": None, "pages": None}
+
+
+def _load_directory_pages():
+    pages = {}
+    for name, model_name in DIRECTORY_PAGE_MODELS.items():
+        page = apps.get_model(model_name).published_objects.first()
+        pages[name] = (
+            DirectoryPage(id=page.pk, url=page.get_url(), title=page.title)
+            if page
+            else None
+        )
+    return pages
+
+
+def get_directory_pages():
+    """Return a dict of name: DirectoryPage (or None, if there isn't a live page
+    of that type) for each of DIRECTORY_PAGE_MODELS."""
+    version = cache.get(CACHE_KEY_DIRECTORY_PAGES_VERSION)
+    if version is not None and version == _local["version"]:
+        return _local["pages"]
+
+    cached = cache.get(CACHE_KEY_DIRECTORY_PAGES)
+    if version is None or not cached or cached["version"] != version:
+        if version is None:
+            version = _new_version()
+        cached = {"version": version, "pages": _load_directory_pages()}
+        cache.set(CACHE_KEY_DIRECTORY_PAGES, cached, settings.CACHE_TIME_VERY_LONG)
+
+    _local.update(cached)
+    return cached["pages"]
+
+
+def _new_version():
+    version = uuid.uuid4().hex
+    cache.set(CACHE_KEY_DIRECTORY_PAGES_VERSION, version, None)
+    return version
+
+
+def invalidate_directory_pages():
+    """Make every process reload the directory pages on its next lookup"""
+    logger.info("Invalidating the directory pages registry")
+    _new_version()
+    response_cache.invalidate_tags([response_cache.DIRECTORY_TAG])
+
+
+def is_directory_page(page):
+    page_class = page.specific_class or type(page)
+    return any(
+        issubclass(page_class, apps.get_model(model_name))
+        for model_name in DIRECTORY_PAGE_MODELS.values()
+    )
+
+
+def affects_directory_pages(page):
+    """Return True if a change to the given page's status, title or location
+    could change any of the directory pages' URLs or titles"""
+    if is_directory_page(page):
+        return True
+    if not page.numchild:
+        return False
+    # Changing an ancestor of a directory page can change its URL
+    ids = [p.id for p in get_directory_pages().values() if p]
+    return Page.objects.filter(pk__in=ids, path__startswith=page.path).exists()
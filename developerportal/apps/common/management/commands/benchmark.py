@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from developerportal.apps.common.benchmark import (
+    DEFAULT_SIZES,
+    TreeSeeder,
+    run_benchmarks,
+)
+from developerportal.apps.home.models import HomePage
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic page tree in a test database, then measure the time, "
+        "queries and peak memory used to render each public page type, as JSON"
+    )
+    # The checks import the URLconf, which queries pages before the test
+    # database exists
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SIZES.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                default=default,
+                dest=name,
+                help=f"How many {name.replace('_', ' ')} to seed (default {default})",
+            )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed for the page tree"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="How many warm-cache requests to make for each page",
+        )
+        parser.add_argument(
+            "--page",
+            action="append",
+            dest="pages",
+            help="Only benchmark the named page, eg 'articles'. Can be repeated.",
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON results to this file, not stdout"
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database, and its seeded tree, for the next run",
+        )
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in DEFAULT_SIZES}
+        old_name = connection.settings_dict["NAME"]
+
+        setup_test_environment()
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            # A kept database will already have the tree from a previous run
+            if not HomePage.objects.filter(numchild__gt=0).exists():
+                self.stderr.write(f"Seeding page tree: {sizes}")
+                TreeSeeder(sizes, seed=options["seed"]).seed()
+
+            results = {
+                "database": connection.vendor,
+                "sizes": sizes,
+                "seed": options["seed"],
+                "repeat": options["repeat"],
+                "pages": run_benchmarks(
+                    repeat=options["repeat"], names=options["pages"]
+                ),
+            }
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
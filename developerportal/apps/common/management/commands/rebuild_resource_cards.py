@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from developerportal.apps.common.models import ResourceCard
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ResourceCard index from every live resource page"
+
+    def handle(self, *args, **options):
+        count = ResourceCard.rebuild()
+        self.stdout.write(f"Rebuilt {count} resource cards")
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from developerportal.apps.common.response_cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the response cache's hit, miss, store and invalidation counts "
+        "as JSON, for monitoring"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counts to zero after"
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else None
+        self.stdout.write(json.dumps(stats))
+        if options["reset"]:
+            reset_stats()
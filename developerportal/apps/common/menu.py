@@ -0,0 +1,129 @@
+"""The navigation menu in header.html: the live, public, in-menu children of a
+site's root page, and theirs in turn.
+
+The menu is built as plain dicts and lists, so it can be kept in the shared
+cache for all processes, and is rebuilt only after a change to a page which
+is, or could be, in it.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from wagtail.core.models import Page, Site
+
+from . import response_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_MENU = "menu-{site_id}"
+# The ids of the pages in the menu as last built, which, unlike the menu, are
+# kept after it's invalidated, so we can tell whether a page has just left it
+CACHE_KEY_MENU_PAGE_IDS = "menu-page-ids-{site_id}"
+
+# How many levels of pages below the root page are shown in the menu
+MENU_DEPTH = 2
+
+
+def _get_menu_item(page):
+    icon = getattr(page, "icon", None)
+    return {
+        "id": page.pk,
+        "title": page.title,
+        "slug": page.slug,
+        "url": page.get_url(),
+        "resource_type": getattr(page, "resource_type", None),
+        "nav_description": getattr(page, "nav_description", ""),
+        "icon_url": icon.url if icon else None,
+        "children": [],
+    }
+
+
+def build_menu(root_page):
+    """Return a list of menu items for the live, public, in-menu children of
+    `root_page`. Each item is a dict of the page's id, title, slug, url,
+    resource_type, nav_description and icon_url, plus its own `children`.
+
+    Children of pages which aren't in the menu aren't included, even if they
+    are themselves in the menu.
+    """
+    pages = (
+        Page.objects.descendant_of(root_page)
+        .filter(depth__lte=root_page.depth + MENU_DEPTH)
+        .live()
+        .public()
+        .in_menu()
+        .order_by("path")
+        .specific()
+    )
+
+    menu = []
+    items_by_path = {}
+    for page in pages:
+        item = _get_menu_item(page)
+        items_by_path[page.path] = item
+        if page.depth == root_page.depth + 1:
+            menu.append(item)
+        else:
+            parent_path_length = (page.depth - 1) * Page.steplen
+            parent = items_by_path.get(page.path[:parent_path_length])
+            if parent is not None:
+                parent["children"].append(item)
+    return menu
+
+
+def _iter_menu_items(menu):
+    for item in menu:
+        yield item
+        yield from _iter_menu_items(item["children"])
+
+
+def get_menu(site):
+    """Return the menu for the given Site, from the cache if possible"""
+    if site is None:
+        return []
+
+    key = CACHE_KEY_MENU.format(site_id=site.pk)
+    menu = cache.get(key)
+    if menu is None:
+        menu = build_menu(site.root_page)
+        cache.set(key, menu, settings.CACHE_TIME_VERY_LONG)
+        cache.set(
+            CACHE_KEY_MENU_PAGE_IDS.format(site_id=site.pk),
+            [item["id"] for item in _iter_menu_items(menu)],
+            None,
+        )
+    return menu
+
+
+def _get_menu_cache_keys(key=CACHE_KEY_MENU):
+    return [
+        key.format(site_id=site_id)
+        for site_id in Site.objects.values_list("pk", flat=True)
+    ]
+
+
+def invalidate_menu():
+    """Remove the menus for all sites from the cache"""
+    logger.info("Invalidating the navigation menu")
+    cache.delete_many(_get_menu_cache_keys())
+    response_cache.invalidate_tags([response_cache.MENU_TAG])
+
+
+def affects_menu(page):
+    """Return True if a change to the given page could change any site's menu:
+    if it is shallow enough in the tree to be shown, and is either meant to be
+    shown or was in the menu when it was last built."""
+    max_root_depth = Site.objects.aggregate(depth=Max("root_page__depth"))["depth"]
+    if max_root_depth is None or page.depth > max_root_depth + MENU_DEPTH:
+        return False
+    if page.show_in_menus:
+        return True
+    return any(
+        page.pk in page_ids
+        for page_ids in cache.get_many(
+            _get_menu_cache_keys(CACHE_KEY_MENU_PAGE_IDS)
+        ).values()
+    )
@@ -0,0 +1,329 @@
+import json
+import logging
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connection
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import (
+    cc_delim_re,
+    get_conditional_response,
+    patch_cache_control,
+)
+from django.utils.http import parse_http_date_safe
+
+from mozilla_django_oidc.middleware import SessionRefresh
+
+from . import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Frames from these paths aren't useful when looking for where a query came from
+STACK_EXCLUDE_PATHS = ("site-packages", "/django/", "/wagtail/", __file__)
+
+# Paths which always go through the full session, CSRF and OIDC handling, even
+# without a session cookie, as they log people in or serve private documents
+NON_PUBLIC_PATH_PREFIXES = ("/admin/", "/django-admin/", "/auth/", "/documents/")
+
+
+class QueryRecorder:
+    """A connection.execute_wrapper that records the number, duration and
+    repetition of SQL statements executed while it is installed."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = None
+        self.statements = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - start
+            self.count += 1
+            self.duration += duration
+            if duration > self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_sql = sql
+            self.statements[sql] += 1
+            if sql not in self.stacks:
+                # Remember where each distinct statement was first run from, so
+                # we can point at the culprit if the budget is exceeded
+                self.stacks[sql] = self._get_stack()
+
+    @staticmethod
+    def _get_stack():
+        return [
+            frame
+            for frame in traceback.extract_stack()
+            if not any(path in frame.filename for path in STACK_EXCLUDE_PATHS)
+        ]
+
+    @property
+    def duplicates(self):
+        """The number of statements which repeat an earlier one, with any
+        parameters"""
+        return self.count - len(self.statements)
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+def get_page_label(response):
+    """Return the "app_label.ModelName" of the Wagtail page rendered in the
+    response, or None if it wasn't a page."""
+    context = getattr(response, "context_data", None) or {}
+    page = context.get("page")
+    return page._meta.label if hasattr(page, "_meta") else None
+
+
+def get_query_budget(page_label):
+    budgets = settings.SQL_QUERY_BUDGETS
+    return budgets.get(page_label, budgets.get("default"))
+
+
+class SQLBudgetMiddleware:
+    """Count the SQL queries run for each request, and the time they took.
+
+    When settings.SQL_INSTRUMENTATION is True, this logs one JSON line per request
+    with the count, total time, number of duplicated statements and the slowest
+    statement, tagged with the Wagtail page type that was served. If the count is
+    over the budget for that page type in settings.SQL_QUERY_BUDGETS, a warning
+    is logged with the most-repeated statement and where it was called from.
+
+    With settings.SQL_INSTRUMENTATION_SERVER_TIMING also True, the figures are
+    added to the response as a Server-Timing header, to show in browser devtools.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SQL_INSTRUMENTATION:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        page_label = get_page_label(response)
+        self.log_queries(request, page_label, recorder)
+        self.check_budget(request, page_label, recorder)
+        if settings.SQL_INSTRUMENTATION_SERVER_TIMING:
+            response["Server-Timing"] = self.get_server_timing(recorder)
+        return response
+
+    def log_queries(self, request, page_label, recorder):
+        logger.info(
+            json.dumps(
+                {
+                    "event": "sql_queries",
+                    "path": request.path,
+                    "page_type": page_label,
+                    "count": recorder.count,
+                    "duration_ms": round(recorder.duration * 1000, 2),
+                    "duplicates": recorder.duplicates,
+                    "slowest_ms": round(recorder.slowest_duration * 1000, 2),
+                    "slowest_sql": recorder.slowest_sql,
+                }
+            )
+        )
+
+    def check_budget(self, request, page_label, recorder):
+        budget = get_query_budget(page_label)
+        if budget is None or recorder.count <= budget:
+            return
+
+        sql, repeats = recorder.most_repeated()
+        stack = "".join(traceback.format_list(recorder.stacks.get(sql, [])))
+        logger.warning(
+            f"{request.path} ({page_label or 'not a page'}) ran {recorder.count} SQL "
+            f"queries, over its budget of {budget}. The most repeated, run "
+            f"{repeats} times, was: {sql}\nFirst called from:\n{stack}"
+        )
+
+    def get_server_timing(self, recorder):
+        return ", ".join(
+            [
+                'sql;dur={:.2f};desc="{} queries"'.format(
+                    recorder.duration * 1000, recorder.count
+                ),
+                'sql-duplicates;desc="{} duplicates"'.format(recorder.duplicates),
+                "sql-slowest;dur={:.2f}".format(recorder.slowest_duration * 1000),
+            ]
+        )
+
+
+class ResponseCacheMiddleware:
+    """Serve anonymous GET and HEAD requests for Wagtail pages from a cache of
+    whole responses, when settings.RESPONSE_CACHE is True.
+
+    A request is anonymous if it has no session cookie, so it can't be from a
+    logged-in user, nor one who has been shown a page behind a password.
+    Responses are only stored if they were for a Wagtail page, were successful,
+    and don't set cookies or say they are private. See common.response_cache for
+    how they are invalidated.
+
+    Responses are marked with an X-Response-Cache header of "hit" or "miss".
+    Cached responses with ETag or Last-Modified headers answer conditional
+    requests with a 304.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.RESPONSE_CACHE or not self.is_cacheable_request(request):
+            return self.get_response(request)
+
+        response = response_cache.get_cached_response(request)
+        if response is not None:
+            response["X-Response-Cache"] = "hit"
+            # Answer conditional requests, if the page gave the response
+            # validators (see common.conditional_get)
+            return get_conditional_response(
+                request,
+                etag=response.get("ETag"),
+                last_modified=parse_http_date_safe(response.get("Last-Modified")),
+                response=response,
+            )
+
+        with response_cache.DependencyRecorder() as recorder:
+            response = self.get_response(request)
+
+        if request.method == "GET" and self.is_cacheable_response(request, response):
+            response_cache.store_response(request, response, recorder)
+        response["X-Response-Cache"] = "miss"
+        return response
+
+    def is_cacheable_request(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        )
+
+    def is_cacheable_response(self, request, response):
+        cache_control = response.get("Cache-Control", "")
+        return (
+            response.status_code == 200
+            # It has a form with a CSRF token, which can't be shared
+            and not request.META.get("CSRF_COOKIE_USED")
+            and get_page_label(response) is not None
+            and not response.streaming
+            and not response.cookies
+            and "private" not in cache_control
+            and "no-store" not in cache_control
+        )
+
+
+def is_public_request(request):
+    """Return True if the request is an anonymous GET or HEAD request for a
+    public page: it has no session cookie, so isn't from a logged-in user, and
+    isn't for the admin or login views."""
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not request.path.startswith(NON_PUBLIC_PATH_PREFIXES)
+    )
+
+
+def _normalise_vary(response):
+    """Remove Cookie, and any duplicates, from the response's Vary header,
+    leaving it out altogether if nothing else is in it"""
+    if not response.has_header("Vary"):
+        return
+    headers = {}
+    for header in cc_delim_re.split(response["Vary"]):
+        if header and header.lower() != "cookie":
+            headers.setdefault(header.lower(), header)
+    if headers:
+        response["Vary"] = ", ".join(headers.values())
+    else:
+        del response["Vary"]
+
+
+class PublicRequestMiddleware:
+    """Mark public requests (see is_public_request) when settings.PUBLIC_FAST_PATH
+    is True, so the session, CSRF and OIDC middleware below skip their work for
+    them, and make their responses the same for everyone, so the CDN can cache
+    one copy of each.
+
+    Responses to public requests have any Set-Cookie headers removed, and Cookie
+    removed from their Vary header. The exception is a response which needs a
+    session or CSRF cookie, such as a page with a password form. It keeps the
+    cookie, and is marked private instead.
+
+    This should be the outermost middleware which can set cookies or headers,
+    so that it sees every one of them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.is_public_request = settings.PUBLIC_FAST_PATH and is_public_request(
+            request
+        )
+        response = self.get_response(request)
+        if not request.is_public_request:
+            return response
+
+        if (
+            settings.SESSION_COOKIE_NAME in response.cookies
+            or settings.CSRF_COOKIE_NAME in response.cookies
+        ):
+            patch_cache_control(response, private=True)
+            return response
+
+        response.cookies.clear()
+        _normalise_vary(response)
+        return response
+
+
+class PublicSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware which, for public requests, doesn't add Vary: Cookie
+    just because the (empty) session was read, such as to find the user. If
+    something was stored in the session, it's saved as usual."""
+
+    def process_response(self, request, response):
+        if getattr(request, "is_public_request", False) and not (
+            request.session.modified
+        ):
+            return response
+        return super().process_response(request, response)
+
+
+class PublicCsrfViewMiddleware(CsrfViewMiddleware):
+    """CsrfViewMiddleware which skips reading and checking the CSRF cookie for
+    public requests, which are only ever GET or HEAD requests. If the response
+    uses a CSRF token after all, a new one is made, and its cookie is set as
+    usual."""
+
+    def process_request(self, request):
+        if getattr(request, "is_public_request", False):
+            return None
+        return super().process_request(request)
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if getattr(request, "is_public_request", False):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class PublicSessionRefresh(SessionRefresh):
+    """SessionRefresh which skips checking whether the OIDC session needs
+    refreshing for public requests, which can't be from a logged-in user"""
+
+    def process_request(self, request):
+        if getattr(request, "is_public_request", False):
+            return None
+        return super().process_request(request)
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.12 on 2026-10-18 06:39
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django_countries.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0045_assign_unlock_grouppagepermission'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('common', '0002_drop_staticbuild_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceCard',
+            fields=[
+                ('page', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resource_card', serialize=False, to='wagtailcore.Page')),
+                ('resource_type', models.CharField(max_length=16)),
+                ('date', models.DateField()),
+                ('country', django_countries.fields.CountryField(blank=True, default='', max_length=2)),
+                ('topic_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, size=None)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.ContentType')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='resourcecard',
+            index=models.Index(fields=['resource_type', 'date', 'page'], name='common_reso_resourc_1762d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resourcecard',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['topic_ids'], name='common_reso_topic_i_1c067d_gin'),
+        ),
+    ]
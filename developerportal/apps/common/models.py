@@ -1,10 +1,30 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.cache import cache
-from django.db import transaction
-from django.db.models import SET_NULL, ForeignKey
+from django.db import connection, transaction
+from django.db.models import (
+    CASCADE,
+    SET_NULL,
+    CharField,
+    DateField,
+    ForeignKey,
+    Index,
+    IntegerField,
+    Model,
+    OneToOneField,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
+from django_countries.fields import CountryField
 from wagtail.core.models import Page, PageManager
 
+from . import conditional_get
+from .cache_policy import DEFAULT_POLICY, apply_cache_policy
 from .forms import BasePageForm
+from .response_cache import DependencyRecorder, record_page_types, record_pages
 
 
 class PublishedPageManager(PageManager):
@@ -13,6 +33,9 @@ class PublishedPageManager(PageManager):
         # guard against private pages (i.e. using `.public()`) because this
         # causes initial migrations to fail, however private aren't supported
         # by the static site build.
+        # Anything listing live pages of this type depends on which pages
+        # those are, so a cached response showing them needs to know
+        record_page_types(self.model)
         return super().get_queryset().live()
 
 
@@ -32,6 +55,9 @@ class BasePage(Page):
     # when the object is saved
     _bulk_invalidation_cache_keys = []
 
+    # How long pages of this type can be cached for, see common.cache_policy
+    cache_policy = DEFAULT_POLICY
+
     class Meta:
         abstract = True
 
@@ -39,3 +65,156 @@ class BasePage(Page):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         cache.delete_many(self._bulk_invalidation_cache_keys)
+
+    def serve(self, request, *args, **kwargs):
+        response = self._serve_conditionally(request, *args, **kwargs)
+        apply_cache_policy(request, response, type(self))
+        return response
+
+    def _serve_conditionally(self, request, *args, **kwargs):
+        """Serve the page, with ETag and Last-Modified headers for anonymous
+        requests, answering a conditional request with a 304 without rendering
+        the page if it and its dependencies haven't changed since it was last
+        rendered. See common.conditional_get."""
+        if not conditional_get.is_conditional_get_request(request):
+            return super().serve(request, *args, **kwargs)
+
+        etag, last_modified = conditional_get.get_validators(request, self)
+        if etag is not None:
+            not_modified = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if not_modified is not None:
+                self._set_validator_headers(not_modified, etag, last_modified)
+                return not_modified
+
+        with DependencyRecorder() as recorder:
+            # This page was loaded before recording started
+            record_pages(self.pk)
+            response = super().serve(request, *args, **kwargs)
+            if response.status_code != 200 or not hasattr(response, "render"):
+                return response
+            response.render()
+
+        if etag is None:
+            etag, last_modified = conditional_get.store_validators(
+                request, self, recorder
+            )
+        if etag is not None:
+            self._set_validator_headers(response, etag, last_modified)
+        return response
+
+    @staticmethod
+    def _set_validator_headers(response, etag, last_modified):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+
+
+# The page types which are listed as resource cards, in "app.Model" format
+RESOURCE_CARD_MODELS = (
+    "articles.Article",
+    "events.Event",
+    "externalcontent.ExternalArticle",
+    "externalcontent.ExternalEvent",
+    "externalcontent.ExternalVideo",
+    "videos.Video",
+)
+
+
+class ResourceCard(Model):
+    """A flat, denormalised copy of the fields resource listings are filtered
+    and ordered by, for each live resource page.
+
+    Listings can be queried from this one table, rather than by combining
+    querysets for each concrete resource model. The cards themselves are
+    rendered from the pages, loaded for just the rows on the page being
+    listed (see common.utils.CombinedResources). Rows are kept in sync as pages
+    are published and unpublished (see common.wagtail_hooks), and removed with
+    the page if it is deleted. The `rebuild_resource_cards` management command
+    rebuilds the whole table.
+    """
+
+    page = OneToOneField(
+        "wagtailcore.Page",
+        on_delete=CASCADE,
+        primary_key=True,
+        related_name="resource_card",
+    )
+    content_type = ForeignKey(ContentType, on_delete=CASCADE, related_name="+")
+    resource_type = CharField(max_length=16)
+    # For Events and ExternalEvents, this is the start_date
+    date = DateField()
+    country = CountryField(blank=True, default="")
+    topic_ids = ArrayField(IntegerField(), blank=True, default=list)
+
+    class Meta:
+        indexes = [
+            Index(fields=["resource_type", "date", "page"]),
+            GinIndex(fields=["topic_ids"]),
+        ]
+
+    def __repr__(self):
+        return "<ResourceCard: {} ({} {})>".format(
+            self.page_id, self.resource_type, self.date
+        )
+
+    def __str__(self):
+        return "ResourceCard for page {}".format(self.page_id)
+
+    @staticmethod
+    def is_supported():
+        """ResourceCard uses Postgres-only fields, so it is left empty on other
+        databases, such as the sqlite used by settings.test_fast"""
+        return connection.vendor == "postgresql"
+
+    @staticmethod
+    def get_resource_models():
+        return [apps.get_model(model) for model in RESOURCE_CARD_MODELS]
+
+    @classmethod
+    def is_resource(cls, page):
+        return isinstance(page, tuple(cls.get_resource_models()))
+
+    @classmethod
+    def from_page(cls, page):
+        """Return an unsaved ResourceCard for the given specific resource page"""
+        return cls(
+            page_id=page.pk,
+            content_type_id=page.content_type_id,
+            resource_type=page.resource_type,
+            date=page.start_date if hasattr(page, "start_date") else page.date,
+            country=getattr(page, "country", ""),
+            topic_ids=[topic.topic_id for topic in page.topics.all()],
+        )
+
+    @classmethod
+    def update_for_page(cls, page):
+        """Create, update or remove the card for the given page, depending on
+        whether it is a live resource page."""
+        if not cls.is_supported():
+            return None
+        page = page.specific
+        if not cls.is_resource(page):
+            return None
+        if not page.live:
+            cls.objects.filter(page_id=page.pk).delete()
+            return None
+
+        card = cls.from_page(page)
+        card.save()
+        return card
+
+    @classmethod
+    @transaction.atomic()
+    def rebuild(cls):
+        """Replace every card with a freshly built one for each live resource."""
+        if not cls.is_supported():
+            return 0
+        cards = [
+            cls.from_page(page)
+            for model in cls.get_resource_models()
+            for page in model.published_objects.prefetch_related("topics")
+        ]
+        cls.objects.all().delete()
+        cls.objects.bulk_create(cards, batch_size=500)
+        return len(cards)
@@ -0,0 +1,247 @@
+"""A cache of whole responses for anonymous requests for Wagtail pages, which is
+invalidated by the pages each response depends on, rather than all at once.
+
+While a cacheable response is being rendered, every page instance loaded from
+the database is recorded as a dependency, as are the page types of any listings
+in it, so that new pages of that type show up, and the menu, directory pages
+and past event cutoff, if it uses them. Each is a "tag". The response is cached
+along with the version of each of its tags. Publishing, unpublishing, moving or
+deleting a page invalidates the tags for it and its page type, and responses
+with an out-of-date tag are treated as a miss.
+
+A tag's version is the value of a counter, the "clock", when it was last
+invalidated. The clock is read before rendering starts, so if any tag has a
+later version by the time the response is stored, it may have been rendered
+from content which has since changed, and isn't stored.
+
+See common.middleware.ResponseCacheMiddleware for how it's used.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_init
+from django.http import HttpResponse
+
+from wagtail.core.models import Page
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_RESPONSE = "response-cache:{}"
+CACHE_KEY_TAG = "response-cache-tag:{}"
+CACHE_KEY_COUNTER = "response-cache-stats:{}"
+CACHE_KEY_CLOCK = "response-cache-clock"
+
+# Tags for things which aren't a page, or are cached outside of the database
+MENU_TAG = "menu"
+DIRECTORY_TAG = "directory"
+EVENT_CUTOFF_TAG = "event-cutoff"
+
+COUNTERS = ("hits", "misses", "stores", "invalidations")
+
+_recorder = threading.local()
+
+
+def page_tag(page_id):
+    return f"page-{page_id}"
+
+
+def type_tag(model):
+    return f"type-{model._meta.label_lower}"
+
+
+class DependencyRecorder:
+    """Collects the tags for the response being rendered. Used as a context
+    manager, it's active for the current thread for the duration. Recorders
+    can be nested, and each collects every tag recorded while it's active."""
+
+    def __init__(self):
+        self.tags = set()
+        self.started = None
+
+    def __enter__(self):
+        self.started = _get_clock()
+        _get_recorders().append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _get_recorders().remove(self)
+
+    def get_tag_versions(self):
+        """Return a dict of tag: version for the recorded tags, or None if any
+        of them has been invalidated since recording started"""
+        return get_tag_versions(self.tags, self.started)
+
+
+def _get_recorders():
+    if not hasattr(_recorder, "active"):
+        _recorder.active = []
+    return _recorder.active
+
+
+def _record(tags):
+    recorders = _get_recorders()
+    if recorders:
+        tags = set(tags)
+        for recorder in recorders:
+            recorder.tags.update(tags)
+
+
+def record_tags(*tags):
+    """Record that the response being rendered, if any, depends on the given
+    tags, such as MENU_TAG"""
+    _record(tags)
+
+
+def record_pages(*page_ids):
+    """Record that the response being rendered, if any, depends on the pages
+    with the given ids"""
+    _record(page_tag(page_id) for page_id in page_ids if page_id)
+
+
+def record_page_types(*models):
+    """Record that the response being rendered, if any, lists pages of the given
+    models, so should be invalidated whenever one of them changes"""
+    _record(type_tag(model) for model in models)
+
+
+def _record_page_instance(sender, instance, **kwargs):
+    # Catches pages loaded for any reason: the page being served, pages in
+    # listings, StreamField page choosers, {% pageurl %} targets, and so on
+    if _get_recorders() and isinstance(instance, Page):
+        record_pages(instance.pk)
+
+
+post_init.connect(_record_page_instance, dispatch_uid="response_cache_record_page")
+
+
+def get_cache_key(request):
+    url = request.build_absolute_uri()
+    return CACHE_KEY_RESPONSE.format(hashlib.md5(url.encode("utf-8")).hexdigest())
+
+
+def _increment(counter):
+    key = CACHE_KEY_COUNTER.format(counter)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_stats():
+    """Return a dict of counter name: count, since the counters were last reset"""
+    counts = cache.get_many([CACHE_KEY_COUNTER.format(c) for c in COUNTERS])
+    return {c: counts.get(CACHE_KEY_COUNTER.format(c), 0) for c in COUNTERS}
+
+
+def reset_stats():
+    cache.delete_many([CACHE_KEY_COUNTER.format(c) for c in COUNTERS])
+
+
+def _get_clock():
+    clock = cache.get(CACHE_KEY_CLOCK)
+    if clock is None:
+        # Never set, or evicted. Starting from the time, in milliseconds, keeps
+        # it ahead of the versions it gave out before
+        cache.add(CACHE_KEY_CLOCK, int(time.time() * 1000), None)
+        clock = cache.get(CACHE_KEY_CLOCK)
+    return clock
+
+
+def _tick():
+    try:
+        return cache.incr(CACHE_KEY_CLOCK)
+    except ValueError:
+        _get_clock()
+        return cache.incr(CACHE_KEY_CLOCK)
+
+
+def get_tag_versions(tags, as_of=None):
+    """Return a dict of tag: its current version, for each of the given tags, or
+    None if any has been invalidated since the clock read `as_of` (by default,
+    now). Any without a version are given `as_of`."""
+    if as_of is None:
+        as_of = _get_clock()
+    tags = sorted(tags)
+    tag_keys = [CACHE_KEY_TAG.format(tag) for tag in tags]
+    versions = cache.get_many(tag_keys)
+    for key in tag_keys:
+        if key not in versions:
+            # add(), so as not to overwrite an invalidation since get_many()
+            if not cache.add(key, as_of, None):
+                versions[key] = cache.get(key, as_of)
+            else:
+                versions[key] = as_of
+    if any(version > as_of for version in versions.values()):
+        return None
+    return {tag: versions[key] for tag, key in zip(tags, tag_keys)}
+
+
+def are_current(tag_versions):
+    """Return True if every tag in the given dict of tag: version still has
+    that version, so nothing depending on them has changed since"""
+    tag_keys = [CACHE_KEY_TAG.format(tag) for tag in tag_versions]
+    current = cache.get_many(tag_keys)
+    return all(
+        current.get(key) == version
+        for key, version in zip(tag_keys, tag_versions.values())
+    )
+
+
+def get_cached_response(request):
+    """Return the cached response for the request, or None if there isn't one
+    or any of the pages it depends on have changed since it was cached"""
+    entry = cache.get(get_cache_key(request))
+    if entry is not None:
+        if are_current(entry["tags"]):
+            _increment("hits")
+            response = HttpResponse(entry["content"], status=entry["status"])
+            for header, value in entry["headers"]:
+                response[header] = value
+            return response
+
+    _increment("misses")
+    return None
+
+
+def store_response(request, response, recorder):
+    """Cache the response, along with the versions of the tags the recorder
+    recorded while it was rendered, unless any have changed since"""
+    tag_versions = recorder.get_tag_versions()
+    if tag_versions is None:
+        logger.info(f"Not caching {request.path}, as it changed while rendering")
+        return
+
+    cache.set(
+        get_cache_key(request),
+        {
+            "tags": tag_versions,
+            "status": response.status_code,
+            "headers": list(response.items()),
+            "content": response.content,
+        },
+        settings.RESPONSE_CACHE_TIMEOUT,
+    )
+    _increment("stores")
+
+
+def invalidate_pages(pages):
+    """Invalidate every cached response which depends on any of the given pages,
+    or lists pages of their types"""
+    tags = set()
+    for page in pages:
+        tags.update([page_tag(page.pk), type_tag(page.specific_class or type(page))])
+    invalidate_tags(tags)
+
+
+def invalidate_tags(tags):
+    """Invalidate every cached response which depends on any of the given tags"""
+    if tags:
+        logger.info(f"Invalidating cached responses tagged {sorted(tags)}")
+        version = _tick()
+        cache.set_many({CACHE_KEY_TAG.format(tag): version for tag in tags}, None)
+        _increment("invalidations")
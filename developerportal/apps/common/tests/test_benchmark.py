@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ...articles.models import Article
+from ...externalcontent.models import ExternalEvent
+from ...people.models import ContentContributor
+from ...topics.models import ParentTopic
+from ..benchmark import TreeSeeder, get_benchmark_urls, run_benchmarks
+
+SIZES = {
+    "articles": 8,
+    "videos": 3,
+    "events": 3,
+    "people": 4,
+    "topics": 12,
+    "external_articles": 2,
+    "external_videos": 2,
+    "external_events": 2,
+}
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        TreeSeeder(SIZES, seed=1).seed()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_seeded_tree(self):
+        self.assertEqual(Article.published_objects.count(), 8)
+        self.assertEqual(ExternalEvent.published_objects.count(), 2)
+        # One parent topic for every ten
+        self.assertEqual(ParentTopic.objects.count(), 11)
+        self.assertTrue(ContentContributor.objects.exists())
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(repeat=1, names=["articles", "rss_feed"])
+        self.assertEqual(set(results), {"articles", "rss_feed"})
+        self.assertEqual(results["articles"]["url"], get_benchmark_urls()["articles"])
+        for result in results.values():
+            self.assertEqual(result["status_code"], 200)
+            self.assertGreater(result["cold_queries"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+            self.assertGreater(result["warm_ms_median"], 0)
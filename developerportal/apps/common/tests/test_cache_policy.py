@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ...articles.models import Article
+from ...events.models import Events
+from ..cache_policy import (
+    LONG_LIVED_POLICY,
+    SHORT_LIVED_POLICY,
+    get_cache_policies,
+    get_cache_policy,
+)
+
+ARTICLE_PATH = "/posts/faster-smarter-javascript-debugging-in-firefox/"
+
+
+class CachePolicyTests(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_cache_policy(self):
+        self.assertEqual(get_cache_policy(Article), LONG_LIVED_POLICY)
+        self.assertEqual(get_cache_policy(Events), SHORT_LIVED_POLICY)
+
+    @override_settings(
+        CACHE_CONTROL_POLICIES={
+            "events.Events": {"s_maxage": 30, "stale_if_error": None}
+        }
+    )
+    def test_get_cache_policy__overridden(self):
+        policy = get_cache_policy(Events)
+        self.assertEqual(policy.s_maxage, 30)
+        self.assertIsNone(policy.stale_if_error)
+        self.assertEqual(policy.max_age, SHORT_LIVED_POLICY.max_age)
+
+        policies = {
+            page_class: overridden for page_class, _, overridden in get_cache_policies()
+        }
+        self.assertTrue(policies[Events])
+        self.assertFalse(policies[Article])
+
+    def test_header(self):
+        response = self.client.get(ARTICLE_PATH)
+        self.assertEqual(
+            set(response["Cache-Control"].split(", ")),
+            {
+                "public",
+                "max-age=3600",
+                "s-maxage=86400",
+                "stale-while-revalidate=3600",
+                "stale-if-error=604800",
+            },
+        )
+        self.assertIn("s-maxage=900", self.client.get("/events/")["Cache-Control"])
+
+    @override_settings(
+        CACHE_CONTROL_POLICIES={"events.Events": {"stale_if_error": None}}
+    )
+    def test_header__overridden(self):
+        self.assertNotIn("stale-if-error", self.client.get("/events/")["Cache-Control"])
+
+    def test_header__session(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+        self.assertEqual(self.client.get(ARTICLE_PATH)["Cache-Control"], "private")
+
+    @override_settings(CONDITIONAL_GET=True)
+    def test_header__not_modified(self):
+        etag = self.client.get(ARTICLE_PATH)["ETag"]
+        response = self.client.get(ARTICLE_PATH, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("s-maxage=86400", response["Cache-Control"])
+
+    def test_admin_view(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(user)
+        # So that mozilla_django_oidc doesn't send us to reauthenticate
+        session = self.client.session
+        session["oidc_id_token_expiration"] = time.time() + 60
+        session.save()
+
+        response = self.client.get("/admin/cache-policies/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "articles.Article")
+        self.assertContains(response, "86400")
+
+    def test_admin_view__requires_login(self):
+        response = self.client.get("/admin/cache-policies/")
+        self.assertEqual(response.status_code, 302)
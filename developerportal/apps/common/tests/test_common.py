@@ -1,14 +1,28 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.test import RequestFactory, TestCase, override_settings
 
 from wagtail.admin.edit_handlers import get_form_for_model
 from wagtail.core.models import Page, Site
 
+from ...articles.models import Articles
 from ..forms import BasePageForm
+from ..models import ResourceCard
 from ..utils import (
+    CombinedResources,
+    KeysetPage,
+    decode_cursor,
+    encode_cursor,
     get_combined_articles,
     get_combined_articles_and_videos,
     get_combined_events,
     get_combined_videos,
+    get_keyset_redirect_url,
+    paginate_resources,
+    use_resource_cards,
 )
 
 
@@ -40,6 +54,214 @@ class UtilsTestCase(TestCase):
         items = get_combined_videos(self.page)
         self.assertEqual(len(items), 0)
 
+    def test_get_combined_articles_and_videos__as_union(self):
+        """The union mode should return the same resources as the list mode,
+        ordered in the database."""
+        items = get_combined_articles_and_videos(self.page)
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+
+        self.assertIsInstance(union, CombinedResources)
+        self.assertEqual(union.count(), len(items))
+        self.assertEqual(set(union[:]), set(items))
+
+        dates = [item.date for item in union]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_get_combined_articles_and_videos__as_union__de_dupes(self):
+        """Filtering across a relation must not repeat a resource."""
+        topics_q = Q(topics__topic__slug__in=["css", "javascript"])
+        items = get_combined_articles_and_videos(self.page, q_object=topics_q)
+        union = get_combined_articles_and_videos(
+            self.page, q_object=topics_q, as_union=True
+        )
+        self.assertGreater(len(items), 0)
+        self.assertEqual(len(union), len(items))
+        self.assertEqual(len(set(union[:])), len(union))
+
+    def test_get_combined_events__as_union__empty(self):
+        union = get_combined_events(self.page, as_union=True)
+        self.assertEqual(union.count(), 0)
+        self.assertFalse(union)
+        self.assertEqual(union[:6], [])
+        with self.assertRaises(IndexError):
+            union[0]
+
+    def test_combined_resources__only_fetches_one_page(self):
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+        total = union.count()
+
+        # Warm the ContentType cache, as it is in a long-running process
+        for content_type in ContentType.objects.all():
+            ContentType.objects.get_for_id(content_type.id)
+
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+        # One COUNT, one sliced UNION and one query for the Articles in the slice
+        with self.assertNumQueries(3):
+            resources = paginate_resources(union, per_page=6, page_ref=2)
+            items = list(resources)
+
+        self.assertEqual(len(items), 6)
+        self.assertEqual(resources.paginator.count, total)
+        expected = sorted(
+            get_combined_articles_and_videos(self.page),
+            key=lambda item: (item.date, item.pk),
+            reverse=True,
+        )
+        self.assertEqual(items, expected[6:12])
+
+    @override_settings(RESOURCE_CARD_LISTINGS=True)
+    def test_use_resource_cards__unsupported_database(self):
+        with mock.patch.object(ResourceCard, "is_supported", return_value=True):
+            self.assertTrue(use_resource_cards())
+        with mock.patch.object(ResourceCard, "is_supported", return_value=False):
+            self.assertFalse(use_resource_cards())
+
+            # The listings combine each model's querysets instead
+            articles_page = Articles.objects.first()
+            response = self.client.get(articles_page.url)
+            self.assertGreater(len(response.context["resources"]), 0)
+
+    def test_encode_and_decode_cursor(self):
+        cursor = encode_cursor((12, 3, datetime.date(2020, 2, 29)), forwards=False)
+        self.assertEqual(decode_cursor(cursor), (datetime.date(2020, 2, 29), 12, False))
+        self.assertIsNone(decode_cursor(None))
+        self.assertIsNone(decode_cursor("not a cursor"))
+        self.assertIsNone(decode_cursor(encode_cursor((None, 3, "x"))))
+        self.assertIsNone(decode_cursor(encode_cursor((12, 3, "2020-02-30"))))
+        self.assertIsNone(decode_cursor(encode_cursor((12, 3, None))))
+        for pk in (0, -1, 2 ** 31):
+            with self.subTest(pk=pk):
+                self.assertIsNone(
+                    decode_cursor(encode_cursor((pk, 3, datetime.date(2020, 2, 29))))
+                )
+
+    def test_keyset_pagination__walks_forwards_and_backwards(self):
+        expected = sorted(
+            get_combined_articles_and_videos(self.page),
+            key=lambda item: (item.date, item.pk),
+            reverse=True,
+        )
+        self.assertGreater(len(expected), 6)
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+
+        pages = []
+        resources = paginate_resources(union, per_page=3, page_ref=None, keyset=True)
+        self.assertIsInstance(resources, KeysetPage)
+        self.assertFalse(resources.has_previous())
+        self.assertIsNone(resources.previous_cursor)
+        pages.append(list(resources))
+        while resources.has_next():
+            resources = paginate_resources(
+                union,
+                per_page=3,
+                page_ref=None,
+                cursor=resources.next_cursor,
+                keyset=True,
+            )
+            self.assertTrue(resources.has_previous())
+            pages.append(list(resources))
+        self.assertIsNone(resources.next_cursor)
+        self.assertEqual([item for page in pages for item in page], expected)
+
+        # And back again, from the last page
+        for page in reversed(pages[:-1]):
+            resources = paginate_resources(
+                union,
+                per_page=3,
+                page_ref=None,
+                cursor=resources.previous_cursor,
+                keyset=True,
+            )
+            self.assertTrue(resources.has_next())
+            self.assertEqual(list(resources), page)
+        self.assertFalse(resources.has_previous())
+
+    def test_keyset_pagination__deep_pages_do_not_count(self):
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+        cursor = union.get_cursor_for_page_number(per_page=3, number=2)
+
+        for content_type in ContentType.objects.all():
+            ContentType.objects.get_for_id(content_type.id)
+
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+        # One keyset UNION and one query for the Articles in the slice
+        with self.assertNumQueries(2):
+            resources = paginate_resources(
+                union, per_page=3, page_ref=None, cursor=cursor, keyset=True
+            )
+            items = list(resources)
+        self.assertEqual(items, list(union[3:6]))
+
+    def test_keyset_pagination__only_for_combined_resources(self):
+        items = get_combined_articles_and_videos(self.page)
+        resources = paginate_resources(items, per_page=3, page_ref=2, keyset=True)
+        self.assertEqual(resources.number, 2)
+
+    def test_get_cursor_for_page_number(self):
+        union = get_combined_articles_and_videos(self.page, as_union=True)
+        self.assertIsNone(union.get_cursor_for_page_number(per_page=3, number=1))
+        self.assertIsNone(union.get_cursor_for_page_number(per_page=3, number=-4))
+
+        last_page = paginate_resources(union, per_page=3, page_ref=9999)
+        cursor = union.get_cursor_for_page_number(per_page=3, number=9999)
+        self.assertEqual(
+            list(union.get_keyset_page(per_page=3, cursor=cursor)), list(last_page)
+        )
+
+
+class KeysetRedirectTestCase(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        self.page = Page.objects.first()
+        self.union = get_combined_articles_and_videos(self.page, as_union=True)
+
+    def test_no_page_number(self):
+        request = RequestFactory().get("/posts/", {"topic": "css"})
+        self.assertIsNone(get_keyset_redirect_url(request, self.union, per_page=3))
+
+    def test_not_combined_resources(self):
+        request = RequestFactory().get("/posts/", {"page": "2"})
+        self.assertIsNone(get_keyset_redirect_url(request, [], per_page=3))
+
+    def test_first_page(self):
+        request = RequestFactory().get("/posts/", {"page": "1"})
+        self.assertEqual(
+            get_keyset_redirect_url(request, self.union, per_page=3), "/posts/"
+        )
+
+    def test_later_page__keeps_other_params(self):
+        request = RequestFactory().get("/posts/", {"page": "2", "topic": "css"})
+        cursor = self.union.get_cursor_for_page_number(per_page=3, number=2)
+        self.assertEqual(
+            get_keyset_redirect_url(request, self.union, per_page=3),
+            f"/posts/?topic=css&cursor={cursor}",
+        )
+
+    @override_settings(KEYSET_PAGINATION=True)
+    def test_listing_page_redirects(self):
+        articles_page = Articles.objects.first()
+        response = self.client.get(articles_page.url, {"page": "2"})
+        self.assertEqual(response.status_code, 301)
+        self.assertIn("?cursor=", response["Location"])
+
+        response = self.client.get(response["Location"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context["resources"], KeysetPage)
+        self.assertTrue(response.context["resources"].has_previous())
+
+    @override_settings(KEYSET_PAGINATION=True)
+    def test_listing_page__malformed_cursor(self):
+        articles_page = Articles.objects.first()
+        for cursor in (
+            encode_cursor((12, 3, "not a date")),
+            encode_cursor((2 ** 31, 3, "2020-02-29")),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(articles_page.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context["resources"].has_previous())
+
 
 class BasePageFormTestCase(TestCase):
     @classmethod
@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page
+
+from ...articles.models import Article
+from ...taskqueue.tasks import selectively_invalidate_cdn
+from ...topics.models import Topic
+from .. import response_cache
+
+
+@override_settings(CONDITIONAL_GET=True)
+class ConditionalGetTests(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_validators_are_set(self):
+        response = self.client.get("/posts/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("GMT", response["Last-Modified"])
+
+        # Stable while nothing changes
+        response = self.client.get("/posts/")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_none_match_answered_without_rendering(self):
+        etag = self.client.get("/posts/")["ETag"]
+
+        # Only those to route the request to the page and check it's public
+        with self.assertNumQueries(5):
+            response = self.client.get("/posts/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get("/posts/")["Last-Modified"]
+        response = self.client.get("/posts/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_etag(self):
+        self.client.get("/posts/")
+        response = self.client.get("/posts/", HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_publishing_a_dependency_changes_etag(self):
+        etag = self.client.get("/posts/")["ETag"]
+        article = Article.objects.get(pk=8)
+        article.title = "A new title"
+        article.save_revision().publish()
+
+        response = self.client.get("/posts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_publishing_an_unrelated_page_keeps_etag(self):
+        etag = self.client.get("/events/")["ETag"]
+        Article.objects.get(pk=8).save_revision().publish()
+
+        response = self.client.get("/events/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_publishing_a_menu_page_changes_etag(self):
+        etag = self.client.get("/events/")["ETag"]
+        topic = Topic.objects.get(title="CSS")
+        topic.title = "Cascading Style Sheets"
+        topic.save_revision().publish()
+
+        response = self.client.get("/events/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn")
+    def test_past_event_cutoff_moving_changes_etag(self, mock_invalidate_cdn):
+        events_etag = self.client.get("/events/")["ETag"]
+        posts_etag = self.client.get("/posts/")["ETag"]
+        selectively_invalidate_cdn()
+
+        response = self.client.get("/events/", HTTP_IF_NONE_MATCH=events_etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/posts/", HTTP_IF_NONE_MATCH=posts_etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_publishing_while_rendering_stores_no_validator(self):
+        article = Article.objects.get(pk=8)
+        serve = Page.serve
+
+        def serve_and_publish(page, *args, **kwargs):
+            response = serve(page, *args, **kwargs)
+            # Published by someone else, after the listing was loaded
+            response_cache.invalidate_pages([article])
+            return response
+
+        with mock.patch.object(Page, "serve", serve_and_publish):
+            response = self.client.get("/posts/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+        etag = self.client.get("/posts/")["ETag"]
+        response = self.client.get("/posts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_for_requests_with_a_session(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+        self.assertNotIn("ETag", self.client.get("/posts/"))
+
+    @override_settings(KEYSET_PAGINATION=True)
+    def test_redirects_are_not_given_validators(self):
+        response = self.client.get("/posts/?page=2")
+        self.assertEqual(response.status_code, 301)
+        self.assertNotIn("ETag", response)
+
+    @override_settings(CONDITIONAL_GET=False)
+    def test_disabled(self):
+        self.assertNotIn("ETag", self.client.get("/posts/"))
+
+    @override_settings(RESPONSE_CACHE=True)
+    def test_response_cache_hits_answer_conditional_requests(self):
+        etag = self.client.get("/posts/")["ETag"]
+        response = self.client.get("/posts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
@@ -3,9 +3,16 @@ from unittest import mock
 from django.core.cache import cache
 from django.test import TestCase
 
+from wagtail.core.models import Page
+
 from developerportal import context_processors
 
+from ...articles.models import Articles
+from ...events.models import Events
+from ...people.models import People
 from ...topics.models import Topics
+from .. import directory, wagtail_hooks
+from ..directory import DirectoryPage
 
 
 class ContextProcessorsTestCase(TestCase):
@@ -38,3 +45,116 @@ class ContextProcessorsTestCase(TestCase):
             {"TOPICS_TITLE_LABEL": "Topics"},
         )
         self.assertIsNone(cache.get(Topics.CACHE_KEY_TOPICS_TITLE))
+
+
+class DirectoryPagesTestCase(TestCase):
+
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def _get_directory_pages(self):
+        return context_processors.directory_pages(request=mock.Mock())[
+            "directory_pages"
+        ]
+
+    def test_directory_pages(self):
+        # One query per page, plus one for Wagtail's site root paths
+        with self.assertNumQueries(5):
+            pages = self._get_directory_pages()
+        self.assertEqual(
+            pages,
+            {
+                "articles": DirectoryPage(
+                    id=Articles.objects.get().pk, url="/posts/", title="Posts"
+                ),
+                "events": DirectoryPage(
+                    id=Events.objects.get().pk, url="/events/", title="Events"
+                ),
+                "people": DirectoryPage(
+                    id=People.objects.get().pk,
+                    url="/communities/people/",
+                    title="People",
+                ),
+                "topics": DirectoryPage(
+                    id=Topics.objects.get().pk,
+                    url="/topics/",
+                    title="Products & Technologies",
+                ),
+            },
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_directory_pages(), pages)
+
+    def test_directory_pages__shared_cache(self):
+        pages = self._get_directory_pages()
+
+        # Another process, with nothing cached locally, uses the shared cache
+        with mock.patch.dict(directory._local, {"version": None, "pages": None}):
+            with self.assertNumQueries(0):
+                self.assertEqual(self._get_directory_pages(), pages)
+
+    def test_directory_pages__missing_page(self):
+        People.objects.all().delete()
+        pages = self._get_directory_pages()
+        self.assertIsNone(pages["people"])
+        self.assertEqual(pages["articles"].url, "/posts/")
+
+    def test_publish_invalidates(self):
+        self._get_directory_pages()
+
+        articles = Articles.objects.get()
+        articles.title = "Articles"
+        articles.save_revision().publish()
+
+        self.assertEqual(self._get_directory_pages()["articles"].title, "Articles")
+
+    def test_unpublish_invalidates(self):
+        self._get_directory_pages()
+        Events.objects.get().unpublish()
+        self.assertIsNone(self._get_directory_pages()["events"])
+
+    def test_publish_ancestor_invalidates(self):
+        self._get_directory_pages()
+
+        communities = Page.objects.get(url_path="/home/communities/").specific
+        communities.slug = "community"
+        communities.save_revision().publish()
+
+        self.assertEqual(
+            self._get_directory_pages()["people"].url, "/community/people/"
+        )
+
+    def test_publish_other_page_does_not_invalidate(self):
+        self._get_directory_pages()
+        version = cache.get(directory.CACHE_KEY_DIRECTORY_PAGES_VERSION)
+
+        article = Articles.objects.get().get_children().first().specific
+        article.save_revision().publish()
+
+        self.assertEqual(
+            cache.get(directory.CACHE_KEY_DIRECTORY_PAGES_VERSION), version
+        )
+
+    def test_move_invalidates(self):
+        self._get_directory_pages()
+
+        people = People.objects.get()
+        people.move(Page.objects.get(url_path="/home/"), pos="last-child")
+        self.assertEqual(
+            self._get_directory_pages()["people"].url, "/communities/people/"
+        )
+
+        # The admin runs the after_move_page hooks after moving the page
+        wagtail_hooks.move_directory_page(request=mock.Mock(), page=people)
+        self.assertEqual(self._get_directory_pages()["people"].url, "/people/")
+
+    def test_delete_invalidates(self):
+        self._get_directory_pages()
+        Topics.objects.get().delete()
+        self.assertIsNone(self._get_directory_pages()["topics"])
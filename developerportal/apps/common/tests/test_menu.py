@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from wagtail.core.models import Page, Site
+
+from .. import wagtail_hooks
+from ..menu import CACHE_KEY_MENU, affects_menu, build_menu, get_menu, invalidate_menu
+
+
+class MenuTests(TestCase):
+
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+        self.site = Site.objects.get()
+        self.cache_key = CACHE_KEY_MENU.format(site_id=self.site.pk)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_build_menu(self):
+        menu = build_menu(self.site.root_page)
+        self.assertEqual(
+            [(item["title"], item["url"]) for item in menu],
+            [
+                ("Products & Technologies", "/topics/"),
+                ("Posts", "/posts/"),
+                ("Events", "/events/"),
+                ("Communities", "/communities/"),
+            ],
+        )
+        topics = menu[0]
+        self.assertEqual(topics["resource_type"], "topics")
+        self.assertEqual(
+            [child["title"] for child in topics["children"]], ["CSS", "JavaScript"]
+        )
+        css = topics["children"][0]
+        self.assertEqual(css["url"], "/topics/css/")
+        self.assertIsNone(css["icon_url"])
+        self.assertEqual(css["children"], [])
+        self.assertEqual([child["title"] for child in menu[3]["children"]], ["People"])
+
+    def test_build_menu__excludes_children_of_pages_not_in_menu(self):
+        Page.objects.filter(title="Products & Technologies").update(show_in_menus=False)
+        menu = build_menu(self.site.root_page)
+        self.assertNotIn("CSS", str(menu))
+
+    def test_get_menu__cached(self):
+        menu = get_menu(self.site)
+        self.assertEqual(cache.get(self.cache_key), menu)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_menu(self.site), menu)
+
+    def test_get_menu__no_site(self):
+        self.assertEqual(get_menu(None), [])
+
+    def test_publish_invalidates(self):
+        get_menu(self.site)
+        topic = Page.objects.get(title="CSS").specific
+        topic.title = "Cascading Style Sheets"
+        topic.save_revision().publish()
+
+        self.assertIsNone(cache.get(self.cache_key))
+        self.assertIn("Cascading Style Sheets", str(get_menu(self.site)))
+
+    def test_unpublish_invalidates(self):
+        get_menu(self.site)
+        Page.objects.get(title="Events").specific.unpublish()
+        self.assertNotIn("Events", str(get_menu(self.site)))
+
+    def test_removing_from_menu_invalidates(self):
+        get_menu(self.site)
+        events = Page.objects.get(title="Events").specific
+        events.show_in_menus = False
+        events.save_revision().publish()
+        self.assertNotIn("Events", str(get_menu(self.site)))
+
+    def test_publish_page_not_in_menu_does_not_invalidate(self):
+        get_menu(self.site)
+        article = Page.objects.get(title="Posts").get_children().first().specific
+        article.save_revision().publish()
+        self.assertIsNotNone(cache.get(self.cache_key))
+
+    def test_affects_menu__page_leaving_menu(self):
+        get_menu(self.site)
+        invalidate_menu()
+        events = Page.objects.get(title="Events")
+        events.show_in_menus = False
+        # Still known to have been in the menu, even though it's been invalidated
+        self.assertTrue(affects_menu(events))
+
+    def test_move_invalidates(self):
+        get_menu(self.site)
+        wagtail_hooks.move_menu_page(request=mock.Mock(), page=mock.Mock())
+        self.assertIsNone(cache.get(self.cache_key))
+
+    def test_reorder_invalidates(self):
+        get_menu(self.site)
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        client = Client()
+        client.force_login(user)
+        events = Page.objects.get(title="Events")
+
+        response = client.post(f"/admin/pages/{events.pk}/set_position/?position=0")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(self.cache_key))
+        self.assertEqual(get_menu(self.site)[0]["title"], "Events")
+
+    def test_reorder_requires_admin_access(self):
+        get_menu(self.site)
+        events = Page.objects.get(title="Events")
+        response = Client().post(f"/admin/pages/{events.pk}/set_position/?position=0")
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNotNone(cache.get(self.cache_key))
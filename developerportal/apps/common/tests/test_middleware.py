@@ -0,0 +1,196 @@
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from wagtail.core.models import PageViewRestriction
+
+from ...articles.models import Article
+from ..middleware import (
+    PublicRequestMiddleware,
+    PublicSessionMiddleware,
+    QueryRecorder,
+    _normalise_vary,
+    get_page_label,
+    get_query_budget,
+    is_public_request,
+)
+
+
+class QueryRecorderTests(TestCase):
+    def test_records_queries(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.execute("SELECT 1")
+                cursor.execute("SELECT 2")
+
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.duplicates, 1)
+        self.assertEqual(recorder.most_repeated(), ("SELECT 1", 2))
+        self.assertIn(recorder.slowest_sql, ["SELECT 1", "SELECT 2"])
+        self.assertGreater(recorder.duration, 0)
+        # The stack for each statement points at this test
+        self.assertTrue(
+            any(
+                frame.name == "test_records_queries"
+                for frame in recorder.stacks["SELECT 2"]
+            )
+        )
+
+    def test_most_repeated__no_queries(self):
+        self.assertEqual(QueryRecorder().most_repeated(), (None, 0))
+
+
+@override_settings(
+    SQL_QUERY_BUDGETS={"default": 1000, "articles.Articles": 2},
+    SQL_INSTRUMENTATION=True,
+    SQL_INSTRUMENTATION_SERVER_TIMING=False,
+)
+class SQLBudgetMiddlewareTests(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_query_budget(self):
+        self.assertEqual(get_query_budget("articles.Articles"), 2)
+        self.assertEqual(get_query_budget("events.Events"), 1000)
+        self.assertEqual(get_query_budget(None), 1000)
+
+    def test_get_page_label(self):
+        response = self.client.get("/posts/")
+        self.assertEqual(get_page_label(response), "articles.Articles")
+        self.assertIsNone(get_page_label(mock.Mock(context_data=None)))
+
+    @mock.patch("developerportal.apps.common.middleware.logger")
+    def test_logs_queries_and_budget_warning(self, mock_logger):
+        self.client.get("/posts/")
+
+        logged = json.loads(mock_logger.info.call_args[0][0])
+        self.assertEqual(logged["event"], "sql_queries")
+        self.assertEqual(logged["path"], "/posts/")
+        self.assertEqual(logged["page_type"], "articles.Articles")
+        self.assertGreater(logged["count"], 2)
+
+        warning = mock_logger.warning.call_args[0][0]
+        self.assertIn("over its budget of 2", warning)
+        self.assertIn("First called from", warning)
+
+    @mock.patch("developerportal.apps.common.middleware.logger")
+    def test_no_warning_within_budget(self, mock_logger):
+        self.client.get("/events/")
+        assert mock_logger.info.called
+        assert not mock_logger.warning.called
+
+    def test_server_timing(self):
+        response = self.client.get("/posts/")
+        self.assertFalse(response.has_header("Server-Timing"))
+
+        with self.settings(SQL_INSTRUMENTATION_SERVER_TIMING=True):
+            response = self.client.get("/posts/")
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^sql;dur=[\d.]+;desc="\d+ queries", '
+            r'sql-duplicates;desc="\d+ duplicates", sql-slowest;dur=[\d.]+$',
+        )
+
+    @mock.patch("developerportal.apps.common.middleware.QueryRecorder")
+    def test_disabled(self, mock_recorder):
+        with self.settings(SQL_INSTRUMENTATION=False):
+            response = self.client.get("/posts/")
+        self.assertEqual(response.status_code, 200)
+        assert not mock_recorder.called
+
+
+@override_settings(PUBLIC_FAST_PATH=True)
+class PublicRequestMiddlewareTests(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_is_public_request(self):
+        factory = RequestFactory()
+        self.assertTrue(is_public_request(factory.get("/posts/")))
+        self.assertTrue(is_public_request(factory.head("/posts/")))
+        self.assertFalse(is_public_request(factory.post("/posts/")))
+        self.assertFalse(is_public_request(factory.get("/admin/pages/")))
+        self.assertFalse(is_public_request(factory.get("/auth/callback/")))
+
+        request = factory.get("/posts/")
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = "abc"
+        self.assertFalse(is_public_request(request))
+
+    def test_normalise_vary(self):
+        response = HttpResponse()
+        response["Vary"] = "Accept-Encoding, Cookie,accept-encoding, Accept-Language"
+        _normalise_vary(response)
+        self.assertEqual(response["Vary"], "Accept-Encoding, Accept-Language")
+
+        response["Vary"] = "Cookie"
+        _normalise_vary(response)
+        self.assertFalse(response.has_header("Vary"))
+
+    @mock.patch("mozilla_django_oidc.middleware.SessionRefresh.process_request")
+    def test_public_page_response_is_cookie_free(self, mock_refresh):
+        response = self.client.get("/posts/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.wsgi_request.is_public_request)
+        self.assertEqual(len(response.cookies), 0)
+        self.assertNotIn("cookie", response.get("Vary", "").lower())
+        self.assertIn("public", response["Cache-Control"])
+        assert not mock_refresh.called
+
+    @mock.patch(
+        "mozilla_django_oidc.middleware.SessionRefresh.process_request",
+        return_value=None,
+    )
+    def test_requests_with_a_session_take_the_full_path(self, mock_refresh):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+        response = self.client.get("/posts/")
+        self.assertFalse(response.wsgi_request.is_public_request)
+        self.assertIn("private", response["Cache-Control"])
+        assert mock_refresh.called
+
+    def test_storing_in_the_session_still_sets_its_cookie(self):
+        def store_in_session(request):
+            request.session["key"] = "value"
+            return HttpResponse()
+
+        middleware = PublicRequestMiddleware(PublicSessionMiddleware(store_in_session))
+        request = RequestFactory().get("/posts/")
+        response = middleware(request)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_page_with_csrf_token_sets_its_cookie(self):
+        # A password-protected page shows a form, with a CSRF token
+        PageViewRestriction.objects.create(
+            page=Article.objects.get(pk=8),
+            restriction_type=PageViewRestriction.PASSWORD,
+            password="secret",
+        )
+        response = self.client.get(
+            "/posts/faster-smarter-javascript-debugging-in-firefox/"
+        )
+        self.assertTrue(response.wsgi_request.is_public_request)
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertNotIn("public", response["Cache-Control"])
+
+    @override_settings(PUBLIC_FAST_PATH=False)
+    def test_disabled(self):
+        response = self.client.get("/posts/")
+        self.assertFalse(response.wsgi_request.is_public_request)
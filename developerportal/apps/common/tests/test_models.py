@@ -1,8 +1,16 @@
-from unittest import mock
+from io import StringIO
+from unittest import mock, skipUnless
 
+from django.core.management import call_command
 from django.test import TestCase
 
+from wagtail.core.models import Page
+
+from ...articles.models import Article
 from ...content.models import ContentPage
+from ...topics.models import Topic
+from ..models import ResourceCard
+from ..utils import get_resource_cards
 
 
 class PageBaseModelTestsUsingConcreteClass(TestCase):
@@ -21,3 +29,75 @@ class PageBaseModelTestsUsingConcreteClass(TestCase):
             page._bulk_invalidation_cache_keys = ["foo", "bar", "baz"]
             page.save()
             mock_delete_many.assert_called_once_with(["foo", "bar", "baz"])
+
+
+@skipUnless(ResourceCard.is_supported(), "ResourceCard needs Postgres")
+class ResourceCardTests(TestCase):
+    fixtures = ["common.json"]
+
+    def _live_resource_count(self):
+        return sum(
+            model.published_objects.count()
+            for model in ResourceCard.get_resource_models()
+        )
+
+    def test_rebuild(self):
+        count = ResourceCard.rebuild()
+        self.assertGreater(count, 0)
+        self.assertEqual(count, self._live_resource_count())
+        self.assertEqual(ResourceCard.objects.count(), count)
+
+        # Rebuilding again replaces, rather than duplicates, the cards
+        self.assertEqual(ResourceCard.rebuild(), count)
+        self.assertEqual(ResourceCard.objects.count(), count)
+
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command("rebuild_resource_cards", stdout=out)
+        self.assertIn(
+            "Rebuilt {} resource cards".format(self._live_resource_count()),
+            out.getvalue(),
+        )
+
+    def test_from_page(self):
+        article = Article.published_objects.first()
+        card = ResourceCard.from_page(article)
+        self.assertEqual(card.page_id, article.pk)
+        self.assertEqual(card.resource_type, "article")
+        self.assertEqual(card.date, article.date)
+        self.assertEqual(card.content_type_id, article.content_type_id)
+        self.assertEqual(
+            sorted(card.topic_ids),
+            sorted(topic.topic_id for topic in article.topics.all()),
+        )
+
+    def test_publish_and_unpublish_sync_card(self):
+        article = Article.published_objects.first()
+        self.assertFalse(ResourceCard.objects.filter(page=article).exists())
+
+        article.save_revision().publish()
+        self.assertTrue(ResourceCard.objects.filter(page=article).exists())
+
+        article.unpublish()
+        self.assertFalse(ResourceCard.objects.filter(page=article).exists())
+
+    def test_non_resource_pages_are_ignored(self):
+        page = Page.objects.get(depth=1)
+        self.assertIsNone(ResourceCard.update_for_page(page))
+        self.assertEqual(ResourceCard.objects.count(), 0)
+
+    def test_get_resource_cards(self):
+        ResourceCard.rebuild()
+        root = Page.objects.get(depth=1)
+
+        cards = get_resource_cards(root, ["article", "video"])
+        dates = [page.date for page in cards]
+        self.assertGreater(len(dates), 0)
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+        topic = Topic.published_objects.first()
+        tagged = get_resource_cards(root, ["article"], topic_pks=[topic.pk])
+        self.assertTrue(
+            all(topic.pk in [t.topic_id for t in page.topics.all()] for page in tagged)
+        )
+        self.assertEqual(len(get_resource_cards(root, ["article"], topic_pks=[])), 0)
@@ -0,0 +1,169 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page
+
+from ...articles.models import Article
+from ...taskqueue.tasks import selectively_invalidate_cdn
+from .. import response_cache
+from ..directory import invalidate_directory_pages
+from ..menu import invalidate_menu
+
+
+@override_settings(RESPONSE_CACHE=True)
+class ResponseCacheTests(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_anonymous_page_request_is_cached(self):
+        response = self.client.get("/posts/")
+        self.assertEqual(response["X-Response-Cache"], "miss")
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get("/posts/")
+        self.assertEqual(cached_response["X-Response-Cache"], "hit")
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response["Content-Type"], response["Content-Type"])
+
+        self.assertEqual(
+            response_cache.get_stats(),
+            {"hits": 1, "misses": 1, "stores": 1, "invalidations": 0},
+        )
+
+    def test_query_strings_are_cached_separately(self):
+        self.client.get("/posts/")
+        response = self.client.get("/posts/?topic=css")
+        self.assertEqual(response["X-Response-Cache"], "miss")
+
+    @override_settings(RESPONSE_CACHE=False)
+    def test_dependencies_are_recorded(self):
+        with response_cache.DependencyRecorder() as recorder:
+            self.client.get("/posts/")
+
+        self.assertIn(response_cache.page_tag(4), recorder.tags)  # The page served
+        self.assertIn(response_cache.page_tag(32), recorder.tags)  # An article in it
+        self.assertIn(response_cache.type_tag(Article), recorder.tags)
+        # The directory pages and menu are linked to on every page
+        self.assertIn(response_cache.DIRECTORY_TAG, recorder.tags)
+        self.assertIn(response_cache.MENU_TAG, recorder.tags)
+        self.assertNotIn(response_cache.EVENT_CUTOFF_TAG, recorder.tags)
+
+        # Nothing is recorded outside of a DependencyRecorder
+        response_cache.record_pages(1)
+        self.assertNotIn(response_cache.page_tag(1), recorder.tags)
+
+    def test_publishing_invalidates_dependent_responses_only(self):
+        self.client.get("/posts/")
+        self.client.get("/events/")
+
+        article = Article.objects.get(pk=8)
+        article.title = "A new title"
+        article.date = "2030-01-01"  # So it's on the first page
+        article.save_revision().publish()
+
+        response = self.client.get("/posts/")
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertContains(response, "A new title")
+        self.assertEqual(self.client.get("/events/")["X-Response-Cache"], "hit")
+        self.assertEqual(response_cache.get_stats()["invalidations"], 1)
+
+    def test_publishing_new_page_invalidates_listings_of_its_type(self):
+        self.client.get("/posts/")
+
+        posts = Page.objects.get(pk=4)
+        posts.add_child(
+            instance=Article(title="Brand new", slug="brand-new", date="2030-01-01")
+        )
+        Article.objects.get(slug="brand-new").save_revision().publish()
+
+        response = self.client.get("/posts/")
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertContains(response, "Brand new")
+
+    def test_changes_while_rendering_are_not_stored(self):
+        article = Article.objects.get(pk=8)
+        with response_cache.DependencyRecorder() as recorder:
+            response_cache.record_pages(article.pk)
+            # Published by someone else, after the article was loaded
+            response_cache.invalidate_pages([article])
+        self.assertIsNone(recorder.get_tag_versions())
+
+        with response_cache.DependencyRecorder() as recorder:
+            response_cache.record_pages(article.pk)
+        self.assertIsNotNone(recorder.get_tag_versions())
+
+    def test_menu_changes_invalidate(self):
+        self.client.get("/posts/")
+        invalidate_menu()
+        self.assertEqual(self.client.get("/posts/")["X-Response-Cache"], "miss")
+
+    def test_directory_page_changes_invalidate(self):
+        self.client.get("/posts/")
+        invalidate_directory_pages()
+        self.assertEqual(self.client.get("/posts/")["X-Response-Cache"], "miss")
+
+    @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn")
+    def test_past_event_cutoff_moving_invalidates(self, mock_invalidate_cdn):
+        self.client.get("/events/")
+        self.client.get("/posts/")
+        selectively_invalidate_cdn()
+        self.assertEqual(self.client.get("/events/")["X-Response-Cache"], "miss")
+        self.assertEqual(self.client.get("/posts/")["X-Response-Cache"], "hit")
+
+    def test_unpublishing_invalidates(self):
+        self.client.get("/posts/")
+        Article.objects.get(pk=8).unpublish()
+        self.assertEqual(self.client.get("/posts/")["X-Response-Cache"], "miss")
+
+    def test_requests_with_a_session_are_not_cached(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+        response = self.client.get("/posts/")
+        self.assertNotIn("X-Response-Cache", response)
+        self.assertEqual(response_cache.get_stats()["misses"], 0)
+
+    def test_non_page_responses_are_not_stored(self):
+        self.client.get("/robots.txt")
+        self.assertEqual(self.client.get("/robots.txt")["X-Response-Cache"], "miss")
+        self.client.get("/not-a-page/")
+        self.assertEqual(response_cache.get_stats()["stores"], 0)
+
+    def test_head_requests_use_but_do_not_store(self):
+        self.client.head("/posts/")
+        self.assertEqual(response_cache.get_stats()["stores"], 0)
+        self.client.get("/posts/")
+        self.assertEqual(self.client.head("/posts/")["X-Response-Cache"], "hit")
+
+    @override_settings(RESPONSE_CACHE=False)
+    def test_disabled(self):
+        self.assertNotIn("X-Response-Cache", self.client.get("/posts/"))
+        self.assertNotIn("X-Response-Cache", self.client.get("/posts/"))
+
+    def test_stats_command(self):
+        self.client.get("/posts/")
+        self.client.get("/posts/")
+
+        out = StringIO()
+        call_command("response_cache_stats", "--reset", stdout=out)
+        self.assertEqual(
+            json.loads(out.getvalue()),
+            {
+                "hits": 1,
+                "misses": 1,
+                "stores": 1,
+                "invalidations": 0,
+                "hit_ratio": 0.5,
+            },
+        )
+        self.assertEqual(response_cache.get_stats()["hits"], 0)
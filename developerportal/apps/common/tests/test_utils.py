@@ -1,11 +1,23 @@
 import datetime
+import json
 from unittest import mock
 
+from django.core.cache import cache
 from django.test import TestCase
 
 import pytz
+from wagtail.core.models import Page
 
-from ..utils import get_past_event_cutoff, paginate_resources
+from ...articles.models import Article
+from ...home.models import HomePage
+from ...mozimages.models import MozImage, Rendition
+from ..utils import (
+    get_combined_articles_and_videos,
+    get_past_event_cutoff,
+    paginate_resources,
+    prefetch_card_images,
+    prefetch_featured_images,
+)
 
 
 class EventCutoffTestCase(TestCase):
@@ -49,3 +61,115 @@ class HelperFunctionTests(TestCase):
         resources = paginate_resources(resources, per_page=10, page_ref="")
         self.assertEqual(repr(resources), "<Page 1 of 3>")
         self.assertEqual([x for x in resources], [x for x in range(1, 11)])
+
+
+class PrefetchCardImagesTests(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+        self.images = [
+            MozImage.objects.create(
+                title=f"Image {i}",
+                file=f"original_images/{i}.jpg",
+                width=960,
+                height=540,
+            )
+            for i in range(3)
+        ]
+        self.renditions = [
+            Rendition.objects.create(
+                image=image,
+                filter_spec="width-480",
+                focal_point_key="",
+                file=f"images/{image.pk}.width-480.jpg",
+                width=480,
+                height=270,
+            )
+            for image in self.images
+        ]
+        self.article_pks = [8, 12, 13, 14]
+        for pk, image in zip(self.article_pks, self.images):
+            Article.objects.filter(pk=pk).update(card_image=image)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_prefetch_card_images(self):
+        articles = list(Article.objects.filter(pk__in=self.article_pks))
+        with self.assertNumQueries(2):
+            articles = prefetch_card_images(articles)
+
+        with self.assertNumQueries(0):
+            renditions = {
+                article.pk: article.card_image.get_rendition("width-480")
+                for article in articles
+                if article.card_image
+            }
+        self.assertEqual(
+            renditions, {pk: r for pk, r in zip(self.article_pks, self.renditions)},
+        )
+
+    def test_prefetch_card_images__missing_rendition(self):
+        articles = prefetch_card_images(Article.objects.filter(pk=8))
+        image = articles[0].card_image
+        self.assertNotIn("fill-375x210", image.prefetched_renditions)
+
+        with mock.patch(
+            "wagtail.images.models.AbstractImage.get_rendition"
+        ) as mock_get_rendition:
+            image.get_rendition("fill-375x210")
+        mock_get_rendition.assert_called_once_with("fill-375x210")
+
+    def test_prefetch_card_images__focal_point_mismatch(self):
+        # Renditions which depend on the focal point aren't used if it has moved
+        Rendition.objects.create(
+            image=self.images[0],
+            filter_spec="fill-375x210",
+            focal_point_key="outdated",
+            file="images/outdated.jpg",
+            width=375,
+            height=210,
+        )
+        articles = prefetch_card_images(Article.objects.filter(pk=8))
+        self.assertNotIn("fill-375x210", articles[0].card_image.prefetched_renditions)
+
+    def test_prefetch_card_images__no_images(self):
+        articles = list(Article.objects.filter(pk__in=[15, 16]))
+        with self.assertNumQueries(0):
+            self.assertEqual(prefetch_card_images(articles), articles)
+
+    def test_combined_resources_prefetch_card_images(self):
+        resources = get_combined_articles_and_videos(
+            Page.objects.get(pk=4), as_union=True
+        )
+        articles = [article for article in resources[:] if article.card_image_id]
+        self.assertEqual(len(articles), 3)
+        with self.assertNumQueries(0):
+            for article in articles:
+                article.card_image.get_rendition("width-480")
+
+    def test_prefetch_featured_images(self):
+        featured_rendition = Rendition.objects.create(
+            image=self.images[0],
+            filter_spec="width-400",
+            focal_point_key="",
+            file="images/featured.width-400.jpg",
+            width=400,
+            height=225,
+        )
+        home = HomePage.objects.get(pk=3)
+        home.featured = json.dumps(
+            [{"type": "post", "value": pk} for pk in self.article_pks[:3]]
+        )
+        items = list(home.featured)
+
+        self.assertEqual(prefetch_featured_images(items), items)
+
+        with self.assertNumQueries(0):
+            articles = [item.value.specific for item in items]
+            self.assertEqual([type(article) for article in articles], [Article] * 3)
+            self.assertEqual([article.card_image for article in articles], self.images)
+            self.assertEqual(
+                articles[0].card_image.get_rendition("width-400"), featured_rendition
+            )
@@ -1,11 +1,43 @@
+import base64
+import binascii
 import datetime
+import json
+from functools import reduce
 from itertools import chain
 from operator import attrgetter
 
 from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
 from django.utils.timezone import now as tz_now
 
+from wagtail.core.blocks import StructValue
+from wagtail.core.models import Page
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+
+from .constants import PAGINATION_CURSOR_QUERYSTRING_KEY, PAGINATION_QUERYSTRING_KEY
+from .models import ResourceCard
+from .response_cache import EVENT_CUTOFF_TAG, record_page_types, record_tags
+
+# The largest page id, as they're a Postgres integer. Cursors with larger ones
+# would make Postgres raise an error, rather than match nothing.
+MAX_PAGE_ID = 2 ** 31 - 1
+
+# The image fields of a page shown on its card in molecules/cards/, with the
+# filter specs those templates render them with
+CARD_IMAGE_RENDITIONS = {"card_image": ("width-480", "fill-375x210")}
+
+# The same for pages and external links in molecules/card-featured.html
+FEATURED_IMAGE_RENDITIONS = {
+    "card_image": ("width-400",),
+    "card_image_3_2": ("width-600",),
+    "image": ("width-400",),
+    "image_3_2": ("width-600",),
+}
+
 
 def _combined_query(models, fn):
     """Execute callback `fn` for each model and chain the resulting querysets."""
@@ -17,8 +49,314 @@ def _resolve_model(model):
     return apps.get_model(model) if isinstance(model, str) else model
 
 
+class CombinedResources:
+    """A lazy, sliceable view over a UNION ALL of several models' querysets.
+
+    Only the primary key, content type and ordering column of each row are
+    selected by the combined query; ordering, LIMIT and OFFSET all happen in
+    the database. When sliced, just the selected rows are upgraded to their
+    specific page instances, with one query per content type in the slice.
+
+    This is compatible with Django's Paginator, which will call `count()` and
+    then slice out the requested page.
+    """
+
+    # Stops Paginator warning about pagination of an unordered object_list
+    ordered = True
+
+    def __init__(self, querysets, order_by, reverse=False):
+        self.order_by = order_by
+        self.reverse = reverse
+        self._querysets = [
+            # Each page can match more than once when filtering across a
+            # relation (eg topics), so de-dupe each model's rows first. Page ids
+            # are unique across all page types, so UNION ALL is then safe.
+            qs.order_by().values_list("pk", "content_type", order_by).distinct()
+            for qs in querysets
+        ]
+        self._count = None
+
+    def _get_union(self, querysets=None, reverse=None):
+        querysets = self._querysets if querysets is None else querysets
+        reverse = self.reverse if reverse is None else reverse
+        if len(querysets) == 1:
+            union = querysets[0]
+        else:
+            union = reduce(lambda a, b: a.union(b, all=True), querysets)
+
+        # Include the pk so pages with the same date are consistently ordered
+        # across requests, which matters when we only fetch one slice at a time
+        direction = "-" if reverse else ""
+        return union.order_by(f"{direction}{self.order_by}", f"{direction}pk")
+
+    def _get_keyset_rows(self, limit, value=None, pk=None, forwards=True):
+        """Return up to `limit` rows that follow the (value, pk) key, in listing
+        order if `forwards`, else the rows that precede it, nearest first.
+
+        This seeks straight to the key using the (order_by, pk) ordering, so
+        unlike slicing it costs the same however deep into the listing it is.
+        """
+        # Going backwards through a descending listing means ascending order
+        descending = self.reverse == forwards
+        querysets = self._querysets
+        if value is not None:
+            op = "lt" if descending else "gt"
+            after_key = Q(**{f"{self.order_by}__{op}": value}) | Q(
+                **{self.order_by: value, f"pk__{op}": pk}
+            )
+            querysets = [qs.filter(after_key) for qs in querysets]
+        return list(self._get_union(querysets, reverse=descending)[:limit])
+
+    def get_keyset_page(self, per_page, cursor=None):
+        """Return the KeysetPage of `per_page` resources that the given cursor
+        points to, or the first page if the cursor is missing or invalid."""
+        key = decode_cursor(cursor)
+        value, pk, forwards = key if key else (None, None, True)
+
+        rows = (
+            self._get_keyset_rows(per_page + 1, value, pk, forwards)
+            if self._querysets
+            else []
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if not forwards:
+            rows.reverse()
+
+        return KeysetPage(
+            self._get_specific_pages(rows),
+            has_previous=(has_more if not forwards else key is not None),
+            has_next=(has_more if forwards else key is not None),
+            previous_cursor=encode_cursor(rows[0], forwards=False) if rows else None,
+            next_cursor=encode_cursor(rows[-1], forwards=True) if rows else None,
+        )
+
+    def get_cursor_for_page_number(self, per_page, number):
+        """Return the cursor equivalent to page `number` of an offset-paginated
+        listing, or None for the first page. Out-of-range pages get the cursor
+        for the last page, the same as paginate_resources."""
+        if number <= 1 or not self._querysets:
+            return None
+        # The cursor for page N points after the last row of page N - 1
+        offset = (number - 1) * per_page
+        rows = list(self._get_union()[slice(offset - 1, offset)])
+        if not rows:
+            offset = (max(self.count() - 1, 0) // per_page) * per_page
+            if not offset:
+                return None
+            rows = list(self._get_union()[slice(offset - 1, offset)])
+        return encode_cursor(rows[0], forwards=True)
+
+    def count(self):
+        if self._count is None:
+            if not self._querysets:
+                self._count = 0
+            else:
+                self._count = self._get_union().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        return self.count() > 0
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            results = self[slice(key, key + 1)]
+            if not results:
+                raise IndexError("CombinedResources index out of range")
+            return results[0]
+
+        if not self._querysets:
+            return []
+        rows = list(self._get_union()[key])
+        return self._get_specific_pages(rows)
+
+    def _get_specific_pages(self, rows):
+        """Return specific page instances for the given (pk, content_type, ...)
+        rows, in the same order as the rows, with their card images prefetched."""
+        pages = _get_specific_pages_by_pk([(pk, ct) for pk, ct, _ in rows])
+        return prefetch_card_images([pages[pk] for pk, _, _ in rows if pk in pages])
+
+
+def _get_specific_pages_by_pk(pks_and_content_types):
+    """Return a dict of specific page instances for the given (pk, content_type)
+    pairs, with one query per content type."""
+    pks_by_content_type = {}
+    for pk, content_type_id in pks_and_content_types:
+        pks_by_content_type.setdefault(content_type_id, []).append(pk)
+
+    pages = {}
+    for content_type_id, pks in pks_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        pages.update(model.objects.in_bulk(pks))
+    return pages
+
+
+def prefetch_renditions(images, filter_specs):
+    """Fetch the renditions of all of the given images for all of the given
+    filter specs in one query, and attach them to the images so that
+    MozImage.get_rendition (and so the {% image %} tag) uses them instead of
+    looking each one up. Renditions that don't exist yet aren't created here;
+    that still happens the first time each is rendered."""
+    images = {image.pk: image for image in images if image is not None}
+    if not images:
+        return
+
+    filters = [Filter(spec=spec) for spec in filter_specs]
+    Rendition = get_image_model().get_rendition_model()
+    renditions = {}
+    for rendition in Rendition.objects.filter(
+        image_id__in=images, filter_spec__in=[f.spec for f in filters]
+    ):
+        key = (rendition.image_id, rendition.filter_spec, rendition.focal_point_key)
+        renditions[key] = rendition
+
+    for image in images.values():
+        for _filter in filters:
+            key = (image.pk, _filter.spec, _filter.get_cache_key(image))
+            if key in renditions:
+                rendition = renditions[key]
+                rendition.image = image
+                image.prefetched_renditions[_filter.spec] = rendition
+
+
+def prefetch_card_images(pages, renditions=CARD_IMAGE_RENDITIONS):
+    """For a listing of pages, fetch the images their cards show and those
+    images' renditions in two queries, rather than two per card.
+
+    Params:
+        pages - an iterable of specific page instances.
+        renditions - a dict of image field name: filter specs to prefetch.
+
+    Returns the pages as a list, for convenience.
+    """
+    pages = list(pages)
+    image_ids = {
+        getattr(page, f"{field}_id", None) for page in pages for field in renditions
+    }
+    image_ids.discard(None)
+    if not image_ids:
+        return pages
+
+    images = get_image_model().objects.in_bulk(image_ids)
+    for page in pages:
+        for field in renditions:
+            image_id = getattr(page, f"{field}_id", None)
+            if image_id in images:
+                setattr(page, field, images[image_id])
+
+    prefetch_renditions(
+        images.values(), {spec for specs in renditions.values() for spec in specs}
+    )
+    return pages
+
+
+def prefetch_featured_images(items):
+    """For the items of a `featured` StreamField, upgrade any pages to their
+    specific types, and fetch the images and renditions that
+    molecules/card-featured.html will show for them and for external links.
+
+    Returns the items, so this can be used as a template filter.
+    """
+    pages = [item.value for item in items if isinstance(item.value, Page)]
+    specific_pages = _get_specific_pages_by_pk(
+        [(page.pk, page.content_type_id) for page in pages]
+    )
+    for page in pages:
+        if page.pk in specific_pages:
+            # Page.specific is a cached_property, so this is what it will return
+            page.specific = specific_pages[page.pk]
+    prefetch_card_images(specific_pages.values(), FEATURED_IMAGE_RENDITIONS)
+
+    prefetch_renditions(
+        [
+            item.value.get(field)
+            for item in items
+            if isinstance(item.value, StructValue)
+            for field in ("image", "image_3_2")
+        ],
+        {spec for specs in FEATURED_IMAGE_RENDITIONS.values() for spec in specs},
+    )
+    return items
+
+
+class KeysetPage:
+    """One page of a keyset- (cursor-) paginated CombinedResources.
+
+    It offers the parts of django.core.paginator.Page used by our templates,
+    plus the cursors for the neighbouring pages. There's no page number or page
+    count because working those out is what keyset pagination avoids.
+    """
+
+    def __init__(
+        self, object_list, has_previous, has_next, previous_cursor, next_cursor
+    ):
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+        self.previous_cursor = previous_cursor if has_previous else None
+        self.next_cursor = next_cursor if has_next else None
+
+    def __repr__(self):
+        return "<KeysetPage: {} items>".format(len(self))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, key):
+        return self.object_list[key]
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+
+def encode_cursor(row, forwards=True):
+    """Turn a (pk, content_type, value) row from CombinedResources into an opaque,
+    URL-safe cursor pointing after (or, if not `forwards`, before) that row."""
+    pk, _, value = row
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    payload = json.dumps([value, pk, int(forwards)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the (date, pk, forwards) key from a cursor made by
+    encode_cursor, or None if it is missing or malformed, so the first page
+    is served instead. Listings are all ordered by date, so one which isn't
+    is malformed, too."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, pk, forwards = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = datetime.date.fromisoformat(value), int(pk), bool(forwards)
+    except (binascii.Error, TypeError, ValueError):
+        return None
+    if not 1 <= key[1] <= MAX_PAGE_ID:
+        return None
+    return key
+
+
 def get_resources(
-    page, models, filters=None, q_object=None, order_by=None, reverse=False
+    page,
+    models,
+    filters=None,
+    q_object=None,
+    order_by=None,
+    reverse=False,
+    as_union=False,
 ):
     """Get resources for provided models matching filters.
 
@@ -29,18 +367,71 @@ def get_resources(
         q_object - optional way to run a more complex query
         order_by - key to order the combined set by, must be common to all models.
         reverse - whether to reverse the combined set, default false.
+        as_union - if True, return a lazy CombinedResources object that combines,
+            orders and slices the resources in the database, rather than a list.
     """
 
     def callback(model):
         qs = model.published_objects
         if q_object:
             qs = qs.filter(q_object)
-        return qs.filter(**filters).not_page(page).specific()
+        return qs.filter(**(filters or {})).not_page(page)
 
-    result = _combined_query(models, callback)
+    if as_union:
+        querysets = [callback(_resolve_model(model)) for model in models]
+        return CombinedResources(querysets, order_by=order_by, reverse=reverse)
+
+    result = _combined_query(models, lambda model: callback(model).specific())
     return sorted(set(result), key=attrgetter(order_by), reverse=reverse)
 
 
+def use_resource_cards():
+    """Return True if listings are to be served from the ResourceCard index:
+    if settings.RESOURCE_CARD_LISTINGS is on, and the database supports it. On
+    other databases the index is left empty, so the listings combine each
+    resource model's queryset instead."""
+    return settings.RESOURCE_CARD_LISTINGS and ResourceCard.is_supported()
+
+
+def get_resource_cards(
+    page, resource_types, topic_pks=None, q_object=None, reverse=True, **filters
+):
+    """Get resources of the given resource_types from the ResourceCard index,
+    as a lazy CombinedResources object ordered by date.
+
+    Params:
+        page - the current page, used to exclude from queries.
+        resource_types - a list of resource_type values, eg ["article", "video"]
+        topic_pks - optional list of Topic ids, any one of which must be tagged.
+        q_object - optional way to run a more complex query on ResourceCard.
+        filters - optional ResourceCard queryset filters.
+        reverse - whether to order by most recent first, default true.
+    """
+    record_page_types(
+        *[
+            model
+            for model in ResourceCard.get_resource_models()
+            if model.resource_type in resource_types
+        ]
+    )
+    qs = ResourceCard.objects.filter(resource_type__in=resource_types)
+    if topic_pks is not None:
+        qs = qs.filter(topic_ids__overlap=list(topic_pks))
+    if q_object:
+        qs = qs.filter(q_object)
+    qs = qs.filter(**filters).exclude(page=page)
+    return CombinedResources([qs], order_by="date", reverse=reverse)
+
+
+def get_topic_pks(topic_slugs):
+    """Return the ids of the Topics with the given slugs, or None if there are
+    no slugs, suitable for passing to get_resource_cards as `topic_pks`."""
+    if not topic_slugs:
+        return None
+    Topic = apps.get_model("topics.Topic")
+    return list(Topic.objects.filter(slug__in=topic_slugs).values_list("pk", flat=True))
+
+
 def get_combined_articles(page, **filters):
     """Get internal and external articles matching filters."""
     return get_resources(
@@ -52,7 +443,7 @@ def get_combined_articles(page, **filters):
     )
 
 
-def get_combined_articles_and_videos(page, q_object=None, **filters):
+def get_combined_articles_and_videos(page, q_object=None, as_union=False, **filters):
     """Get internal and external articles and videos matching filters."""
     return get_resources(
         page,
@@ -66,10 +457,11 @@ def get_combined_articles_and_videos(page, q_object=None, **filters):
         q_object=q_object,
         order_by="date",
         reverse=True,
+        as_union=as_union,
     )
 
 
-def get_combined_events(page, reverse=False, q_object=None, **filters):
+def get_combined_events(page, reverse=False, q_object=None, as_union=False, **filters):
     """Get internal and external events matching filters."""
 
     return get_resources(
@@ -79,6 +471,7 @@ def get_combined_events(page, reverse=False, q_object=None, **filters):
         q_object=q_object,
         order_by="start_date",
         reverse=reverse,
+        as_union=as_union,
     )
 
 
@@ -96,10 +489,21 @@ def get_combined_videos(page, **filters):
 def get_past_event_cutoff():
     # A safe datetime that defines when 'past' has happened
     # so we don't stop showing events too soon
+    record_tags(EVENT_CUTOFF_TAG)
     return (tz_now() - datetime.timedelta(days=1)).date()
 
 
-def paginate_resources(resources, per_page, page_ref):
+def paginate_resources(resources, per_page, page_ref, cursor=None, keyset=False):
+    """Return the requested page of the given resources.
+
+    If `keyset` is True and `resources` is a CombinedResources, the page is
+    found from the (date, page id) `cursor` rather than the `page_ref` page
+    number, and will be a KeysetPage instead of a Paginator page. See
+    get_keyset_redirect_url for how page numbers are turned into cursors.
+    """
+    if keyset and isinstance(resources, CombinedResources):
+        return resources.get_keyset_page(per_page, cursor=cursor)
+
     paginator = Paginator(resources, per_page)
     try:
         resources = paginator.page(page_ref)
@@ -110,4 +514,33 @@ def paginate_resources(resources, per_page, page_ref):
         # ie, `page_ref` is None or there's bad input
         resources = paginator.page(1)
 
+    if not isinstance(resources.object_list, list):
+        # Slices of CombinedResources will already have been done
+        resources.object_list = prefetch_card_images(resources.object_list)
     return resources
+
+
+def get_keyset_redirect_url(request, resources, per_page):
+    """For a request with a page-number querystring, return the URL of the same
+    listing using the equivalent keyset pagination cursor, so that existing
+    `?page=N` links keep working. Returns None if there's no page number, or if
+    `resources` doesn't support keyset pagination."""
+    if PAGINATION_QUERYSTRING_KEY not in request.GET:
+        return None
+    if not isinstance(resources, CombinedResources):
+        return None
+
+    try:
+        number = int(request.GET[PAGINATION_QUERYSTRING_KEY])
+    except ValueError:
+        number = 1
+
+    params = request.GET.copy()
+    del params[PAGINATION_QUERYSTRING_KEY]
+    params.pop(PAGINATION_CURSOR_QUERYSTRING_KEY, None)
+    cursor = resources.get_cursor_for_page_number(per_page, number)
+    if cursor:
+        params[PAGINATION_CURSOR_QUERYSTRING_KEY] = cursor
+
+    querystring = params.urlencode()
+    return f"{request.path}?{querystring}" if querystring else request.path
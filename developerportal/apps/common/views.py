@@ -0,0 +1,26 @@
+from django.shortcuts import render
+
+from wagtail.admin.auth import require_admin_access
+from wagtail.admin.views.pages import set_page_position as wagtail_set_page_position
+
+from .cache_policy import get_cache_policies
+from .menu import invalidate_menu
+
+
+@require_admin_access
+def set_page_position(request, page_to_move_id):
+    """Wagtail's view for reordering pages in the admin, which has no hook or
+    signal of its own, so that we can rebuild the menu afterwards"""
+    response = wagtail_set_page_position(request, page_to_move_id)
+    if request.method == "POST":
+        invalidate_menu()
+    return response
+
+
+def cache_policies(request):
+    """List the Cache-Control policy in effect for each page type"""
+    policies = [
+        (page_class._meta, policy, overridden)
+        for page_class, policy, overridden in get_cache_policies()
+    ]
+    return render(request, "common/cache_policies.html", {"policies": policies})
@@ -1,11 +1,23 @@
 # pylint: disable=no-member
+from django.conf.urls import url
 from django.contrib.staticfiles.templatetags.staticfiles import static
+from django.db.models.signals import post_delete
+from django.urls import reverse
 from django.utils.html import escape, format_html
 
 import wagtail.admin.rich_text.editors.draftail.features as draftail_features
+from wagtail.admin.menu import MenuItem
 from wagtail.admin.rich_text.converters.html_to_contentstate import BlockElementHandler
 from wagtail.core import hooks
+from wagtail.core.models import Page
 from wagtail.core.rich_text import LinkHandler
+from wagtail.core.signals import page_published, page_unpublished
+
+from .directory import affects_directory_pages, invalidate_directory_pages
+from .menu import affects_menu, invalidate_menu
+from .models import ResourceCard
+from .response_cache import invalidate_pages
+from .views import cache_policies
 
 
 class NewWindowExternalLinkHandler(LinkHandler):
@@ -76,3 +88,77 @@ def global_admin_css():
     return format_html(
         '<link rel="stylesheet" href="{}">', static("css/admin_extras.css")
     )
+
+
+def update_resource_card(sender, instance, **kwargs):
+    """Keep the ResourceCard index in step with the live version of the page.
+
+    Deleted pages take their ResourceCard with them, via the cascade on
+    ResourceCard.page."""
+    if instance is not None:
+        ResourceCard.update_for_page(instance)
+
+
+page_published.connect(update_resource_card)
+page_unpublished.connect(update_resource_card)
+
+
+def update_directory_pages(sender, instance, **kwargs):
+    if instance is not None and affects_directory_pages(instance):
+        invalidate_directory_pages()
+
+
+page_published.connect(update_directory_pages)
+page_unpublished.connect(update_directory_pages)
+# Only for Page, as receivers for any sender stop Django from deleting related
+# rows (such as ResourceCards) in bulk
+post_delete.connect(update_directory_pages, sender=Page)
+
+
+@hooks.register("after_move_page")
+def move_directory_page(request, page):
+    update_directory_pages(sender=type(page), instance=page)
+
+
+def update_menu(sender, instance, **kwargs):
+    if instance is not None and affects_menu(instance):
+        invalidate_menu()
+
+
+page_published.connect(update_menu)
+page_unpublished.connect(update_menu)
+post_delete.connect(update_menu, sender=Page)
+
+
+@hooks.register("after_move_page")
+def move_menu_page(request, page):
+    # A move can take a page into or out of the menu from any depth
+    invalidate_menu()
+
+
+def invalidate_cached_responses(sender, instance, **kwargs):
+    if instance is not None:
+        invalidate_pages([instance])
+
+
+page_published.connect(invalidate_cached_responses)
+page_unpublished.connect(invalidate_cached_responses)
+post_delete.connect(invalidate_cached_responses, sender=Page)
+
+
+@hooks.register("after_move_page")
+def move_cached_responses(request, page):
+    # Moving a page changes the URLs of all of its descendants, too
+    invalidate_pages(page.get_descendants(inclusive=True))
+
+
+@hooks.register("register_admin_urls")
+def register_cache_policies_url():
+    return [url(r"^cache-policies/$", cache_policies, name="cache_policies")]
+
+
+@hooks.register("register_settings_menu_item")
+def register_cache_policies_menu_item():
+    return MenuItem(
+        "Cache policies", reverse("cache_policies"), classnames="icon icon-time"
+    )
@@ -3,6 +3,7 @@ import datetime
 import logging
 from typing import List
 
+from django.conf import settings
 from django.db.models import (
     CASCADE,
     SET_NULL,
@@ -14,8 +15,9 @@ from django.db.models import (
     TextField,
     URLField,
 )
+from django.http import HttpResponsePermanentRedirect
 
-from django_countries.fields import CountryField
+from django_countries.fields import Country, CountryField
 from modelcluster.contrib.taggit import ClusterTaggableManager
 from modelcluster.fields import ParentalKey
 from taggit.models import TaggedItemBase
@@ -34,9 +36,11 @@ from wagtail.core.models import Orderable
 from wagtail.images.edit_handlers import ImageChooserPanel
 
 from ..common.blocks import AgendaItemBlock, ExternalSpeakerBlock, FeaturedExternalBlock
+from ..common.cache_policy import SHORT_LIVED_POLICY
 from ..common.constants import (
     COUNTRY_QUERYSTRING_KEY,
     DATE_PARAMS_QUERYSTRING_KEY,
+    PAGINATION_CURSOR_QUERYSTRING_KEY,
     PAGINATION_QUERYSTRING_KEY,
     PAST_EVENTS_QUERYSTRING_VALUE,
     RICH_TEXT_FEATURES_SIMPLE,
@@ -46,8 +50,12 @@ from ..common.fields import CustomStreamField
 from ..common.models import BasePage
 from ..common.utils import (
     get_combined_events,
+    get_keyset_redirect_url,
     get_past_event_cutoff,
+    get_resource_cards,
+    get_topic_pks,
     paginate_resources,
+    use_resource_cards,
 )
 from ..topics.models import Topic
 
@@ -85,6 +93,8 @@ class Events(BasePage):
     parent_page_types = ["home.HomePage"]
     subpage_types = ["events.Event"]
     template = "events.html"
+    # Lists upcoming events, which change as time passes
+    cache_policy = SHORT_LIVED_POLICY
 
     # Content fields
     featured = StreamField(
@@ -165,6 +175,17 @@ class Events(BasePage):
         # Allow only one instance of this page type
         return super().can_create_at(parent) and not cls.objects.exists()
 
+    def serve(self, request, *args, **kwargs):
+        if settings.KEYSET_PAGINATION:
+            redirect_url = get_keyset_redirect_url(
+                request,
+                self.get_unpaginated_events(request),
+                per_page=self.EVENTS_PER_PAGE,
+            )
+            if redirect_url:
+                return HttpResponsePermanentRedirect(redirect_url)
+        return super().serve(request, *args, **kwargs)
+
     def get_context(self, request):
         context = super().get_context(request)
         context["filters"] = self.get_filters()
@@ -205,7 +226,7 @@ class Events(BasePage):
             return []
         return [tuple(x.split("-")) for x in [y for y in year_months if y]]
 
-    def _build_date_q(self, date_params):
+    def _build_date_q(self, date_params, date_field="start_date"):
         """Suport filtering events by selected year-month pair(s) and/or an
         'all past events' Boolean.
 
@@ -215,6 +236,8 @@ class Events(BasePage):
             date_params: List(str) -- list of strings representing selected
             dates in the filtering panel, where each string is either in YYYY-MM format
             or the sentinel string PAST_EVENTS_QUERYSTRING_VALUE.
+            date_field: str -- the name of the field holding the event's start
+            date, eg "date" when querying ResourceCards.
 
         Returns:
             django.models.QuerySet -- configured QuerySet based on arguments.
@@ -229,7 +252,7 @@ class Events(BasePage):
         )
 
         if past_events_flag:
-            default_events_q = Q(start_date__lte=get_past_event_cutoff())
+            default_events_q = Q(**{f"{date_field}__lte": get_past_event_cutoff()})
         else:
             default_events_q = Q()  # Because we don't need to restrict
 
@@ -242,8 +265,8 @@ class Events(BasePage):
 
         try:
             for year, month in years_and_months_tuples:
-                date_q = Q(**{"start_date__year": year})
-                date_q.add(Q(**{"start_date__month": month}), Q.AND)
+                date_q = Q(**{f"{date_field}__year": year})
+                date_q.add(Q(**{f"{date_field}__month": month}), Q.AND)
 
                 if overall_date_q is None:
                     overall_date_q = date_q
@@ -261,7 +284,7 @@ class Events(BasePage):
             # "past events" has been selected, we want to include all events
             # UP TO the past/future threshold date but _without_ de-scoping
             # whatever the other dates may have configured.
-            all_past_events_q = Q(start_date__lte=get_past_event_cutoff())
+            all_past_events_q = Q(**{f"{date_field}__lte": get_past_event_cutoff()})
 
             overall_date_q.add(all_past_events_q, Q.OR)  # NB: OR
         else:
@@ -269,11 +292,11 @@ class Events(BasePage):
             # ensure we don't include past events here (ie, same month as
             # selected dates, but before _today_)
             overall_date_q.add(
-                Q(start_date__gte=get_past_event_cutoff()), Q.AND
+                Q(**{f"{date_field}__gte": get_past_event_cutoff()}), Q.AND
             )  # NB: AND
         return overall_date_q
 
-    def get_events(self, request):
+    def get_unpaginated_events(self, request):
         """Return filtered future events in chronological order"""
 
         countries = request.GET.getlist(COUNTRY_QUERYSTRING_KEY)
@@ -283,36 +306,59 @@ class Events(BasePage):
         countries_q = Q(country__in=countries) if countries else Q()
         topics_q = Q(topics__topic__slug__in=topics) if topics else Q()
 
+        # The ResourceCard index keeps event start dates in its `date` field
+        date_field = "date" if use_resource_cards() else "start_date"
+
         # date_params need splitting to make them work, plus we need to see if
         # past events are also needed
-        date_q = self._build_date_q(date_params)
+        date_q = self._build_date_q(date_params, date_field=date_field)
 
         combined_q = Q()
         if countries_q:
             combined_q.add(countries_q, Q.AND)
         if date_q:
             combined_q.add(date_q, Q.AND)
-        if topics_q:
-            combined_q.add(topics_q, Q.AND)
 
-        # Combined_q will always have something because it includes
-        # the start_date__gte test
-        events = get_combined_events(self, reverse=True, q_object=combined_q)
+        if use_resource_cards():
+            events = get_resource_cards(
+                self,
+                ["event"],
+                topic_pks=get_topic_pks(topics),
+                q_object=combined_q,
+                reverse=True,
+            )
+        else:
+            if topics_q:
+                combined_q.add(topics_q, Q.AND)
+
+            # Combined_q will always have something because it includes
+            # the start_date__gte test
+            events = get_combined_events(
+                self, reverse=True, q_object=combined_q, as_union=True
+            )
+        return events
 
+    def get_events(self, request):
         events = paginate_resources(
-            events,
+            self.get_unpaginated_events(request),
             page_ref=request.GET.get(PAGINATION_QUERYSTRING_KEY),
             per_page=self.EVENTS_PER_PAGE,
+            cursor=request.GET.get(PAGINATION_CURSOR_QUERYSTRING_KEY),
+            keyset=settings.KEYSET_PAGINATION,
         )
 
         return events
 
     def get_relevant_countries(self):
         # Relevant here means a country that a published Event is or was in
+        # Just the distinct codes, rather than DISTINCT ON whole pages, which
+        # isn't supported by sqlite
         raw_countries = (
-            event.country
-            for event in Event.published_objects.distinct("country").order_by("country")
-            if event.country
+            Country(code)
+            for code in Event.published_objects.order_by("country")
+            .values_list("country", flat=True)
+            .distinct()
+            if code
         )
 
         return [
@@ -354,6 +400,8 @@ class Event(BasePage):
     parent_page_types = ["events.Events"]
     subpage_types = []
     template = "event.html"
+    # Shows whether the event is upcoming
+    cache_policy = SHORT_LIVED_POLICY
 
     # Content fields
     description = RichTextField(
@@ -122,7 +122,7 @@ class EventsTests(PatchedWagtailPageTests):
         expected_q = Q()  # no restrictions
         events_page.get_events(fake_request)
         mock_get_combined_events.assert_called_once_with(
-            events_page, q_object=expected_q, reverse=True
+            events_page, q_object=expected_q, reverse=True, as_union=True
         )
 
     @mock.patch("developerportal.apps.events.models.get_past_event_cutoff")
@@ -161,7 +161,7 @@ class EventsTests(PatchedWagtailPageTests):
 
         events_page.get_events(fake_request)
         mock_get_combined_events.assert_called_once_with(
-            events_page, q_object=expected_q, reverse=True
+            events_page, q_object=expected_q, reverse=True, as_union=True
         )
 
     @mock.patch("developerportal.apps.events.models.get_past_event_cutoff")
@@ -201,7 +201,7 @@ class EventsTests(PatchedWagtailPageTests):
 
         events_page.get_events(fake_request)
         mock_get_combined_events.assert_called_once_with(
-            events_page, q_object=expected_q, reverse=True
+            events_page, q_object=expected_q, reverse=True, as_union=True
         )
 
     def test_year_months_to_years_and_months_tuples(self):
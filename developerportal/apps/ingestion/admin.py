@@ -1,10 +1,32 @@
 from django.contrib import admin
 
-from .models import IngestionConfiguration
+from .models import IngestedItem, IngestionConfiguration
 
 
 class IngestionConfigAdmin(admin.ModelAdmin):
     model = IngestionConfiguration
+    list_display = (
+        "source_name",
+        "integration_type",
+        "last_sync",
+        "fetched_count",
+        "not_modified_count",
+    )
+    readonly_fields = (
+        "etag",
+        "last_modified",
+        "content_hash",
+        "fetched_count",
+        "not_modified_count",
+    )
+
+
+class IngestedItemAdmin(admin.ModelAdmin):
+    model = IngestedItem
+    list_display = ("url", "guid", "configuration", "ingested_at")
+    search_fields = ("url", "guid")
+    raw_id_fields = ("page",)
 
 
 admin.site.register(IngestionConfiguration, IngestionConfigAdmin)
+admin.site.register(IngestedItem, IngestedItemAdmin)
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.12 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion', '0003_bootstrap_ingestion_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionconfiguration',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ingestionconfiguration',
+            name='etag',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='ingestionconfiguration',
+            name='fetched_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='How many times the feed has been downloaded and parsed'),
+        ),
+        migrations.AddField(
+            model_name='ingestionconfiguration',
+            name='last_modified',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ingestionconfiguration',
+            name='not_modified_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="How many times the feed was checked and hadn't changed"),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.12 on 2026-10-18 08:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0045_assign_unlock_grouppagepermission'),
+        ('ingestion', '0004_feed_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048, unique=True)),
+                ('guid', models.CharField(blank=True, max_length=2048)),
+                ('ingested_at', models.DateTimeField(auto_now_add=True)),
+                ('configuration', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingested_items', to='ingestion.IngestionConfiguration')),
+                ('page', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wagtailcore.Page')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ingesteditem',
+            constraint=models.UniqueConstraint(condition=models.Q(_negated=True, guid=''), fields=('guid',), name='ingestion_ingesteditem_unique_guid'),
+        ),
+    ]
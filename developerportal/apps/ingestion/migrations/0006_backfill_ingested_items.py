@@ -0,0 +1,65 @@
+"""Add the ExternalArticles and Videos which already exist to the index of
+ingested items, so the same items aren't ingested again, now that feeds are
+checked against it rather than only by date"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.db import migrations
+
+# Copied from ingestion.utils as they were when this migration was written, so
+# later changes to them don't change what it does
+TRACKING_QUERY_PARAMS = ("fbclid", "gclid")
+TRACKING_QUERY_PARAM_PREFIX = "utm_"
+
+
+def normalise_url(url):
+    parts = urlsplit(url.strip())
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme
+    netloc = parts.hostname or ""
+    if parts.port and parts.port not in (80, 443):
+        netloc = f"{netloc}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in TRACKING_QUERY_PARAMS
+            and not key.startswith(TRACKING_QUERY_PARAM_PREFIX)
+        )
+    )
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), query, ""))
+
+
+def forwards(apps, schema_editor):
+    IngestedItem = apps.get_model("ingestion", "IngestedItem")
+    ExternalArticle = apps.get_model("externalcontent", "ExternalArticle")
+    Video = apps.get_model("videos", "Video")
+
+    page_ids = {}
+    for page_id, url in ExternalArticle.objects.exclude(external_url="").values_list(
+        "pk", "external_url"
+    ):
+        page_ids.setdefault(normalise_url(url), page_id)
+    for video in Video.objects.all():
+        for block in video.video_url:
+            if block.block_type == "embed" and block.value:
+                page_ids.setdefault(normalise_url(block.value.url), video.pk)
+
+    IngestedItem.objects.bulk_create(
+        [IngestedItem(url=url, page_id=page_id) for url, page_id in page_ids.items()]
+    )
+
+
+def backwards(apps, schema_editor):
+    IngestedItem = apps.get_model("ingestion", "IngestedItem")
+    IngestedItem.objects.filter(configuration__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ingestion", "0005_ingesteditem"),
+        ("externalcontent", "0031_update_streamblock"),
+        ("videos", "0013_add_3_2_ratio_image"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
@@ -29,6 +29,21 @@ class IngestionConfiguration(models.Model):
             "timestamps matching or after this value."
         )
     )
+    # The validators from the last time the feed was downloaded and ingested,
+    # so it's only parsed again if it has changed
+    etag = models.CharField(max_length=255, blank=True, editable=False)
+    last_modified = models.CharField(max_length=64, blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    fetched_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="How many times the feed has been downloaded and parsed",
+    )
+    not_modified_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="How many times the feed was checked and hadn't changed",
+    )
 
     def __repr__(self):
         return "<IngestionConfiguration: {} (Synced to: {})>".format(
@@ -37,3 +52,39 @@ class IngestionConfiguration(models.Model):
 
     def __str__(self):
         return "IngestionConfiguration for {}".format(self.source_name)
+
+
+class IngestedItem(models.Model):
+    """An item which has been ingested from a feed, by its normalised URL and
+    its id in the feed, so it's never ingested twice, even if the feed is
+    reordered, or it appears in more than one feed"""
+
+    url = models.URLField(max_length=2048, unique=True)
+    guid = models.CharField(max_length=2048, blank=True)
+    page = models.ForeignKey(
+        "wagtailcore.Page",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    configuration = models.ForeignKey(
+        IngestionConfiguration,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="ingested_items",
+    )
+    ingested_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["guid"],
+                condition=~models.Q(guid=""),
+                name="ingestion_ingesteditem_unique_guid",
+            )
+        ]
+
+    def __str__(self):
+        return self.url
@@ -3,7 +3,8 @@ import os
 
 from django.conf import settings
 
-from .celery import app
+from developerportal.apps.taskqueue.celery import app
+
 from .models import IngestionConfiguration
 from .utils import ingest_content
 
@@ -11,7 +12,8 @@ logging.basicConfig(level=os.environ.get("LOGLEVEL", logging.INFO))
 logger = logging.getLogger(__name__)
 
 
-@app.task
+# Results are kept for these, for the TTL in taskqueue.celery.RESULT_TTLS
+@app.task(ignore_result=False)
 def ingest_videos():
     if settings.AUTOMATICALLY_INGEST_CONTENT:
         ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_VIDEO)
@@ -22,7 +24,7 @@ def ingest_videos():
         )
 
 
-@app.task
+@app.task(ignore_result=False)
 def ingest_articles():
     if settings.AUTOMATICALLY_INGEST_CONTENT:
         ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_ARTICLE)
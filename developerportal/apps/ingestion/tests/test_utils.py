@@ -1,17 +1,45 @@
 import datetime
+import hashlib
+import threading
+from io import BytesIO
 from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.models import QuerySet
 from django.test import TestCase, override_settings
+from django.utils.text import slugify
 
 import pytz
+import requests
 from dateutil.tz import tzlocal
+from PIL import Image
 
 from developerportal.apps.ingestion.utils import (
+    FEED_FETCH_CONNECT_TIMEOUT,
+    FEED_FETCH_READ_TIMEOUT,
+    IMAGE_DOWNLOAD_CHUNK_SIZE,
+    IMAGE_MAX_BYTES,
+    FeedDownload,
     _get_slug,
+    download_feed,
+    download_feeds,
+    exclude_ingested_items,
     fetch_external_data,
+    get_content_hash,
+    get_session,
     ingest_content,
+    normalise_url,
 )
 
 from ...articles.models import Article
@@ -24,17 +52,27 @@ from ...externalcontent.models import (
 from ...mozimages.models import MozImage
 from ...videos.models import Video
 from ..constants import INGESTION_USER_USERNAME
-from ..models import IngestionConfiguration
+from ..models import IngestedItem, IngestionConfiguration
 from ..utils import (
+    StagedImage,
+    _create_image,
     _get_factory_func,
     _make_external_article_page,
     _make_video_page,
     _store_external_image,
     generate_draft_from_external_data,
+    stage_external_images,
 )
 from .data.test_images_as_bytearrays import image_one as image_one_bytearray
 
 
+def make_png(colour):
+    """Return the bytes of a 1x1 PNG of the given colour"""
+    output = BytesIO()
+    Image.new("RGB", (1, 1), colour).save(output, "PNG")
+    return output.getvalue()
+
+
 @override_settings(AUTOMATICALLY_INGEST_CONTENT=True)
 class UtilsTestCaseWithoutFixtures(TestCase):
 
@@ -102,6 +140,7 @@ class UtilsTestCaseWithoutFixtures(TestCase):
             url="https://blog.mozvr.com/ecsy-developer-tools/",
             image_url="https://blog.mozvr.com/content/images/2019/12/ecsy-header.png",
             timestamp=datetime.datetime(2019, 12, 10, 22, 47, 43, tzinfo=pytz.UTC),
+            guid="5deef1a92375ec0038565c42",
         )
         self.assertEqual(blog_data_post_dec[5], expected)
 
@@ -118,6 +157,7 @@ class UtilsTestCaseWithoutFixtures(TestCase):
             url="https://www.youtube.com/watch?v=spK_S0HfzFw",
             image_url="https://i4.ytimg.com/vi/spK_S0HfzFw/hqdefault.jpg",
             timestamp=datetime.datetime(2019, 12, 11, 11, 0, 10, tzinfo=tzlocal()),
+            guid="yt:video:spK_S0HfzFw",
         )
         self.assertEqual(yt_data_post_jan[2], expected)
 
@@ -131,17 +171,184 @@ class UtilsTestCaseWithoutFixtures(TestCase):
 
         self.assertEqual(bad_data, [])
 
+    def test_fetch_external_data__downloaded_content(self):
+        with open(self.YOUTUBE_FEED_URL.replace("file://", ""), "rb") as feed:
+            feed_content = feed.read()
+
+        yt_data = fetch_external_data(
+            feed_url="https://example.com/feed.xml",
+            last_synced=datetime.datetime(2019, 12, 1, tzinfo=pytz.UTC),
+            feed_content=feed_content,
+        )
+        self.assertEqual(len(yt_data), 6)
+
+    def test_fetch_external_data__not_in_date_order(self):
+        feed_content = b"""<?xml version="1.0" encoding="UTF-8"?>
+            <rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+            <channel><title>Test</title>
+            <item><title>New</title><link>https://example.com/new/</link>
+            <dc:creator>A</dc:creator>
+            <pubDate>Fri, 10 Jan 2020 10:00:00 GMT</pubDate></item>
+            <item><title>Old</title><link>https://example.com/old/</link>
+            <dc:creator>A</dc:creator>
+            <pubDate>Sun, 01 Dec 2019 10:00:00 GMT</pubDate></item>
+            <item><title>Newer</title><link>https://example.com/newer/</link>
+            <dc:creator>A</dc:creator>
+            <pubDate>Sat, 11 Jan 2020 10:00:00 GMT</pubDate></item>
+            </channel></rss>"""
+
+        data = fetch_external_data(
+            feed_url="https://example.com/feed.xml",
+            last_synced=datetime.datetime(2020, 1, 1, tzinfo=pytz.UTC),
+            feed_content=feed_content,
+        )
+        self.assertEqual([item["title"] for item in data], ["New", "Newer"])
+
+    def test_normalise_url(self):
+        cases = [
+            ("https://example.com/post/", "https://example.com/post"),
+            ("http://Example.COM:80/post", "https://example.com/post"),
+            ("https://example.com:8443/post", "https://example.com:8443/post"),
+            ("https://example.com/post#comments", "https://example.com/post"),
+            (
+                "https://example.com/post?utm_source=feed&b=2&fbclid=x&a=1",
+                "https://example.com/post?a=1&b=2",
+            ),
+            (
+                " https://www.youtube.com/watch?v=spK_S0HfzFw ",
+                "https://www.youtube.com/watch?v=spK_S0HfzFw",
+            ),
+            # Paths are case-sensitive
+            ("https://example.com/Post", "https://example.com/Post"),
+        ]
+        for url, expected in cases:
+            with self.subTest(url=url):
+                self.assertEqual(normalise_url(url), expected)
+
+    def test_exclude_ingested_items(self):
+        IngestedItem.objects.create(url="https://example.com/one", guid="1")
+        IngestedItem.objects.create(url="https://example.com/two")
+        data_from_source = [
+            dict(title="One", url="https://example.com/one/", guid="1"),
+            dict(title="Two", url="http://example.com/two?utm_medium=rss", guid=""),
+            dict(title="Moved", url="https://example.com/moved/", guid="1"),
+            dict(title="Three", url="https://example.com/three/", guid="3"),
+            dict(title="Three again", url="https://example.com/three", guid="3"),
+            dict(title="Four", url="https://example.com/four/", guid=""),
+        ]
+
+        with self.assertNumQueries(1):
+            new_items = exclude_ingested_items(data_from_source)
+
+        self.assertEqual([item["title"] for item in new_items], ["Three", "Four"])
+        with self.assertNumQueries(0):
+            self.assertEqual(exclude_ingested_items([]), [])
+
+
+class FeedDownloadTestCase(TestCase):
+    def test_get_session(self):
+        session = get_session()
+        self.assertIs(get_session(), session)
+        self.assertEqual(session.get_adapter("https://example.com")._pool_maxsize, 8)
+
+    @mock.patch.object(get_session(), "get")
+    def test_download_feed(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.content = b"<feed />"
+        mock_get.return_value.headers = {
+            "ETag": '"abc"',
+            "Last-Modified": "Wed, 01 Apr 2020 10:00:00 GMT",
+        }
+        self.assertEqual(
+            download_feed("https://example.com/feed.xml"),
+            FeedDownload(b"<feed />", '"abc"', "Wed, 01 Apr 2020 10:00:00 GMT"),
+        )
+        mock_get.assert_called_once_with(
+            "https://example.com/feed.xml",
+            headers={},
+            timeout=(FEED_FETCH_CONNECT_TIMEOUT, FEED_FETCH_READ_TIMEOUT),
+        )
+
+    @mock.patch.object(get_session(), "get")
+    def test_download_feed__conditional(self, mock_get):
+        mock_get.return_value.status_code = 304
+        mock_get.return_value.headers = {}
+        self.assertEqual(
+            download_feed(
+                "https://example.com/feed.xml",
+                etag='"abc"',
+                last_modified="Wed, 01 Apr 2020 10:00:00 GMT",
+            ),
+            FeedDownload(None, '"abc"', "Wed, 01 Apr 2020 10:00:00 GMT"),
+        )
+        mock_get.assert_called_once_with(
+            "https://example.com/feed.xml",
+            headers={
+                "If-None-Match": '"abc"',
+                "If-Modified-Since": "Wed, 01 Apr 2020 10:00:00 GMT",
+            },
+            timeout=(FEED_FETCH_CONNECT_TIMEOUT, FEED_FETCH_READ_TIMEOUT),
+        )
+
+    @mock.patch.object(get_session(), "get")
+    def test_download_feed__fails(self, mock_get):
+        for error in (requests.Timeout(), requests.ConnectionError()):
+            mock_get.side_effect = error
+            with self.subTest(error=error):
+                self.assertIsNone(download_feed("https://example.com/feed.xml"))
+
+        mock_get.side_effect = None
+        mock_get.return_value.raise_for_status.side_effect = requests.HTTPError()
+        self.assertIsNone(download_feed("https://example.com/feed.xml"))
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    def test_download_feeds__concurrently(self, mock_download_feed):
+        # Each download waits for the others to start, so this only finishes
+        # if they run at the same time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def download(feed_url, etag, last_modified):
+            barrier.wait()
+            return FeedDownload(feed_url.encode("utf-8"), etag, last_modified)
+
+        mock_download_feed.side_effect = download
+        configs = [
+            IngestionConfiguration(
+                pk=pk, source_url=f"https://example.com/{pk}", etag=f'"{pk}"'
+            )
+            for pk in range(1, 4)
+        ]
+        self.assertEqual(
+            download_feeds(configs),
+            {
+                pk: FeedDownload(
+                    f"https://example.com/{pk}".encode("utf-8"), f'"{pk}"', ""
+                )
+                for pk in range(1, 4)
+            },
+        )
+        self.assertEqual(mock_download_feed.call_count, 3)
+        self.assertEqual(download_feeds([]), {})
+
 
 @override_settings(AUTOMATICALLY_INGEST_CONTENT=True)
 class UtilsTestCaseWithFixtures(TestCase):
 
     fixtures = ["common.json"]
 
+    @mock.patch(
+        "developerportal.apps.ingestion.utils.download_feed",
+        return_value=FeedDownload(b"<feed />", "", ""),
+    )
     @mock.patch("developerportal.apps.ingestion.utils.send_notification")
     @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
     @mock.patch("developerportal.apps.ingestion.utils.tz_now")
     def test_ingest_content(
-        self, mock_tz_now, mock_fetch_external_data, mock_send_notification
+        self,
+        mock_tz_now,
+        mock_fetch_external_data,
+        mock_send_notification,
+        mock_download_feed,
     ):
 
         _now = datetime.datetime(12, 12, 13, 12, 34, 56, tzinfo=pytz.UTC)
@@ -225,6 +432,7 @@ class UtilsTestCaseWithFixtures(TestCase):
         ]
         for x in article_return_value:
             x["title"] += " for Post"
+            x["url"] = x["url"].replace("/thing/", "/post/")
 
         mock_send_notification.reset_mock()
         mock_fetch_external_data.reset_mock()
@@ -252,11 +460,19 @@ class UtilsTestCaseWithFixtures(TestCase):
         assert mock_send_notification.call_count == 4
 
     @override_settings(NOTIFY_AFTER_INGESTING_CONTENT=False)
+    @mock.patch(
+        "developerportal.apps.ingestion.utils.download_feed",
+        return_value=FeedDownload(b"<feed />", "", ""),
+    )
     @mock.patch("developerportal.apps.ingestion.utils.send_notification")
     @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
     @mock.patch("developerportal.apps.ingestion.utils.tz_now")
     def test_ingest_content__no_notifications_option_set(
-        self, mock_tz_now, mock_fetch_external_data, mock_send_notification
+        self,
+        mock_tz_now,
+        mock_fetch_external_data,
+        mock_send_notification,
+        mock_download_feed,
     ):
 
         _now = datetime.datetime(12, 12, 13, 12, 34, 56, tzinfo=pytz.UTC)
@@ -292,10 +508,14 @@ class UtilsTestCaseWithFixtures(TestCase):
         assert Video.objects.count() == 1
         assert not mock_send_notification.called  # This is what we care about here
 
+    @mock.patch(
+        "developerportal.apps.ingestion.utils.download_feed",
+        return_value=FeedDownload(b"<feed />", "", ""),
+    )
     @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
     @mock.patch("developerportal.apps.ingestion.utils.send_notification")
     def test_ingest_content__unhappy_path(
-        self, mock_send_notification, mock_fetch_external_data
+        self, mock_send_notification, mock_fetch_external_data, mock_download_feed
     ):
 
         mock_send_notification.return_value = False
@@ -352,6 +572,187 @@ class UtilsTestCaseWithFixtures(TestCase):
             ],
         )
 
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    def test_ingest_content__feed_not_downloaded(
+        self, mock_fetch_external_data, mock_download_feed
+    ):
+        IngestionConfiguration.objects.all().delete()
+        last_sync = datetime.datetime(12, 12, 12, tzinfo=pytz.UTC)
+        IngestionConfiguration.objects.create(
+            source_name="One",
+            source_url="https://example.com/one.xml",
+            integration_type=IngestionConfiguration.CONTENT_TYPE_VIDEO,
+            last_sync=last_sync,
+        )
+        IngestionConfiguration.objects.create(
+            source_name="Two",
+            source_url="https://example.com/two.xml",
+            integration_type=IngestionConfiguration.CONTENT_TYPE_VIDEO,
+            last_sync=last_sync,
+        )
+        mock_download_feed.side_effect = lambda url, etag, last_modified: (
+            None if "one" in url else FeedDownload(b"<a />", "", "")
+        )
+        mock_fetch_external_data.return_value = []
+
+        ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_VIDEO)
+
+        mock_fetch_external_data.assert_called_once_with(
+            feed_url="https://example.com/two.xml",
+            last_synced=last_sync,
+            feed_content=b"<a />",
+        )
+        # So it's synced from the same point next time
+        self.assertEqual(
+            IngestionConfiguration.objects.get(source_name="One").last_sync, last_sync
+        )
+        self.assertNotEqual(
+            IngestionConfiguration.objects.get(source_name="Two").last_sync, last_sync
+        )
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    def test_ingest_content__feed_not_modified(
+        self, mock_fetch_external_data, mock_download_feed
+    ):
+        IngestionConfiguration.objects.all().delete()
+        last_sync = datetime.datetime(12, 12, 12, tzinfo=pytz.UTC)
+        for name in ("Not modified", "Same content", "Changed"):
+            IngestionConfiguration.objects.create(
+                source_name=name,
+                source_url=f"https://example.com/{slugify(name)}.xml",
+                integration_type=IngestionConfiguration.CONTENT_TYPE_VIDEO,
+                last_sync=last_sync,
+                etag='"old"',
+                content_hash=get_content_hash(b"<old />"),
+            )
+        downloads = {
+            "https://example.com/not-modified.xml": FeedDownload(None, '"old"', ""),
+            "https://example.com/same-content.xml": FeedDownload(
+                b"<old />", '"new"', ""
+            ),
+            "https://example.com/changed.xml": FeedDownload(b"<new />", '"new"', ""),
+        }
+        mock_download_feed.side_effect = lambda url, etag, last_modified: downloads[url]
+        mock_fetch_external_data.return_value = []
+
+        ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_VIDEO)
+
+        mock_download_feed.assert_any_call(
+            "https://example.com/not-modified.xml", '"old"', ""
+        )
+        mock_fetch_external_data.assert_called_once_with(
+            feed_url="https://example.com/changed.xml",
+            last_synced=last_sync,
+            feed_content=b"<new />",
+        )
+        configs = {
+            config.source_name: config
+            for config in IngestionConfiguration.objects.all()
+        }
+        self.assertEqual(
+            [
+                (
+                    configs[name].etag,
+                    configs[name].content_hash,
+                    configs[name].fetched_count,
+                    configs[name].not_modified_count,
+                )
+                for name in ("Not modified", "Same content", "Changed")
+            ],
+            [
+                ('"old"', get_content_hash(b"<old />"), 0, 1),
+                ('"new"', get_content_hash(b"<old />"), 0, 1),
+                ('"new"', get_content_hash(b"<new />"), 1, 0),
+            ],
+        )
+        for config in configs.values():
+            self.assertNotEqual(config.last_sync, last_sync)
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    def test_ingest_content__items_only_ingested_once(
+        self, mock_fetch_external_data, mock_download_feed
+    ):
+        IngestionConfiguration.objects.all().delete()
+        for source_url in (
+            "https://example.com/one.xml",
+            "https://example.com/two.xml",
+        ):
+            IngestionConfiguration.objects.create(
+                source_name=source_url,
+                source_url=source_url,
+                integration_type=IngestionConfiguration.CONTENT_TYPE_VIDEO,
+                last_sync=datetime.datetime(12, 12, 12, tzinfo=pytz.UTC),
+            )
+        mock_download_feed.side_effect = lambda url, etag, last_modified: (
+            FeedDownload(url.encode("utf-8"), "", "")
+        )
+        mock_fetch_external_data.side_effect = lambda **kwargs: [
+            dict(
+                title=title,
+                authors=[],
+                url=f"https://www.youtube.com/watch?v={title}",
+                guid=f"yt:video:{title}",
+                timestamp=datetime.datetime(2020, 1, 10, tzinfo=pytz.UTC),
+            )
+            for title in ("one", "two")
+        ]
+
+        # Both feeds have the same items, and they're ingested again
+        ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_VIDEO)
+        IngestionConfiguration.objects.update(content_hash="")
+        ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_VIDEO)
+
+        self.assertEqual(
+            sorted(Video.objects.values_list("title", flat=True)), ["one", "two"]
+        )
+        self.assertEqual(
+            sorted(IngestedItem.objects.values_list("url", "guid", "page__title")),
+            [
+                ("https://www.youtube.com/watch?v=one", "yt:video:one", "one"),
+                ("https://www.youtube.com/watch?v=two", "yt:video:two", "two"),
+            ],
+        )
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    @mock.patch(
+        "developerportal.apps.ingestion.utils.exclude_ingested_items",
+        side_effect=lambda data_from_source: data_from_source,
+    )
+    def test_ingest_content__ingested_since_checked(
+        self, mock_exclude_ingested_items, mock_fetch_external_data, mock_download_feed
+    ):
+        # As if another run ingested it after the index was checked
+        IngestionConfiguration.objects.all().delete()
+        IngestionConfiguration.objects.create(
+            source_name="One",
+            source_url="https://example.com/one.xml",
+            integration_type=IngestionConfiguration.CONTENT_TYPE_VIDEO,
+            last_sync=datetime.datetime(12, 12, 12, tzinfo=pytz.UTC),
+        )
+        IngestedItem.objects.create(
+            url="https://www.youtube.com/watch?v=one", guid="yt:video:one"
+        )
+        mock_download_feed.return_value = FeedDownload(b"<feed />", "", "")
+        mock_fetch_external_data.return_value = [
+            dict(
+                title=title,
+                authors=[],
+                url=f"https://www.youtube.com/watch?v={title}",
+                guid=f"yt:video:{title}",
+                timestamp=datetime.datetime(2020, 1, 10, tzinfo=pytz.UTC),
+            )
+            for title in ("one", "two")
+        ]
+
+        ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_VIDEO)
+
+        self.assertEqual(list(Video.objects.values_list("title", flat=True)), ["two"])
+        self.assertEqual(IngestedItem.objects.count(), 2)
+
     def test__get_factory_func(self):
 
         self.assertEqual(_get_factory_func("Video"), _make_video_page)
@@ -368,8 +769,8 @@ class UtilsTestCaseWithFixtures(TestCase):
                 with self.assertRaises(NotImplementedError):
                     _get_factory_func(model_name=klass.__name__)
 
-    @mock.patch("developerportal.apps.ingestion.utils.requests.get")
-    def test__store_external_image__local_filesystem(self, mock_requests_get):
+    @mock.patch.object(get_session(), "get")
+    def test__store_external_image__local_filesystem(self, mock_get):
         # This test is written assuming local file storage, even though
         # everything apart from CI will be using S3 as its backend. The function
         # HAS been tested with S3, though.
@@ -377,18 +778,321 @@ class UtilsTestCaseWithFixtures(TestCase):
             settings.DEFAULT_FILE_STORAGE
             == "django.core.files.storage.FileSystemStorage"
         )
-        mock_response = mock.Mock()
-        mock_response.content = image_one_bytearray
-        mock_requests_get.return_value = mock_response
+        mock_get.return_value.headers = {}
+        mock_get.return_value.iter_content.return_value = [
+            bytes(image_one_bytearray[:100]),
+            bytes(image_one_bytearray[100:]),
+        ]
 
         saved_image = _store_external_image(image_url="https://example.com/test.png")
 
-        mock_requests_get.assert_called_once_with("https://example.com/test.png")
+        mock_get.assert_called_once_with(
+            "https://example.com/test.png",
+            stream=True,
+            timeout=(FEED_FETCH_CONNECT_TIMEOUT, FEED_FETCH_READ_TIMEOUT),
+        )
 
         saved_image.file.open()
         saved_image.file.seek(0)
         comparison_content = saved_image.file.read()
+        saved_image.file.close()
         self.assertEqual(bytearray(comparison_content), image_one_bytearray)
+        self.assertEqual(saved_image.file_size, len(image_one_bytearray))
+        self.assertEqual(
+            saved_image.content_hash,
+            hashlib.sha256(bytes(image_one_bytearray)).hexdigest(),
+        )
+        self.assertEqual(saved_image.title, "test.png")
+
+        # The same image again is the same MozImage
+        mock_get.reset_mock()
+        self.assertEqual(
+            _store_external_image(image_url="https://example.com/again.png"),
+            saved_image,
+        )
+        mock_get.assert_called_once()
+        self.assertEqual(MozImage.objects.count(), 1)
+        default_storage.delete(saved_image.file.name)
+
+    def test_create_image__same_content_imported_concurrently(self):
+        existing = MozImage.objects.create(
+            title="existing",
+            file="original_images/existing.png",
+            width=1,
+            height=1,
+            content_hash="a" * 64,
+        )
+        staged_image = StagedImage(
+            title="new.png",
+            name="original_images/new.png",
+            width=1,
+            height=1,
+            file_size=1,
+            file_hash="b" * 40,
+            content_hash="a" * 64,
+        )
+
+        with transaction.atomic():
+            # As if another ingestion run saved `existing` after the lookup
+            with mock.patch.object(QuerySet, "first", return_value=None):
+                self.assertEqual(_create_image(staged_image), existing)
+            # The transaction can still be used
+            self.assertEqual(MozImage.objects.count(), 1)
+
+        # Images without a content hash, such as those uploaded by editors, can
+        # share one
+        MozImage.objects.create(title="a", file="a.png", width=1, height=1)
+        MozImage.objects.create(title="b", file="b.png", width=1, height=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MozImage.objects.create(
+                title="c", file="c.png", width=1, height=1, content_hash="a" * 64
+            )
+
+    @mock.patch.object(get_session(), "get")
+    def test_stage_external_images__not_downloaded(self, mock_get):
+        mock_get.side_effect = requests.Timeout()
+        self.assertEqual(
+            stage_external_images(["https://example.com/test.png"]),
+            {"https://example.com/test.png": None},
+        )
+
+        # Not an image
+        mock_get.side_effect = None
+        mock_get.return_value.headers = {}
+        mock_get.return_value.iter_content.return_value = [b"<html></html>"]
+        self.assertEqual(
+            stage_external_images(["https://example.com/test.png"]),
+            {"https://example.com/test.png": None},
+        )
+
+        # Too big, going by its headers or by what's sent
+        mock_get.return_value.headers = {"Content-Length": str(IMAGE_MAX_BYTES + 1)}
+        self.assertEqual(
+            stage_external_images(["https://example.com/test.png"]),
+            {"https://example.com/test.png": None},
+        )
+        mock_get.return_value.headers = {}
+        mock_get.return_value.iter_content.return_value = iter(
+            lambda: b"0" * IMAGE_DOWNLOAD_CHUNK_SIZE, None
+        )
+        self.assertEqual(
+            stage_external_images(["https://example.com/test.png"]),
+            {"https://example.com/test.png": None},
+        )
+        self.assertEqual(stage_external_images([]), {})
+
+    @mock.patch(
+        "developerportal.apps.ingestion.utils._upload_spooled_image",
+        side_effect=lambda image: f"original_images/{image.title}",
+    )
+    @mock.patch.object(get_session(), "get")
+    def test_stage_external_images__deduplicated(self, mock_get, mock_upload):
+        red, green, blue = [make_png(colour) for colour in ("red", "green", "blue")]
+        MozImage.objects.create(
+            title="existing",
+            file="original_images/existing.png",
+            width=1,
+            height=1,
+            content_hash=hashlib.sha256(red).hexdigest(),
+        )
+        content = {
+            "https://example.com/red.png": red,
+            "https://example.com/green.png": green,
+            "https://example.com/green-again.png": green,
+            "https://example.com/blue.png": blue,
+        }
+        # Each download waits for the others to start, so this only finishes
+        # if they run at the same time
+        barrier = threading.Barrier(len(content), timeout=5)
+
+        def get(image_url, **kwargs):
+            barrier.wait()
+            response = mock.MagicMock()
+            response.headers = {}
+            response.iter_content.return_value = [content[image_url]]
+            return response
+
+        mock_get.side_effect = get
+
+        staged_images = stage_external_images(list(content))
+
+        self.assertEqual(
+            {url: image.name for url, image in staged_images.items()},
+            {
+                # Already imported
+                "https://example.com/red.png": None,
+                "https://example.com/green.png": "original_images/green.png",
+                "https://example.com/green-again.png": "original_images/green.png",
+                "https://example.com/blue.png": "original_images/blue.png",
+            },
+        )
+        self.assertEqual(mock_upload.call_count, 2)
+        self.assertEqual(
+            staged_images["https://example.com/blue.png"].content_hash,
+            hashlib.sha256(blue).hexdigest(),
+        )
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    @mock.patch.object(get_session(), "get")
+    def test_ingest_content__image_not_staged(
+        self, mock_get, mock_fetch_external_data, mock_download_feed
+    ):
+        IngestionConfiguration.objects.all().delete()
+        IngestionConfiguration.objects.create(
+            source_name="One",
+            source_url="https://example.com/one.rss",
+            integration_type=IngestionConfiguration.CONTENT_TYPE_ARTICLE,
+            last_sync=datetime.datetime(12, 12, 12, tzinfo=pytz.UTC),
+        )
+        mock_download_feed.return_value = FeedDownload(b"<feed />", "", "")
+        mock_fetch_external_data.return_value = [
+            dict(
+                title="Test one",
+                authors=[],
+                url="https://example.com/thing/one/",
+                image_url="https://example.com/one.png",
+                timestamp=datetime.datetime(2020, 1, 10, tzinfo=pytz.UTC),
+            )
+        ]
+        # Only the test's own transactions are open while downloading. The
+        # downloads are made from other threads, so this thread's connection
+        # is the one to check.
+        main_connection = connections[DEFAULT_DB_ALIAS]
+        savepoints = len(main_connection.savepoint_ids)
+        network_calls_in_transaction = []
+
+        def get(url, **kwargs):
+            if len(main_connection.savepoint_ids) != savepoints:
+                network_calls_in_transaction.append(url)
+            raise requests.Timeout()
+
+        mock_get.side_effect = get
+
+        ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_ARTICLE)
+
+        mock_get.assert_called_once()
+        self.assertEqual(network_calls_in_transaction, [])
+        page = ExternalArticle.objects.get()
+        self.assertIsNone(page.card_image)
+        self.assertEqual(MozImage.objects.count(), 0)
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    @mock.patch("developerportal.apps.ingestion.utils.stage_external_images")
+    def test_ingest_content__images_staged_outside_transaction(
+        self, mock_stage_external_images, mock_fetch_external_data, mock_download_feed
+    ):
+        IngestionConfiguration.objects.all().delete()
+        IngestionConfiguration.objects.create(
+            source_name="One",
+            source_url="https://example.com/one.rss",
+            integration_type=IngestionConfiguration.CONTENT_TYPE_ARTICLE,
+            last_sync=datetime.datetime(12, 12, 12, tzinfo=pytz.UTC),
+        )
+        mock_download_feed.return_value = FeedDownload(b"<feed />", "", "")
+        mock_fetch_external_data.return_value = [
+            dict(
+                title=f"Test {number}",
+                authors=[],
+                url=f"https://example.com/thing/{number}/",
+                image_url=f"https://example.com/{number}.png",
+                timestamp=datetime.datetime(2020, 1, 10, tzinfo=pytz.UTC),
+            )
+            for number in ("one", "two", "three")
+        ]
+        # Only the test's own transactions are open while downloading
+        savepoints = len(connection.savepoint_ids)
+
+        def stage(image_urls):
+            self.assertEqual(len(connection.savepoint_ids), savepoints)
+            staged_images = {}
+            for image_url in image_urls:
+                filename = image_url.split("/")[-1]
+                name = default_storage.save(
+                    f"original_images/{filename}", ContentFile(image_one_bytearray)
+                )
+                staged_images[image_url] = StagedImage(
+                    filename, name, 1, 1, len(image_one_bytearray), "", filename
+                )
+            return staged_images
+
+        mock_stage_external_images.side_effect = stage
+
+        def make_page(data, extra_kwargs):
+            if data["title"] == "Test two":
+                raise ValidationError("Invalid")
+            return _make_external_article_page(data, extra_kwargs)
+
+        # The second page is invalid, so its image isn't used
+        with mock.patch(
+            "developerportal.apps.ingestion.utils._make_external_article_page",
+            side_effect=make_page,
+        ) as mock_make_page:
+            mock_make_page.__name__ = "_make_external_article_page"
+            ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_ARTICLE)
+
+        mock_stage_external_images.assert_called_once_with(
+            [
+                "https://example.com/one.png",
+                "https://example.com/two.png",
+                "https://example.com/three.png",
+            ]
+        )
+        pages = ExternalArticle.objects.order_by("title")
+        self.assertEqual(
+            [page.card_image.title for page in pages], ["one.png", "three.png"]
+        )
+        for page in pages:
+            self.assertTrue(default_storage.exists(page.card_image.file.name))
+            default_storage.delete(page.card_image.file.name)
+        self.assertFalse(default_storage.exists("original_images/two.png"))
+
+    @mock.patch("developerportal.apps.ingestion.utils.download_feed")
+    @mock.patch("developerportal.apps.ingestion.utils.fetch_external_data")
+    @mock.patch("developerportal.apps.ingestion.utils.stage_external_images")
+    @mock.patch(
+        "developerportal.apps.ingestion.utils.generate_draft_from_external_data"
+    )
+    def test_ingest_content__staged_images_discarded_on_failure(
+        self,
+        mock_generate_draft,
+        mock_stage_external_images,
+        mock_fetch_external_data,
+        mock_download_feed,
+    ):
+        IngestionConfiguration.objects.all().delete()
+        config = IngestionConfiguration.objects.create(
+            source_name="One",
+            source_url="https://example.com/one.rss",
+            integration_type=IngestionConfiguration.CONTENT_TYPE_ARTICLE,
+            last_sync=datetime.datetime(12, 12, 12, tzinfo=pytz.UTC),
+        )
+        mock_download_feed.return_value = FeedDownload(b"<feed />", "", "")
+        mock_fetch_external_data.return_value = [
+            dict(
+                title="Test one",
+                authors=[],
+                url="https://example.com/thing/one/",
+                image_url="https://example.com/one.png",
+                timestamp=datetime.datetime(2020, 1, 10, tzinfo=pytz.UTC),
+            )
+        ]
+        name = default_storage.save("original_images/one.png", ContentFile(b"1"))
+        mock_stage_external_images.return_value = {
+            "https://example.com/one.png": StagedImage(
+                "one.png", name, 1, 1, 1, "", "abc"
+            )
+        }
+        mock_generate_draft.side_effect = RuntimeError("Database went away")
+
+        with self.assertRaises(RuntimeError):
+            ingest_content(type_=IngestionConfiguration.CONTENT_TYPE_ARTICLE)
+
+        self.assertFalse(default_storage.exists(name))
+        config.refresh_from_db()
+        self.assertEqual(config.fetched_count, 0)
+        self.assertEqual(config.content_hash, "")
 
     @mock.patch("developerportal.apps.ingestion.utils._store_external_image")
     def test_generate_draft_from_external_data__externalarticle(
@@ -2,13 +2,19 @@
 import datetime
 import hashlib
 import logging
-from io import BytesIO
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.core.files.images import ImageFile
-from django.db import transaction
+from django.core.files import File
+from django.core.files.images import get_image_dimensions
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils.text import slugify
 from django.utils.timezone import now as tz_now
 
@@ -24,16 +30,125 @@ from ..externalcontent import models as externalcontent_models
 from ..mozimages.models import MozImage
 from ..videos import models as video_models
 from .constants import INGESTION_USER_USERNAME
-from .models import IngestionConfiguration
+from .models import IngestedItem, IngestionConfiguration
 
 FEED_TYPE_ATOM = "atom"
 FEED_TYPE_RSS = "rss"
 
 VALID_FEED_TYPES = (FEED_TYPE_ATOM, FEED_TYPE_RSS)
 
+# Feeds are downloaded concurrently, by up to this many threads, and each is
+# given up on if it takes longer than these to connect or send anything back
+FEED_FETCH_MAX_WORKERS = 8
+FEED_FETCH_CONNECT_TIMEOUT = 5
+FEED_FETCH_READ_TIMEOUT = 30
+
+# Images are downloaded concurrently too, into a spool file which is kept in
+# memory until it's bigger than IMAGE_SPOOL_MAX_MEMORY, then moved to a
+# temporary file on disk. Any bigger than IMAGE_MAX_BYTES are skipped.
+IMAGE_FETCH_MAX_WORKERS = FEED_FETCH_MAX_WORKERS
+IMAGE_SPOOL_MAX_MEMORY = 1024 * 1024
+IMAGE_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Query parameters which only say where a link was shared from, so are
+# ignored when comparing items' URLs
+TRACKING_QUERY_PARAMS = ("fbclid", "gclid")
+TRACKING_QUERY_PARAM_PREFIX = "utm_"
+
+# A downloaded feed, with the validators to send when it's next requested. Its
+# content is None if the server said it was unchanged (304 Not Modified).
+FeedDownload = namedtuple("FeedDownload", ["content", "etag", "last_modified"])
+
+# An image which has been downloaded into a local spool file
+SpooledImage = namedtuple(
+    "SpooledImage",
+    ["title", "file", "width", "height", "file_size", "file_hash", "content_hash"],
+)
+# An image which has been downloaded and put in the file storage, ready for a
+# MozImage to be made for it without touching the network or the storage. Its
+# name is None if a MozImage with the same content (sha256) already exists.
+StagedImage = namedtuple(
+    "StagedImage",
+    ["title", "name", "width", "height", "file_size", "file_hash", "content_hash"],
+)
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """Return a requests Session, created once per process, whose connection
+    pool is big enough for every feed download thread to keep its connection
+    open between runs"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=FEED_FETCH_MAX_WORKERS, pool_maxsize=FEED_FETCH_MAX_WORKERS
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_feed(feed_url: str, etag: str = "", last_modified: str = ""):
+    """Download the feed at feed_url, conditionally on it having changed since
+    it had the given ETag and Last-Modified validators, and return it as a
+    FeedDownload, or None if it couldn't be downloaded in time"""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        response = get_session().get(
+            feed_url,
+            headers=headers,
+            timeout=(FEED_FETCH_CONNECT_TIMEOUT, FEED_FETCH_READ_TIMEOUT),
+        )
+        response.raise_for_status()
+    except requests.RequestException as ex:
+        logger.warning(f"Couldn't download feed {feed_url}: {ex}")
+        return None
+    if response.status_code == 304:
+        return FeedDownload(None, etag, last_modified)
+    return FeedDownload(
+        response.content,
+        response.headers.get("ETag", ""),
+        response.headers.get("Last-Modified", ""),
+    )
+
+
+def _download_config_feed(config):
+    return download_feed(config.source_url, config.etag, config.last_modified)
+
+
+def download_feeds(configs: list) -> dict:
+    """Download the feeds for all of the given IngestionConfigurations at once,
+    so it takes as long as the slowest one, and return a dict of each one's pk:
+    its FeedDownload, or None if it couldn't be downloaded in time"""
+    if not configs:
+        return {}
+    max_workers = min(len(configs), FEED_FETCH_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return {
+            config.pk: download
+            for config, download in zip(
+                configs, executor.map(_download_config_feed, configs)
+            )
+        }
+
+
+def get_content_hash(feed_content: bytes) -> str:
+    return hashlib.sha256(feed_content).hexdigest()
+
+
+def _is_unchanged(config, download) -> bool:
+    return (
+        download.content is None
+        or get_content_hash(download.content) == config.content_hash
+    )
+
+
 def _get_item_image(entry) -> str:
     if entry and hasattr(entry, "media_thumbnail") and entry.media_thumbnail[0]:
         # Gets YT thumbnail
@@ -50,10 +165,13 @@ def _get_item_image(entry) -> str:
     return ""
 
 
-def fetch_external_data(feed_url: str, last_synced: datetime.datetime) -> list:
+def fetch_external_data(
+    feed_url: str, last_synced: datetime.datetime, feed_content: bytes = None
+) -> list:
     """For the given feed_url, fetch all entries that are timestamped since
-    last_synced and return them as a list of 0...n standardised dictionaries
-    in the format:
+    last_synced and return them as a list of 0...n standardised dictionaries.
+    If the feed has already been downloaded, its feed_content is parsed instead
+    of fetching it again. The dictionaries are in the format:
 
     [
         {
@@ -61,14 +179,17 @@ def fetch_external_data(feed_url: str, last_synced: datetime.datetime) -> list:
             "authors": [<str>] - 0...n author names,
             "url": <str> - URL of the thing we want to link to as external content,
             "image_url": <str> - URL of any accompanying image,
-            "timestamp: <datetime.datetime> - item's own timestamp
+            "timestamp: <datetime.datetime> - item's own timestamp,
+            "guid": <str> - item's id in the feed, if it has one
         },
         ...
     ]
     """
 
     output = []
-    parsed_data = feedparser.parse(feed_url)
+    parsed_data = feedparser.parse(
+        feed_content if feed_content is not None else feed_url
+    )
 
     # DANGER: we can't do this next check with feeds that lack an <updated> node:
     if "updated" in parsed_data.feed.keys():
@@ -84,8 +205,8 @@ def fetch_external_data(feed_url: str, last_synced: datetime.datetime) -> list:
     for entry in parsed_data.entries:
         timestamp = parse_datetime(entry.published)
         if timestamp <= last_synced:
-            # no point continuing
-            break
+            # Not necessarily the end, if the feed isn't in date order
+            continue
 
         output.append(
             dict(
@@ -94,12 +215,73 @@ def fetch_external_data(feed_url: str, last_synced: datetime.datetime) -> list:
                 url=entry.link,
                 image_url=_get_item_image(entry),
                 timestamp=timestamp,
+                guid=entry.get("id", ""),
             )
         )
 
     return output
 
 
+def normalise_url(url: str) -> str:
+    """Return the given URL in a canonical form, so links to the same item
+    compare equal: https, with a lowercase host, no default port, no fragment,
+    no tracking parameters, the rest of its query sorted, and no trailing
+    slash"""
+    parts = urlsplit(url.strip())
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme
+    netloc = parts.hostname or ""
+    if parts.port and parts.port not in (80, 443):
+        netloc = f"{netloc}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in TRACKING_QUERY_PARAMS
+            and not key.startswith(TRACKING_QUERY_PARAM_PREFIX)
+        )
+    )
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), query, ""))
+
+
+def exclude_ingested_items(data_from_source: list) -> list:
+    """Return the items from fetch_external_data which haven't been ingested
+    before, going by their normalised URLs and GUIDs, and aren't repeated
+    earlier in the list. They're all looked up in the index at once."""
+    urls = {normalise_url(data["url"]) for data in data_from_source}
+    guids = {data["guid"] for data in data_from_source if data.get("guid")}
+    ingested = IngestedItem.objects.filter(
+        Q(url__in=urls) | Q(guid__in=guids)
+    ).values_list("url", "guid")
+    seen_urls = {url for url, _ in ingested}
+    seen_guids = {guid for _, guid in ingested if guid}
+
+    output = []
+    for data in data_from_source:
+        url, guid = normalise_url(data["url"]), data.get("guid", "")
+        if url in seen_urls or (guid and guid in seen_guids):
+            logger.info(f"Skipping {data['url']}, as it's already been ingested")
+            continue
+        seen_urls.add(url)
+        if guid:
+            seen_guids.add(guid)
+        output.append(data)
+    return output
+
+
+def _record_ingested_item(config, data):
+    """Add the item to the index of those ingested, and return its
+    IngestedItem, or None if it's already there"""
+    try:
+        with transaction.atomic():
+            return IngestedItem.objects.create(
+                url=normalise_url(data["url"]),
+                guid=data.get("guid", ""),
+                configuration=config,
+            )
+    except IntegrityError:
+        return None
+
+
 def _get_factory_func(model_name):
     """Get an appropriate helper function generate the desired ingestion target.
     That func will be passed into generate_draft_from_external_data"""
@@ -118,7 +300,9 @@ def _get_factory_func(model_name):
 
 def ingest_content(type_: str):
     """For the given type_:
-    * fetch the relevant data from the configured sources
+    * download the feeds for all the configured sources, concurrently, if
+      they've changed since they were last ingested
+    * parse the relevant data from each of the changed ones
     * for each item of source data:
         * create an appropriate ExternalContent page subclass, as a draft
     * update the last_sync timestamp for each configured source
@@ -128,37 +312,50 @@ def ingest_content(type_: str):
     _now = tz_now()
     model_name = type_
 
-    configs = IngestionConfiguration.objects.filter(integration_type=type_)
+    configs = list(IngestionConfiguration.objects.filter(integration_type=type_))
 
     factory_func = _get_factory_func(model_name)
 
     ingestion_user = User.objects.get(username=INGESTION_USER_USERNAME)
 
-    for config in configs:
-        draft_page_revision_buffer = []
+    downloads = download_feeds(configs)
 
-        with transaction.atomic():
-            data_from_source = fetch_external_data(
-                feed_url=config.source_url, last_synced=config.last_sync
+    for config in configs:
+        download = downloads.get(config.pk)
+        if download is None:
+            # Left to be synced from the same point next time
+            logger.warning(f"Skipping {config!r}, as its feed couldn't be downloaded")
+            continue
+
+        if _is_unchanged(config, download):
+            logger.info(f"Skipping {config!r}, as its feed hasn't changed")
+            IngestionConfiguration.objects.filter(pk=config.pk).update(
+                last_sync=_now,
+                etag=download.etag[:255],
+                last_modified=download.last_modified[:64],
+                not_modified_count=F("not_modified_count") + 1,
             )
-            config.last_sync = _now
-            config.save()
-
-            for data in data_from_source:
-                data.update(owner=ingestion_user)
-                try:
-                    draft_page = generate_draft_from_external_data(
-                        factory_func=factory_func, data=data
-                    )
-                except ValidationError as ve:
-                    logger.warning("Problem ingesting article from %s: %s", data, ve)
-                else:
-                    draft_page.owner = ingestion_user
-                    draft_page.save()
-                    revision = draft_page.save_revision(
-                        submitted_for_moderation=True, user=ingestion_user
-                    )
-                    draft_page_revision_buffer.append(revision)
+            continue
+
+        # Everything that goes over the network is done first, outside of
+        # any transaction, so it isn't held open while waiting on it
+        staged_items = _stage_items(
+            exclude_ingested_items(
+                fetch_external_data(
+                    feed_url=config.source_url,
+                    last_synced=config.last_sync,
+                    feed_content=download.content,
+                )
+            )
+        )
+        draft_page_revision_buffer = _apply_staged_items(
+            config=config,
+            download=download,
+            staged_items=staged_items,
+            factory_func=factory_func,
+            ingestion_user=ingestion_user,
+            synced_at=_now,
+        )
 
         # If the transaction completes, we send the notification emails. If the
         # notifications don't send even tho the data is now set in the DB, it's
@@ -178,17 +375,235 @@ def ingest_content(type_: str):
                     )
 
 
-def _store_external_image(image_url: str) -> MozImage:
-    """Download an image from the given URL and store it as a Wagtail image"""
-    response = requests.get(image_url)
-    filename = image_url.split("/")[-1]
-    image = MozImage(
-        title=filename, file=ImageFile(BytesIO(response.content), name=filename)
+def _stage_items(data_from_source: list) -> list:
+    """Import the images for the given items from a feed, and return a list
+    of (data, StagedImage or None) for each of them"""
+    staged_images = stage_external_images(
+        [data["image_url"] for data in data_from_source if data.get("image_url")]
+    )
+    return [
+        (data, staged_images.get(data.get("image_url"))) for data in data_from_source
+    ]
+
+
+def _apply_staged_items(
+    config, download, staged_items, factory_func, ingestion_user, synced_at
+) -> list:
+    """Create a draft page, submitted for moderation, for each of the staged
+    items from the config's feed, and record that the feed has been synced, all
+    in one transaction. Return the revisions submitted."""
+    revisions = []
+    staged_names = {image.name for _, image in staged_items if image and image.name}
+    try:
+        with transaction.atomic():
+            # The validators are only stored if the feed is ingested, so it's
+            # parsed again next time if anything here fails
+            config.last_sync = synced_at
+            config.etag = download.etag[:255]
+            config.last_modified = download.last_modified[:64]
+            config.content_hash = get_content_hash(download.content)
+            config.fetched_count = F("fetched_count") + 1
+            config.save()
+
+            for data, staged_image in staged_items:
+                data.update(owner=ingestion_user)
+                try:
+                    with transaction.atomic():
+                        ingested_item = _record_ingested_item(config, data)
+                        if ingested_item is None:
+                            # By another run, since it was checked
+                            logger.info(
+                                f"Skipping {data['url']}, as it's been ingested"
+                            )
+                            continue
+                        draft_page = generate_draft_from_external_data(
+                            factory_func=factory_func,
+                            data=data,
+                            staged_image=staged_image,
+                            staged=True,
+                        )
+                except ValidationError as ve:
+                    logger.warning("Problem ingesting article from %s: %s", data, ve)
+                else:
+                    draft_page.owner = ingestion_user
+                    draft_page.save()
+                    revision = draft_page.save_revision(
+                        submitted_for_moderation=True, user=ingestion_user
+                    )
+                    revisions.append(revision)
+                    ingested_item.page = draft_page
+                    ingested_item.save(update_fields=["page"])
+    except Exception:
+        # Nothing was saved, so none of them were used
+        _discard_staged_images(staged_names)
+        raise
+    used_names = MozImage.objects.filter(file__in=staged_names).values_list(
+        "file", flat=True
+    )
+    _discard_staged_images(staged_names - set(used_names))
+    return revisions
+
+
+def _download_image(image_url: str, spool) -> SpooledImage:
+    """Download an image from the given URL into the spool file, raising a
+    ValueError if it's too big or isn't an image"""
+    response = get_session().get(
+        image_url,
+        stream=True,
+        timeout=(FEED_FETCH_CONNECT_TIMEOUT, FEED_FETCH_READ_TIMEOUT),
+    )
+    with response:
+        response.raise_for_status()
+        if int(response.headers.get("Content-Length") or 0) > IMAGE_MAX_BYTES:
+            raise ValueError(f"It's bigger than {IMAGE_MAX_BYTES} bytes")
+
+        file_hash, content_hash = hashlib.sha1(), hashlib.sha256()
+        for chunk in response.iter_content(IMAGE_DOWNLOAD_CHUNK_SIZE):
+            spool.write(chunk)
+            file_hash.update(chunk)
+            content_hash.update(chunk)
+            if spool.tell() > IMAGE_MAX_BYTES:
+                raise ValueError(f"It's bigger than {IMAGE_MAX_BYTES} bytes")
+
+    file_size = spool.tell()
+    spool.seek(0)
+    width, height = get_image_dimensions(spool)
+    if width is None or height is None:
+        raise ValueError("It isn't an image")
+
+    return SpooledImage(
+        title=image_url.split("/")[-1],
+        file=spool,
+        width=width,
+        height=height,
+        file_size=file_size,
+        file_hash=file_hash.hexdigest(),
+        content_hash=content_hash.hexdigest(),
     )
-    image.save()
+
+
+def _spool_external_image(image_url: str):
+    """Download an image from the given URL into a local spool file, and return
+    it as a SpooledImage, or None if it couldn't be downloaded. Its file needs
+    closing once it's been used."""
+    spool = tempfile.SpooledTemporaryFile(max_size=IMAGE_SPOOL_MAX_MEMORY)
+    try:
+        return _download_image(image_url, spool)
+    except (requests.RequestException, ValueError) as ex:
+        logger.warning(f"Couldn't download image {image_url}: {ex}")
+        spool.close()
+        return None
+
+
+def _upload_spooled_image(spooled_image: SpooledImage) -> str:
+    """Put a spooled image in the file storage, and return its name there"""
+    spooled_image.file.seek(0)
+    return MozImage._meta.get_field("file").storage.save(
+        MozImage().get_upload_to(spooled_image.title),
+        File(spooled_image.file, name=spooled_image.title),
+    )
+
+
+def stage_external_images(image_urls: list) -> dict:
+    """Download the images at the given URLs concurrently, and put any which
+    haven't been imported before in the file storage, ready for MozImages to be
+    made for them. Images are matched by their content, so one which has been
+    imported before, or appears at more than one of the URLs, is only stored
+    once. Return a dict of each URL: its StagedImage, or None if it couldn't be
+    downloaded."""
+    image_urls = list(dict.fromkeys(image_urls))  # Unique, in order
+    if not image_urls:
+        return {}
+
+    max_workers = min(len(image_urls), IMAGE_FETCH_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        spooled_images = dict(
+            zip(image_urls, executor.map(_spool_external_image, image_urls))
+        )
+        try:
+            spooled_by_hash = {}
+            for image in spooled_images.values():
+                if image is not None:
+                    spooled_by_hash.setdefault(image.content_hash, image)
+            existing_hashes = set(
+                MozImage.objects.filter(
+                    content_hash__in=spooled_by_hash.keys()
+                ).values_list("content_hash", flat=True)
+            )
+            new_images = [
+                image
+                for content_hash, image in spooled_by_hash.items()
+                if content_hash not in existing_hashes
+            ]
+            names = dict(
+                zip(
+                    [image.content_hash for image in new_images],
+                    executor.map(_upload_spooled_image, new_images),
+                )
+            )
+        finally:
+            for image in spooled_images.values():
+                if image is not None:
+                    image.file.close()
+
+    return {
+        image_url: StagedImage(
+            title=image.title,
+            name=names.get(image.content_hash),
+            width=image.width,
+            height=image.height,
+            file_size=image.file_size,
+            file_hash=image.file_hash,
+            content_hash=image.content_hash,
+        )
+        if image is not None
+        else None
+        for image_url, image in spooled_images.items()
+    }
+
+
+def _create_image(staged_image: StagedImage) -> MozImage:
+    """Return the MozImage with the same content as the staged image, making
+    one for it if there isn't one yet, or None if there's neither"""
+    image = MozImage.objects.filter(content_hash=staged_image.content_hash).first()
+    if image is None and staged_image.name:
+        image = MozImage(
+            title=staged_image.title,
+            file=staged_image.name,
+            width=staged_image.width,
+            height=staged_image.height,
+            file_size=staged_image.file_size,
+            file_hash=staged_image.file_hash,
+            content_hash=staged_image.content_hash,
+        )
+        try:
+            # In a savepoint, so a clash doesn't break the ingestion's transaction
+            with transaction.atomic():
+                image.save()
+        except IntegrityError:
+            # Another ingestion run has imported the same image since we looked,
+            # so use theirs. The staged file is then discarded as unused.
+            image = MozImage.objects.get(content_hash=staged_image.content_hash)
     return image
 
 
+def _discard_staged_images(names):
+    """Remove staged images, which weren't used, from the file storage"""
+    storage = MozImage._meta.get_field("file").storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception(f"Couldn't remove staged image {name}")
+
+
+def _store_external_image(image_url: str) -> MozImage:
+    """Download an image from the given URL and store it as a Wagtail image,
+    or return the one already stored with the same content"""
+    staged_image = stage_external_images([image_url])[image_url]
+    return _create_image(staged_image) if staged_image else None
+
+
 def _get_slug(data):
     """Return a slug for the Page being imported, making it unique (enough) by
     adding a 12-char truncated hash of the whole data payload at the end
@@ -248,10 +663,14 @@ def _make_video_page(data, extra_kwargs):
 
 
 @transaction.atomic()
-def generate_draft_from_external_data(factory_func, data, **kwargs):
+def generate_draft_from_external_data(
+    factory_func, data, staged_image=None, staged=False, **kwargs
+):
     """Create a draft page of the appropriate `model` (eg: ExternalArticle,
     Video) from the given `factory_func` and `data`, including any associated
     thumbnail (which is saved down as a Wagtail image on the card_image field).
+    If the thumbnail has already been `staged`, only the `staged_image` is
+    used, if there is one, so nothing is downloaded here.
     """
     logger.info(
         f"Generating a new draft using {factory_func.__name__} from {str(data)}"
@@ -260,8 +679,13 @@ def generate_draft_from_external_data(factory_func, data, **kwargs):
     page = factory_func(data=data, extra_kwargs=kwargs)
 
     # If there's an image to be associated, do that.
-    if data.get("image_url"):
+    if staged_image:
+        image = _create_image(staged_image)
+    elif data.get("image_url") and not staged:
         image = _store_external_image(data["image_url"])
+    else:
+        image = None
+    if image:
         page.card_image = image
         page.save()
     return page
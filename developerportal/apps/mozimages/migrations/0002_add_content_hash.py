@@ -0,0 +1,51 @@
+# Generated by Django 2.2.12 on 2026-10-18 08:32
+
+import hashlib
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def backfill_content_hashes(apps, schema_editor):
+    # So images which were imported before content hashes were recorded aren't
+    # imported again. If several images have the same content, only the first
+    # gets its hash, as hashes are unique; the others are left as they are.
+    MozImage = apps.get_model('mozimages', 'MozImage')
+    seen = set()
+    for image in MozImage.objects.order_by('pk').iterator():
+        content_hash = hashlib.sha256()
+        try:
+            with image.file.open('rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    content_hash.update(chunk)
+        except Exception:
+            logger.warning(f'Could not read the file of image {image.pk} to hash it')
+            continue
+        content_hash = content_hash.hexdigest()
+        if content_hash not in seen:
+            seen.add(content_hash)
+            MozImage.objects.filter(pk=image.pk).update(content_hash=content_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mozimages', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mozimage',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='mozimage',
+            constraint=models.UniqueConstraint(condition=models.Q(_negated=True, content_hash=''), fields=('content_hash',), name='mozimages_mozimage_unique_content_hash'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.functional import cached_property
 
 from wagtail.images.models import AbstractImage, AbstractRendition, Image
 
@@ -6,9 +7,34 @@ from wagtail.images.models import AbstractImage, AbstractRendition, Image
 class MozImage(AbstractImage):
     # Additional fields:
     caption = models.CharField(max_length=255, blank=True)
+    # The sha256 of imported images' files, so the same image isn't imported
+    # twice (see ingestion.utils.stage_external_images)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
 
     admin_form_fields = Image.admin_form_fields + ("caption",)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash"],
+                condition=~models.Q(content_hash=""),
+                name="mozimages_mozimage_unique_content_hash",
+            )
+        ]
+
+    @cached_property
+    def prefetched_renditions(self):
+        """Renditions of this image, keyed by filter spec, which have been
+        fetched in bulk by common.utils.prefetch_renditions"""
+        return {}
+
+    def get_rendition(self, filter):
+        spec = filter if isinstance(filter, str) else filter.spec
+        try:
+            return self.prefetched_renditions[spec]
+        except KeyError:
+            return super().get_rendition(filter)
+
 
 class Rendition(AbstractRendition):
     image = models.ForeignKey(
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.12 on 2026-10-18 06:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0045_assign_unlock_grouppagepermission'),
+        ('people', '0037_auto_20200511_1148'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentContributor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('author', 'Author'), ('speaker', 'Speaker')], max_length=16)),
+                ('date', models.DateField()),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributors', to='wagtailcore.Page')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributions', to='people.Person')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='contentcontributor',
+            index=models.Index(fields=['person', 'role', 'date'], name='people_cont_person__3fa790_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='contentcontributor',
+            unique_together={('person', 'page', 'role')},
+        ),
+    ]
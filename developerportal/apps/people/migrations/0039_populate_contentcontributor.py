@@ -0,0 +1,66 @@
+# Generated by Django 2.2.12 on 2026-10-18 06:50
+
+"""Populate ContentContributor from the `authors`/`speakers` StreamFields of
+every live page that credits people."""
+
+from django.db import migrations
+
+# As people.models.CONTRIBUTOR_FIELDS, at the time of this migration
+CONTRIBUTOR_FIELDS = {
+    ("articles", "Article"): ("authors", "author", "author", "date"),
+    ("events", "Event"): ("speakers", "speaker", "speaker", "start_date"),
+    ("externalcontent", "ExternalArticle"): ("authors", "author", "author", "date"),
+    ("externalcontent", "ExternalVideo"): ("speakers", "speaker", "speaker", "date"),
+    ("videos", "Video"): ("speakers", "speaker", "speaker", "date"),
+}
+
+
+def forwards(apps, schema_editor):
+    ContentContributor = apps.get_model("people", "ContentContributor")
+    Person = apps.get_model("people", "Person")
+    person_ids = set(Person.objects.values_list("pk", flat=True))
+
+    contributors = []
+    for model_name, spec in CONTRIBUTOR_FIELDS.items():
+        field_name, block_type, role, date_field = spec
+        PageSubclass = apps.get_model(*model_name)
+        for page in PageSubclass.objects.filter(live=True):
+            stream_value = getattr(page, field_name)
+            # Historical models give us the raw, JSON-ish stream data
+            blocks = stream_value.stream_data if stream_value else []
+            seen = set()
+            for block in blocks:
+                person_id = block.get("value")
+                if (
+                    block.get("type") == block_type
+                    and person_id in person_ids
+                    and person_id not in seen
+                ):
+                    seen.add(person_id)
+                    contributors.append(
+                        ContentContributor(
+                            person_id=person_id,
+                            page_id=page.pk,
+                            role=role,
+                            date=getattr(page, date_field),
+                        )
+                    )
+
+    ContentContributor.objects.bulk_create(contributors, batch_size=500)
+
+
+def backwards(apps, schema_editor):
+    apps.get_model("people", "ContentContributor").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("people", "0038_contentcontributor"),
+        ("articles", "0042_update_streamblock"),
+        ("events", "0026_make_events_page_body_optional"),
+        ("externalcontent", "0031_update_streamblock"),
+        ("videos", "0013_add_3_2_ratio_image"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
@@ -1,18 +1,22 @@
-from itertools import chain
-from operator import attrgetter
 from typing import List
 
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.db.models import (
     CASCADE,
     SET_NULL,
     CharField,
+    DateField,
     FileField,
     ForeignKey,
+    Index,
+    Model,
     Q,
     TextField,
 )
 
-from django_countries.fields import CountryField
+from django_countries.fields import Country, CountryField
 from modelcluster.contrib.taggit import ClusterTaggableManager
 from modelcluster.fields import ParentalKey
 from taggit.models import TaggedItemBase
@@ -30,6 +34,7 @@ from wagtail.core.models import Orderable
 from wagtail.images.edit_handlers import ImageChooserPanel
 
 from ..common.blocks import PersonalWebsiteBlock
+from ..common.cache_policy import SHORT_LIVED_POLICY
 from ..common.constants import (
     COUNTRY_QUERYSTRING_KEY,
     PAGINATION_QUERYSTRING_KEY,
@@ -39,7 +44,11 @@ from ..common.constants import (
     TOPIC_QUERYSTRING_KEY,
 )
 from ..common.models import BasePage
-from ..common.utils import get_past_event_cutoff, paginate_resources
+from ..common.utils import (
+    get_past_event_cutoff,
+    paginate_resources,
+    prefetch_card_images,
+)
 from ..common.validators import check_for_svg_file
 from .edit_handlers import CustomLabelFieldPanel
 
@@ -172,12 +181,14 @@ class People(BasePage):
 
     def get_relevant_countries(self):
         # Relevant here means a country that a published person is in
+        # Just the distinct codes, rather than DISTINCT ON whole pages, which
+        # isn't supported by sqlite
         raw_countries = (
-            person.country
-            for person in Person.published_objects.distinct("country").order_by(
-                "country"
-            )
-            if person.country
+            Country(code)
+            for code in Person.published_objects.order_by("country")
+            .values_list("country", flat=True)
+            .distinct()
+            if code
         )
 
         return [
@@ -212,6 +223,8 @@ class Person(BasePage):
     parent_page_types = ["People"]
     subpage_types = []
     template = "person.html"
+    # Lists the person's upcoming events
+    cache_policy = SHORT_LIVED_POLICY
 
     # Content fields
     nickname = CharField(max_length=250, null=True, blank=True)
@@ -346,54 +359,56 @@ class Person(BasePage):
         """
         return f'{self.title} aka "{self.nickname}"' if self.nickname else self.title
 
+    def _get_contributions(self, model_names, role, order_by="-date", **filters):
+        """Return the live pages of the given models which this person is
+        credited on in the given role, in the order given by `order_by`"""
+        content_types = ContentType.objects.get_for_models(
+            *[apps.get_model(name) for name in model_names]
+        ).values()
+        contributions = list(
+            self.contributions.filter(
+                role=role, page__content_type__in=content_types, **filters
+            )
+            .order_by(order_by, "page_id")
+            .values_list("page_id", "page__content_type", named=True)
+        )
+
+        pages = {}
+        for content_type in content_types:
+            pks = [
+                c.page_id
+                for c in contributions
+                if c.page__content_type == content_type.pk
+            ]
+            if pks:
+                model = content_type.model_class()
+                pages.update(model.published_objects.in_bulk(pks))
+        return prefetch_card_images(
+            [pages[c.page_id] for c in contributions if c.page_id in pages]
+        )
+
     @property
     def events(self):
         """
         Return upcoming events where this person is a speaker,
         ordered by start date
         """
-        from ..events.models import Event
-
-        upcoming_events = Event.published_objects.filter(
-            start_date__gte=get_past_event_cutoff()
+        return self._get_contributions(
+            ["events.Event"],
+            ContentContributor.ROLE_SPEAKER,
+            order_by="date",
+            date__gte=get_past_event_cutoff(),
         )
 
-        speaker_events = Event.published_objects.none()
-
-        for event in upcoming_events.all():
-            # add the event to the list if the current person is a speaker
-            if event.has_speaker(self):
-                speaker_events = speaker_events | Event.published_objects.page(event)
-
-        return speaker_events.order_by("start_date")
-
     @property
     def articles(self):
         """
         Return articles and external articles where this person is (one of) the authors,
         ordered by article date, most recent first
         """
-        from ..articles.models import Article
-        from ..externalcontent.models import ExternalArticle
-
-        articles = Article.published_objects.none()
-        external_articles = ExternalArticle.published_objects.none()
-
-        all_articles = Article.published_objects.all()
-        all_external_articles = ExternalArticle.published_objects.all()
-
-        for article in all_articles:
-            if article.has_author(self):
-                articles = articles | Article.published_objects.page(article)
-
-        for external_article in all_external_articles:
-            if external_article.has_author(self):
-                external_articles = external_articles | (
-                    ExternalArticle.published_objects.page(external_article)
-                )
-
-        return sorted(
-            chain(articles, external_articles), key=attrgetter("date"), reverse=True
+        return self._get_contributions(
+            ["articles.Article", "externalcontent.ExternalArticle"],
+            ContentContributor.ROLE_AUTHOR,
         )
 
     @property
@@ -402,27 +417,9 @@ class Person(BasePage):
         Return the most recent videos and external videos where this person is (one of)
         the speakers.
         """
-        from ..videos.models import Video
-        from ..externalcontent.models import ExternalVideo
-
-        videos = Video.published_objects.none()
-        external_videos = ExternalVideo.published_objects.none()
-
-        all_videos = Video.published_objects.all()
-        all_external_videos = ExternalVideo.published_objects.all()
-
-        for video in all_videos:
-            if video.has_speaker(self):
-                videos = videos | Video.published_objects.page(video)
-
-        for external_video in all_external_videos:
-            if external_video.has_speaker(self):
-                external_videos = external_videos | (
-                    ExternalVideo.published_objects.page(external_video)
-                )
-
-        return sorted(
-            chain(videos, external_videos), key=attrgetter("date"), reverse=True
+        return self._get_contributions(
+            ["videos.Video", "externalcontent.ExternalVideo"],
+            ContentContributor.ROLE_SPEAKER,
         )
 
     @property
@@ -445,3 +442,83 @@ class Person(BasePage):
         # on saved ones)
         topics = [pt.topic for pt in self.topics.all()]
         return [t for t in topics if t.live]
+
+
+# For each page type that credits people: the StreamField holding the credits,
+# the block type used for Person pages in it, the role they have, and the name
+# of the field holding the page's date.
+CONTRIBUTOR_FIELDS = {
+    "articles.Article": ("authors", "author", "author", "date"),
+    "events.Event": ("speakers", "speaker", "speaker", "start_date"),
+    "externalcontent.ExternalArticle": ("authors", "author", "author", "date"),
+    "externalcontent.ExternalVideo": ("speakers", "speaker", "speaker", "date"),
+    "videos.Video": ("speakers", "speaker", "speaker", "date"),
+}
+
+
+class ContentContributor(Model):
+    """Records that a Person is credited, as an author or speaker, on a live page.
+
+    Rows are extracted from the `authors`/`speakers` StreamFields of the page
+    types in CONTRIBUTOR_FIELDS whenever one is saved or published, so that the
+    pages for a Person can be found by an indexed lookup of their pk instead of
+    by walking every page's StreamField comparing titles.
+    """
+
+    ROLE_AUTHOR = "author"
+    ROLE_SPEAKER = "speaker"
+    ROLE_CHOICES = ((ROLE_AUTHOR, "Author"), (ROLE_SPEAKER, "Speaker"))
+
+    person = ForeignKey("Person", on_delete=CASCADE, related_name="contributions")
+    page = ForeignKey(
+        "wagtailcore.Page", on_delete=CASCADE, related_name="contributors"
+    )
+    role = CharField(max_length=16, choices=ROLE_CHOICES)
+    # The date of the page, eg the start date for Events
+    date = DateField()
+
+    class Meta:
+        unique_together = ("person", "page", "role")
+        indexes = [Index(fields=["person", "role", "date"])]
+
+    def __str__(self):
+        return "{} is {} of page {}".format(self.person_id, self.role, self.page_id)
+
+    @staticmethod
+    def get_contributor_models():
+        return [apps.get_model(name) for name in CONTRIBUTOR_FIELDS]
+
+    @classmethod
+    def from_page(cls, page):
+        """Return unsaved ContentContributors for each Person credited on the
+        given page"""
+        model_name = page._meta.label
+        field_name, block_type, role, date_field = CONTRIBUTOR_FIELDS[model_name]
+
+        person_ids = []
+        for block in getattr(page, field_name) or []:
+            if block.block_type == block_type and block.value:
+                if block.value.pk not in person_ids:
+                    person_ids.append(block.value.pk)
+
+        return [
+            cls(
+                person_id=person_id,
+                page_id=page.pk,
+                role=role,
+                date=getattr(page, date_field),
+            )
+            for person_id in person_ids
+        ]
+
+    @classmethod
+    @transaction.atomic()
+    def update_for_page(cls, page):
+        """Replace the contributors for the given page with those in its current
+        StreamField, or remove them if the page isn't live"""
+        if page._meta.label not in CONTRIBUTOR_FIELDS:
+            return []
+        cls.objects.filter(page_id=page.pk).delete()
+        if not page.live:
+            return []
+        return cls.objects.bulk_create(cls.from_page(page))
@@ -1,13 +1,18 @@
+import datetime
+import json
 from unittest import mock
 
 from django.db.models import Q
-from django.test import RequestFactory
+from django.test import RequestFactory, TestCase
 
 from developerportal.apps.common.test_helpers import PatchedWagtailPageTests
 
+from ...articles.models import Article, Articles
 from ...content.models import ContentPage
+from ...events.models import Event, Events
 from ...home.models import HomePage
-from ..models import People, Person
+from ...videos.models import Video, Videos
+from ..models import ContentContributor, People, Person
 
 
 class PersonTests(PatchedWagtailPageTests):
@@ -167,3 +172,119 @@ class PeopleTests(PatchedWagtailPageTests):
         ]
 
         self.assertEqual(output, expected)
+
+
+class ContentContributorTests(TestCase):
+    """Tests for the reverse index of people credited on pages."""
+
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        self.person = Person.published_objects.first()
+        self.other_person = Person(
+            title="Other Person", slug="other-person", job_title="Tester", country="DE"
+        )
+        People.objects.first().add_child(instance=self.other_person)
+
+    def _credits(self, block_type, *people, guest=True):
+        blocks = [{"type": block_type, "value": person.pk} for person in people]
+        if guest:
+            blocks.append({"type": f"external_{block_type}", "value": {"name": "G"}})
+        return json.dumps(blocks)
+
+    def _add_article(self, title, date, *authors, live=True):
+        article = Article(
+            title=title,
+            slug=title.lower(),
+            date=date,
+            live=live,
+            authors=self._credits("author", *authors),
+        )
+        Articles.objects.first().add_child(instance=article)
+        return article
+
+    def test_article_authors_are_extracted_on_save(self):
+        article = self._add_article(
+            "Both", datetime.date(2020, 1, 1), self.person, self.other_person
+        )
+        self.assertEqual(
+            set(
+                ContentContributor.objects.filter(page=article).values_list(
+                    "person_id", "role", "date"
+                )
+            ),
+            {
+                (self.person.pk, "author", datetime.date(2020, 1, 1)),
+                (self.other_person.pk, "author", datetime.date(2020, 1, 1)),
+            },
+        )
+
+    def test_draft_pages_are_not_extracted(self):
+        article = self._add_article(
+            "Draft", datetime.date(2020, 1, 1), self.person, live=False
+        )
+        self.assertFalse(ContentContributor.objects.filter(page=article).exists())
+
+    def test_unpublishing_and_deleting_remove_contributors(self):
+        article = self._add_article("Gone", datetime.date(2020, 1, 1), self.person)
+        article.unpublish()
+        self.assertFalse(ContentContributor.objects.filter(page=article).exists())
+
+        article = self._add_article("Deleted", datetime.date(2020, 1, 1), self.person)
+        article.delete()
+        self.assertFalse(ContentContributor.objects.filter(page=article).exists())
+
+    def test_draft_revisions_do_not_change_contributors(self):
+        article = self._add_article("Draft", datetime.date(2020, 1, 1), self.person)
+        article.authors = self._credits("author", self.other_person)
+        article.save_revision()
+        self.assertEqual(self.person.articles, [article])
+        self.assertEqual(self.other_person.articles, [])
+
+        Article.objects.get(pk=article.pk).get_latest_revision().publish()
+        self.assertEqual(self.person.articles, [])
+        self.assertEqual(self.other_person.articles, [article])
+
+    def test_person_articles(self):
+        older = self._add_article("Older", datetime.date(2019, 1, 1), self.person)
+        newer = self._add_article("Newer", datetime.date(2020, 1, 1), self.person)
+        self._add_article("Other", datetime.date(2020, 1, 1), self.other_person)
+
+        # One query for the contributions, one for the Articles among them
+        with self.assertNumQueries(2):
+            articles = self.person.articles
+        self.assertEqual(articles, [newer.specific, older.specific])
+
+    def test_person_videos(self):
+        video = Video(
+            title="Video",
+            slug="video",
+            date=datetime.date(2020, 1, 1),
+            speakers=self._credits("speaker", self.person, guest=False),
+        )
+        Videos.objects.first().add_child(instance=video)
+        self.assertEqual(self.person.videos, [video])
+        self.assertEqual(self.person.articles, [])
+
+    def test_person_events__upcoming_only(self):
+        events_page = Events.objects.first()
+        today = datetime.date.today()
+        upcoming = Event(
+            title="Upcoming",
+            slug="upcoming",
+            start_date=today + datetime.timedelta(days=7),
+            speakers=self._credits("speaker", self.person),
+        )
+        past = Event(
+            title="Past",
+            slug="past",
+            start_date=today - datetime.timedelta(days=7),
+            speakers=self._credits("speaker", self.person),
+        )
+        events_page.add_child(instance=upcoming)
+        events_page.add_child(instance=past)
+
+        self.assertEqual(
+            ContentContributor.objects.filter(person=self.person).count(), 2
+        )
+        self.assertEqual(self.person.events, [upcoming])
@@ -1,7 +1,9 @@
+from django.db.models.signals import post_save
+
 from wagtail.contrib.modeladmin.options import ModelAdmin, modeladmin_register
 
 from ..common.helpers import ExplorerRedirectAdminURLHelper
-from .models import People
+from .models import ContentContributor, People
 
 
 class PeopleAdmin(ModelAdmin):
@@ -12,3 +14,20 @@ class PeopleAdmin(ModelAdmin):
 
 
 modeladmin_register(PeopleAdmin)
+
+
+def update_content_contributors(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Re-extract the people credited on a page whenever its content is saved,
+    which includes when it is published or unpublished.
+
+    Saves with update_fields are skipped: Wagtail uses them when saving a draft
+    revision, when the in-memory page has unpublished content."""
+    if raw or update_fields is not None:
+        return
+    ContentContributor.update_for_page(instance)
+
+
+for model in ContentContributor.get_contributor_models():
+    post_save.connect(update_content_contributors, sender=model)
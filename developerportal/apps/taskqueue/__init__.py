@@ -1,3 +1,4 @@
+from . import instrumentation  # noqa: F401 - connects its signal handlers
 from .celery import app as celery_app
 
 # Make sure Celery is always imported when Django starts
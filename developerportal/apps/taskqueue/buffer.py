@@ -0,0 +1,121 @@
+"""A buffer for CDN invalidations, so that a burst of them, such as a moderator
+publishing thirty pages one after another, is sent to CloudFront as one.
+
+Requested paths are collected in the shared cache (Redis), collapsed under any
+wildcards which cover them. The flush_cdn_invalidations task sends them once
+no more have been requested for settings.CDN_INVALIDATION_QUIET_PERIOD, or
+straight away once there are settings.CDN_INVALIDATION_MAX_PATHS of them or the
+oldest has waited settings.CDN_INVALIDATION_MAX_WAIT. If CloudFront can't be
+reached, the paths are put back in the buffer, so they aren't lost.
+"""
+
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .invalidation import ALL_PATHS
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_BUFFER = "cdn-invalidation-buffer"
+CACHE_KEY_LOCK = "cdn-invalidation-buffer-lock"
+
+# How long the lock can be held for before it expires, in case its holder dies
+LOCK_TIMEOUT = 10
+LOCK_ATTEMPTS = 50
+LOCK_RETRY_DELAY = 0.1
+
+# CloudFront's limits on the paths in invalidations in progress at once, see
+# https://docs.aws.amazon.com/AmazonCloudFront/latest/DeveloperGuide/cloudfront-limits.html#limits-invalidations
+CLOUDFRONT_MAX_PATHS = 3000
+CLOUDFRONT_MAX_WILDCARD_PATHS = 15
+
+
+class BufferLocked(Exception):
+    pass
+
+
+@contextmanager
+def _lock():
+    token = uuid.uuid4().hex
+    for _ in range(LOCK_ATTEMPTS):
+        # add() only sets the key if it isn't already set, atomically
+        if cache.add(CACHE_KEY_LOCK, token, LOCK_TIMEOUT):
+            try:
+                yield
+            finally:
+                _unlock(token)
+            return
+        time.sleep(LOCK_RETRY_DELAY)
+    raise BufferLocked("Couldn't lock the CDN invalidation buffer")
+
+
+def _unlock(token):
+    # If we held the lock for longer than LOCK_TIMEOUT, it expired and another
+    # worker may have taken it since, so it's only ours to release if it still
+    # holds our token
+    if cache.get(CACHE_KEY_LOCK) == token:
+        cache.delete(CACHE_KEY_LOCK)
+
+
+def collapse_paths(paths):
+    """Return the given paths, sorted and without any which are covered by a
+    wildcard path among them. If there are more than CloudFront allows in one
+    invalidation, return ALL_PATHS instead."""
+    paths = set(paths)
+    prefixes = [path[:-1] for path in paths if path.endswith("*")]
+    collapsed = sorted(
+        path
+        for path in paths
+        if not any(
+            path.startswith(prefix) and path != f"{prefix}*" for prefix in prefixes
+        )
+    )
+
+    wildcard_count = len([path for path in collapsed if path.endswith("*")])
+    if (
+        len(collapsed) > CLOUDFRONT_MAX_PATHS
+        or wildcard_count > CLOUDFRONT_MAX_WILDCARD_PATHS
+    ):
+        return ALL_PATHS
+    return collapsed
+
+
+def add_paths(paths):
+    """Add the given paths to the buffer. Return True if it is now full, so
+    should be flushed straight away."""
+    now = time.time()
+    with _lock():
+        buffer = cache.get(CACHE_KEY_BUFFER) or {"paths": [], "first_requested": now}
+        buffer["paths"] = collapse_paths(buffer["paths"] + list(paths))
+        buffer["last_requested"] = now
+        cache.set(CACHE_KEY_BUFFER, buffer, None)
+    return len(buffer["paths"]) >= settings.CDN_INVALIDATION_MAX_PATHS
+
+
+def _is_due(buffer, now):
+    return (
+        now - buffer["last_requested"] >= settings.CDN_INVALIDATION_QUIET_PERIOD
+        or now - buffer["first_requested"] >= settings.CDN_INVALIDATION_MAX_WAIT
+        or len(buffer["paths"]) >= settings.CDN_INVALIDATION_MAX_PATHS
+    )
+
+
+def take_paths(force=False):
+    """Empty the buffer and return its paths, if it's due to be flushed (or
+    `force` is True). Otherwise, return an empty list and leave it be."""
+    with _lock():
+        buffer = cache.get(CACHE_KEY_BUFFER)
+        if not buffer or not (force or _is_due(buffer, time.time())):
+            return []
+        cache.delete(CACHE_KEY_BUFFER)
+    return buffer["paths"]
+
+
+def get_buffered_paths():
+    buffer = cache.get(CACHE_KEY_BUFFER)
+    return buffer["paths"] if buffer else []
@@ -1,3 +1,4 @@
+import datetime
 import os
 
 from django.conf import settings
@@ -16,20 +17,93 @@ app.config_from_object("django.conf:settings")
 
 app.autodiscover_tasks()
 
+# Tasks are routed to queues by how urgent they are, so that latency-sensitive
+# ones, like CDN invalidations and publishing pages at their scheduled time,
+# never wait behind bulk work like ingestion. Each queue can be consumed by its
+# own workers, with their own concurrency and prefetch settings - see
+# k8s/celery.yaml.j2 and the k8s-celery-deployments target in k8s/Makefile
+QUEUE_DEFAULT = "celery"
+QUEUE_CDN = "cdn"
+QUEUE_PUBLISHING = "publishing"
+QUEUE_INGESTION = "ingestion"
+QUEUES = (QUEUE_DEFAULT, QUEUE_CDN, QUEUE_PUBLISHING, QUEUE_INGESTION)
+
+app.conf.task_default_queue = QUEUE_DEFAULT
+app.conf.task_routes = {
+    "developerportal.apps.taskqueue.tasks.invalidate_entire_cdn": {"queue": QUEUE_CDN},
+    "developerportal.apps.taskqueue.tasks.invalidate_cdn_paths": {"queue": QUEUE_CDN},
+    "developerportal.apps.taskqueue.tasks.flush_cdn_invalidations": {
+        "queue": QUEUE_CDN
+    },
+    "developerportal.apps.taskqueue.tasks.selectively_invalidate_cdn": {
+        "queue": QUEUE_CDN
+    },
+    "developerportal.apps.taskqueue.tasks.publish_scheduled_pages": {
+        "queue": QUEUE_PUBLISHING
+    },
+    "developerportal.apps.taskqueue.tasks.publish_scheduled_revision": {
+        "queue": QUEUE_PUBLISHING
+    },
+    "developerportal.apps.taskqueue.tasks.expire_scheduled_page": {
+        "queue": QUEUE_PUBLISHING
+    },
+    "developerportal.apps.taskqueue.tasks.reconcile_scheduled_pages": {
+        "queue": QUEUE_PUBLISHING
+    },
+    "developerportal.apps.ingestion.tasks.ingest_articles": {"queue": QUEUE_INGESTION},
+    "developerportal.apps.ingestion.tasks.ingest_videos": {"queue": QUEUE_INGESTION},
+    "developerportal.apps.taskqueue.tasks.delete_expired_task_results": {
+        "queue": QUEUE_DEFAULT
+    },
+}
+
+# Most of our tasks are fire-and-forget, and nobody reads their results, so
+# results (TaskResult rows, with the django-db backend) are only stored for
+# tasks which opt in with ignore_result=False. They're kept for their TTL here,
+# or RESULT_TTL_DEFAULT, then deleted in batches by delete_expired_task_results.
+app.conf.task_ignore_result = True
+# So that results record which task they're for, to find their TTL
+app.conf.result_extended = True
+# Otherwise celery beat also schedules its own celery.backend_cleanup task,
+# which deletes every expired result in one statement
+app.conf.result_expires = None
+RESULT_TTL_DEFAULT = datetime.timedelta(days=1)
+RESULT_TTLS = {
+    "developerportal.apps.ingestion.tasks.ingest_articles": datetime.timedelta(days=14),
+    "developerportal.apps.ingestion.tasks.ingest_videos": datetime.timedelta(days=14),
+}
+
 app.conf.beat_schedule = {
-    "run-publish-scheduled-command-every-hour": {
+    "reconcile-scheduled-pages-every-fifteen-minutes": {
+        "task": "developerportal.apps.taskqueue.tasks.reconcile_scheduled_pages",
+        # More often than scheduling.SCHEDULING_HORIZON, so that every scheduled
+        # time is queued by at least one run
+        "schedule": crontab(minute="*/15"),
+        "args": (),
+    },
+    "run-publish-scheduled-command-every-day": {
         "task": ("developerportal.apps.taskqueue.tasks.publish_scheduled_pages"),
-        "schedule": crontab(minute=55),  # Five minutes to each hour
+        "schedule": crontab(minute=55, hour=3),
+        "args": (),
+    },
+    "delete-expired-task-results-every-hour": {
+        "task": "developerportal.apps.taskqueue.tasks.delete_expired_task_results",
+        "schedule": crontab(minute=43),
+        "args": (),
+    },
+    "flush-cdn-invalidations-every-minute": {
+        "task": "developerportal.apps.taskqueue.tasks.flush_cdn_invalidations",
+        # Enforces CDN_INVALIDATION_MAX_WAIT, and flushes the buffer even if the
+        # flush scheduled when paths were last added to it was lost
+        "schedule": crontab(),
         "args": (),
     },
     "selectively-purge-cdn-every-night": {
         "task": "developerportal.apps.taskqueue.tasks.selectively_invalidate_cdn",
-        "schedule": crontab(minute=15, hour=0),  # 15 past midnight
+        # Just after midnight, when events move from upcoming to past
+        "schedule": crontab(minute=1, hour=0),
         "args": (),
     },
-    # We're registering these tasks on behalf of `developerportal.apps.ingestion`
-    # because we only want to run one celerybeat scheduler (for now) to keep things
-    # simpler at the ops level.
     "ingest-articles-every-two-hours": {
         "task": ("developerportal.apps.ingestion.tasks.ingest_articles"),
         "schedule": crontab(minute=17, hour="*/2"),  # Every two hours, at 17 min past
@@ -0,0 +1,192 @@
+"""Records how long Celery tasks wait in their queue and take to run, and how
+they turn out, so we can tell how long ingestion, CDN invalidations and
+scheduled publishing actually take.
+
+Each task is stamped with the time it was queued when it's sent. When it has
+run, a sample is recorded for it: how long it waited between being due (when it
+was queued, or its ETA if later) and starting, how long it ran for, how many
+times it had been retried, and its outcome.
+
+Samples are kept in the shared cache (Redis) in hourly buckets, which expire
+after WINDOW_HOURS. Each has its own key, numbered with an atomic counter, so
+workers don't overwrite each other's. At most MAX_SAMPLES_PER_BUCKET are kept
+per task per hour, so the store stays small however busy the queues are. Each
+outcome is still counted.
+
+See taskqueue.views.task_timings for the report in the Wagtail admin.
+"""
+
+import logging
+import math
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
+
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun
+
+logger = logging.getLogger(__name__)
+
+HEADER_QUEUED_AT = "queued_at"
+
+CACHE_KEY_COUNT = "task-timing:{}:{}:count"
+CACHE_KEY_SAMPLE = "task-timing:{}:{}:{}"
+CACHE_KEY_OUTCOME = "task-timing:{}:{}:outcome:{}"
+CACHE_KEY_LAST_ERROR = "task-timing:{}:last-error"
+
+BUCKET_SIZE = 60 * 60
+WINDOW_HOURS = 24
+MAX_SAMPLES_PER_BUCKET = 200
+OUTCOMES = ("SUCCESS", "FAILURE", "RETRY")
+PERCENTILES = (50, 90, 99)
+
+# When each task running in this process started, by task id
+_started = {}
+
+
+def _get_bucket(timestamp):
+    return int(timestamp // BUCKET_SIZE)
+
+
+def _get_buckets(now):
+    current = _get_bucket(now)
+    return range(current - WINDOW_HOURS + 1, current + 1)
+
+
+def _incr(key):
+    timeout = (WINDOW_HOURS + 1) * BUCKET_SIZE
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between the two
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def record_sample(task_name, latency, runtime, retries, outcome, now=None):
+    """Add a sample for a run of the named task, with its latency and runtime
+    in seconds. The latency may be None, if it wasn't stamped when queued."""
+    bucket = _get_bucket(now or time.time())
+    _incr(CACHE_KEY_OUTCOME.format(task_name, bucket, outcome))
+    index = _incr(CACHE_KEY_COUNT.format(task_name, bucket))
+    if index <= MAX_SAMPLES_PER_BUCKET:
+        cache.set(
+            CACHE_KEY_SAMPLE.format(task_name, bucket, index),
+            (latency, runtime, retries, outcome),
+            (WINDOW_HOURS + 1) * BUCKET_SIZE,
+        )
+
+
+def get_samples(task_name, now=None):
+    """Return the samples for the named task within the window, as a list of
+    (latency, runtime, retries, outcome) tuples"""
+    buckets = _get_buckets(now or time.time())
+    counts = cache.get_many([CACHE_KEY_COUNT.format(task_name, b) for b in buckets])
+    sample_keys = [
+        CACHE_KEY_SAMPLE.format(task_name, bucket, index)
+        for bucket in buckets
+        for index in range(
+            1,
+            min(
+                counts.get(CACHE_KEY_COUNT.format(task_name, bucket), 0),
+                MAX_SAMPLES_PER_BUCKET,
+            )
+            + 1,
+        )
+    ]
+    return list(cache.get_many(sample_keys).values())
+
+
+def get_outcomes(task_name, now=None):
+    """Return a Counter of how many runs of the named task had each outcome
+    within the window, including any beyond the samples kept"""
+    keys = {
+        CACHE_KEY_OUTCOME.format(task_name, bucket, outcome): outcome
+        for bucket in _get_buckets(now or time.time())
+        for outcome in OUTCOMES
+    }
+    outcomes = Counter()
+    for key, count in cache.get_many(keys).items():
+        outcomes[keys[key]] += count
+    return outcomes
+
+
+def percentile(values, percent):
+    """Return the given percentile of the values, by the nearest-rank method,
+    or None if there are none"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def get_summary(task_name, now=None):
+    """Return a dict summarising the named task's runs within the window. Its
+    latency and runtime percentiles are lists, in the order of PERCENTILES."""
+    samples = get_samples(task_name, now)
+    latencies = [sample[0] for sample in samples if sample[0] is not None]
+    runtimes = [sample[1] for sample in samples]
+    outcomes = get_outcomes(task_name, now)
+    return {
+        "name": task_name,
+        "runs": sum(outcomes.values()),
+        "outcomes": {outcome: outcomes[outcome] for outcome in OUTCOMES},
+        "retried": len([sample for sample in samples if sample[2]]),
+        "latency": [percentile(latencies, p) for p in PERCENTILES],
+        "runtime": [percentile(runtimes, p) for p in PERCENTILES],
+        "max_runtime": max(runtimes) if runtimes else None,
+        "last_error": cache.get(CACHE_KEY_LAST_ERROR.format(task_name)),
+    }
+
+
+def _get_due_at(request):
+    queued_at = getattr(request, HEADER_QUEUED_AT, None)
+    if queued_at is None:
+        return None
+    eta = parse_datetime(request.eta) if request.eta else None
+    return max(queued_at, eta.timestamp()) if eta else queued_at
+
+
+@before_task_publish.connect
+def stamp_queued_at(headers=None, **kwargs):
+    if headers is not None:
+        headers[HEADER_QUEUED_AT] = time.time()
+
+
+@task_prerun.connect
+def record_start(task_id=None, **kwargs):
+    _started[task_id] = (time.time(), time.monotonic())
+
+
+@task_postrun.connect
+def record_finish(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    started_at, started_monotonic = started
+    due_at = _get_due_at(task.request)
+    try:
+        record_sample(
+            task.name,
+            latency=max(started_at - due_at, 0) if due_at is not None else None,
+            runtime=time.monotonic() - started_monotonic,
+            retries=task.request.retries or 0,
+            outcome=state,
+        )
+    except Exception:
+        # Never let instrumentation break a task
+        logger.exception(f"Couldn't record the timing of {task.name}")
+
+
+@task_failure.connect
+def record_failure(sender=None, exception=None, **kwargs):
+    if sender is None:
+        return
+    cache.set(
+        CACHE_KEY_LAST_ERROR.format(sender.name),
+        {"time": time.time(), "error": repr(exception)},
+        (WINDOW_HOURS + 1) * BUCKET_SIZE,
+    )
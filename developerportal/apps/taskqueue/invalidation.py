@@ -0,0 +1,216 @@
+"""Works out which paths in the CDN need invalidating when a page is published
+or unpublished, from the other pages its content appears on, rather than
+purging everything.
+
+Pages which appear on every page of the site, in the navigation menu or as a
+directory page, still need everything purging.
+
+It also works out which need invalidating when events move from being upcoming
+to being past, which is otherwise not marked by anything being published.
+"""
+
+import datetime
+from itertools import chain
+
+from wagtail.core.models import Page
+
+from ..articles.models import Article, Articles
+from ..common.directory import affects_directory_pages
+from ..common.feed import RssFeeds
+from ..common.menu import affects_menu
+from ..events.models import Event, Events
+from ..externalcontent.models import ExternalEvent
+from ..home.models import HomePage
+from ..people.models import CONTRIBUTOR_FIELDS, ContentContributor, Person
+from ..topics.models import Topic, TopicPerson
+from ..videos.models import Video
+
+ALL_PATHS = ["/*"]
+FEED_PATH = RssFeeds.link
+SITEMAP_PATH = "/sitemap.xml"
+
+# The page types which appear in the RSS feed
+FEED_MODELS = ("articles.Article", "videos.Video")
+
+# The listing page types which list each resource type, wherever in the tree
+# the resource is, eg ingested External* pages, which aren't under a listing
+LISTING_MODELS = {"article": Articles, "video": Articles, "event": Events}
+
+# The page types which list Articles and Videos sharing a topic with them, as
+# their related_resources
+RELATED_RESOURCE_MODELS = (Article, Video)
+
+
+def get_path(page):
+    """Return the path of the given page within its site, or None if it isn't
+    routable"""
+    url_parts = page.get_url_parts()
+    return url_parts[2] if url_parts else None
+
+
+def _get_listing_path(listing_page):
+    path = get_path(listing_page) if listing_page else None
+    if not path or path == "/":
+        # A site root is never a listing to wildcard, as that would be everything
+        return path
+    # Listings' filtered and paginated variants are cached separately
+    return f"{path}*"
+
+
+def _get_listing_paths(page):
+    """The listings which the given page appears on"""
+    listing_model = LISTING_MODELS.get(getattr(page, "resource_type", None))
+    if listing_model is None:
+        return [_get_listing_path(page.get_parent())]
+    return [_get_listing_path(listing) for listing in listing_model.objects.live()]
+
+
+def _is_covered(path, wildcard_paths):
+    return any(
+        path.startswith(wildcard[:-1])
+        for wildcard in wildcard_paths
+        if wildcard and wildcard.endswith("*")
+    )
+
+
+def _get_related_resource_pages(page):
+    """The Article and Video pages which show the given page in their related
+    resources, if it's an article or video"""
+    if page.resource_type not in ("article", "video"):
+        return []
+    topic_ids = [relation.topic_id for relation in page.topics.all()]
+    if not topic_ids:
+        return []
+    return list(
+        chain.from_iterable(
+            model.objects.live()
+            .filter(topics__topic__in=topic_ids)
+            .exclude(pk=page.pk)
+            .distinct()
+            for model in RELATED_RESOURCE_MODELS
+        )
+    )
+
+
+def _get_topics(page):
+    """The Topic pages which the given page appears on"""
+    if isinstance(page, Topic):
+        # Topics are listed on their parent topics
+        return [relation.parent for relation in page.parent_topics.all()]
+    if isinstance(page, Person):
+        return [
+            relation.topic
+            for relation in TopicPerson.objects.filter(person=page).select_related(
+                "topic"
+            )
+        ]
+    if hasattr(page, "topics"):
+        return [relation.topic for relation in page.topics.all()]
+    return []
+
+
+def _get_people(page):
+    """The Person pages which the given page appears on, as its authors or
+    speakers"""
+    if isinstance(page, ExternalEvent):
+        return [relation.speaker for relation in page.speakers.all()]
+    if page._meta.label in CONTRIBUTOR_FIELDS:
+        person_ids = [c.person_id for c in ContentContributor.from_page(page)]
+        return Person.objects.filter(pk__in=person_ids)
+    return []
+
+
+def _get_contributions(page):
+    """The pages which credit the given page, if it's a Person"""
+    if not isinstance(page, Person):
+        return []
+    return Page.objects.filter(
+        pk__in=ContentContributor.objects.filter(person=page).values("page_id")
+    ).live()
+
+
+def _is_featured_on(home_page, page):
+    blocks = list(home_page.featured or []) + list(home_page.featured_people or [])
+    return any(getattr(block.value, "pk", None) == page.pk for block in blocks)
+
+
+def _get_home_pages(page):
+    """The HomePages which feature the given page"""
+    home_pages = HomePage.objects.live()
+    if isinstance(page, Topic) and not page.parent_topics.exists():
+        # Top-level topics are all linked to from the home page
+        return home_pages
+    return [home_page for home_page in home_pages if _is_featured_on(home_page, page)]
+
+
+def get_invalidation_paths(page):
+    """Return a sorted list of the CDN paths to invalidate after the given page
+    has been published or unpublished: the page itself, the listings it's on,
+    the Articles and Videos showing it as a related resource, the Topic and
+    Person pages it appears on, any HomePage featuring it, the RSS feed if
+    it's in it, and the sitemap."""
+    page = page.specific
+    if affects_menu(page) or affects_directory_pages(page):
+        return ALL_PATHS
+
+    listing_paths = _get_listing_paths(page)
+    paths = {get_path(page), SITEMAP_PATH, *listing_paths}
+    if page._meta.label in FEED_MODELS:
+        paths.add(FEED_PATH)
+    for related_page in _get_related_resource_pages(page):
+        path = get_path(related_page)
+        # Most are Articles, which the Articles listing's wildcard covers
+        if path and not _is_covered(path, listing_paths):
+            paths.add(path)
+    for related_page in (
+        _get_topics(page)
+        + list(_get_people(page))
+        + list(_get_contributions(page))
+        + list(_get_home_pages(page))
+    ):
+        paths.add(get_path(related_page))
+
+    paths.discard(None)
+    return sorted(paths)
+
+
+def get_events_crossing_boundary(date):
+    """Return the live Events and ExternalEvents which move between listings on
+    the given date: those which are listed as past events from that day, the
+    day after they start, and those which are no longer listed as upcoming,
+    two days after. Both happen at midnight UTC, when get_past_event_cutoff()
+    moves on to the day before."""
+    start_dates = [
+        date - datetime.timedelta(days=1),
+        date - datetime.timedelta(days=2),
+    ]
+    return list(
+        chain(
+            Event.objects.live().filter(start_date__in=start_dates),
+            ExternalEvent.objects.live().filter(start_date__in=start_dates),
+        )
+    )
+
+
+def get_event_boundary_invalidation_paths(date):
+    """Return a sorted list of the CDN paths to invalidate on the given date,
+    because of events reaching one of their boundary dates: the Events
+    listing, the events' own pages, and the Topic pages and speakers' Person
+    pages which list upcoming events. Empty if no events do."""
+    events = get_events_crossing_boundary(date)
+    if not events:
+        return []
+
+    paths = set()
+    for events_page in Events.objects.live():
+        paths.add(_get_listing_path(events_page))
+    for event in events:
+        if isinstance(event, Event):
+            # Whether it's upcoming is shown on the page itself, though this
+            # is usually covered by the Events listing's wildcard
+            paths.add(get_path(event))
+        for related_page in _get_topics(event) + list(_get_people(event)):
+            paths.add(get_path(related_page))
+
+    paths.discard(None)
+    return sorted(paths)
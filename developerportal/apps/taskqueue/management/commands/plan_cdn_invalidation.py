@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail.core.models import Page
+
+from developerportal.apps.taskqueue.invalidation import get_invalidation_paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the CDN paths which publishing or unpublishing the given pages "
+        "would invalidate, without invalidating anything"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("page_ids", nargs="+", type=int)
+
+    def handle(self, *args, **options):
+        for page_id in options["page_ids"]:
+            try:
+                page = Page.objects.get(pk=page_id)
+            except Page.DoesNotExist:
+                raise CommandError(f"Page {page_id} does not exist")
+            self.stdout.write(f"{page.title} ({page_id}):")
+            for path in get_invalidation_paths(page):
+                self.stdout.write(f"  {path}")
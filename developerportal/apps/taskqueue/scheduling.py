@@ -0,0 +1,72 @@
+"""Publishes and unpublishes pages at the times they're scheduled for, to the
+minute, with Celery tasks given an ETA of that time, rather than waiting for the
+next run of Wagtail's publish_scheduled_pages command.
+
+When a revision is approved with a go-live time in the future, or a page with
+an expiry time is published, a task is queued to run at that time. Tasks are
+only queued for times within SCHEDULING_HORIZON, as the workers hold ETA tasks
+in memory until they are due, and Redis redelivers any held for longer than its
+visibility timeout (an hour). Later ones are queued by the reconciliation sweep
+once they come within it. The sweep also publishes or expires anything overdue,
+in case a task was lost.
+
+When they run, the tasks check that the page is still scheduled for that time,
+so they can safely run more than once, or after it has been rescheduled.
+
+See the tasks in taskqueue.tasks for how it's used.
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
+
+from wagtail.core.models import Page, PageRevision
+
+# How far ahead tasks are queued. The reconciliation sweep runs more often
+# than this, so every scheduled time is queued by at least one sweep.
+SCHEDULING_HORIZON = datetime.timedelta(minutes=30)
+
+CACHE_KEY_QUEUED = "scheduled-publishing:{}:{}:{}"
+
+
+def get_revisions_to_publish(until):
+    """Return the revisions approved to go live by the given time"""
+    return PageRevision.objects.filter(approved_go_live_at__lte=until).order_by(
+        "approved_go_live_at"
+    )
+
+
+def get_pages_to_expire(until):
+    """Return the live pages due to expire by the given time"""
+    return Page.objects.live().filter(expire_at__lte=until).order_by("expire_at")
+
+
+def get_scheduled_revision(revision_id, go_live_at):
+    """Return the revision, if it's still approved to go live at the given time
+    (as an ISO 8601 string), otherwise None"""
+    return PageRevision.objects.filter(
+        pk=revision_id, approved_go_live_at=parse_datetime(go_live_at)
+    ).first()
+
+
+def get_scheduled_page(page_id, expire_at):
+    """Return the page, if it's still live and due to expire at the given time
+    (as an ISO 8601 string), otherwise None"""
+    return (
+        Page.objects.live()
+        .filter(pk=page_id, expire_at=parse_datetime(expire_at))
+        .first()
+    )
+
+
+def is_within_horizon(when, now):
+    return when <= now + SCHEDULING_HORIZON
+
+
+def mark_queued(action, object_id, when, now):
+    """Record that a task has been queued to carry out the action on the object
+    at the given time. Return False if one already has been."""
+    timeout = (when - now + SCHEDULING_HORIZON).total_seconds()
+    key = CACHE_KEY_QUEUED.format(action, object_id, when.isoformat())
+    return cache.add(key, True, max(int(timeout), 1))
@@ -1,26 +1,123 @@
 import logging
 import os
 
+from django.conf import settings
 from django.core.management import call_command
+from django.utils.timezone import now as tz_now
 
-from developerportal.apps.taskqueue.celery import app
+from django_celery_results.models import TaskResult
 
-from ..events.models import Events
-from ..people.models import People
-from ..topics.models import Topics
+from developerportal.apps.common.response_cache import EVENT_CUTOFF_TAG, invalidate_tags
+from developerportal.apps.taskqueue.celery import RESULT_TTL_DEFAULT, RESULT_TTLS, app
+
+from . import buffer, scheduling
+from .invalidation import get_event_boundary_invalidation_paths
 from .utils import invalidate_cdn
 
 logging.basicConfig(level=os.environ.get("LOGLEVEL", logging.INFO))
 logger = logging.getLogger(__name__)
 
+# How many task results are deleted at once, so no one statement holds locks
+# on the table for long
+RESULT_CLEANUP_BATCH_SIZE = 1000
+
 
 @app.task
 def publish_scheduled_pages():
+    """Run Wagtail's publish_scheduled_pages command, which also drops expired
+    revisions from the moderation queue. Pages are published and expired on
+    time by the tasks below, so this is only a daily safety net."""
     log_prefix = "[Publish scheduled pages]"
     logger.info(f"{log_prefix} Trying to publish/unpublish scheduled pages")
     call_command("publish_scheduled_pages")
 
 
+def queue_go_live(revision, now=None):
+    """Queue a task to publish the revision at its approved go-live time, if
+    that's within the scheduling horizon and one hasn't already been queued"""
+    now = now or tz_now()
+    go_live_at = revision.approved_go_live_at
+    if not scheduling.is_within_horizon(go_live_at, now) or not (
+        scheduling.mark_queued("go-live", revision.pk, go_live_at, now)
+    ):
+        return
+    publish_scheduled_revision.apply_async(
+        args=[revision.pk, go_live_at.isoformat()], eta=go_live_at
+    )
+
+
+def queue_expiry(page, now=None):
+    """Queue a task to unpublish the page at its expiry time, if that's within
+    the scheduling horizon and one hasn't already been queued"""
+    now = now or tz_now()
+    expire_at = page.expire_at
+    if not scheduling.is_within_horizon(expire_at, now) or not (
+        scheduling.mark_queued("expiry", page.pk, expire_at, now)
+    ):
+        return
+    expire_scheduled_page.apply_async(
+        args=[page.pk, expire_at.isoformat()], eta=expire_at
+    )
+
+
+@app.task
+def publish_scheduled_revision(revision_id, go_live_at):
+    """Publish the revision, if it's still approved to go live at the given
+    time. Does nothing if it has since been published, unscheduled or
+    rescheduled."""
+    log_prefix = "[Publish scheduled revision]"
+    revision = scheduling.get_scheduled_revision(revision_id, go_live_at)
+    if revision is None:
+        logger.info(f"{log_prefix} Revision {revision_id} is no longer scheduled")
+        return
+    if revision.approved_go_live_at > tz_now():
+        # Delivered early, such as by a worker with a fast clock
+        publish_scheduled_revision.apply_async(
+            args=[revision_id, go_live_at], eta=revision.approved_go_live_at
+        )
+        return
+    logger.info(f"{log_prefix} Publishing revision {revision_id}")
+    revision.publish()
+
+
+@app.task
+def expire_scheduled_page(page_id, expire_at):
+    """Unpublish the page, if it's still live and due to expire at the given
+    time. Does nothing if it has since been unpublished or rescheduled."""
+    log_prefix = "[Expire scheduled page]"
+    page = scheduling.get_scheduled_page(page_id, expire_at)
+    if page is None:
+        logger.info(f"{log_prefix} Page {page_id} is no longer due to expire")
+        return
+    if page.expire_at > tz_now():
+        expire_scheduled_page.apply_async(args=[page_id, expire_at], eta=page.expire_at)
+        return
+    logger.info(f"{log_prefix} Unpublishing page {page_id}")
+    page.unpublish(set_expired=True)
+
+
+@app.task
+def reconcile_scheduled_pages():
+    """Publish and expire any pages which are overdue, in case their tasks
+    were lost, and queue tasks for any due within the scheduling horizon.
+    """
+    log_prefix = "[Reconcile scheduled pages]"
+    now = tz_now()
+
+    for revision in list(scheduling.get_revisions_to_publish(now)):
+        logger.warning(f"{log_prefix} Publishing overdue revision {revision.pk}")
+        revision.publish()
+    for page in list(scheduling.get_pages_to_expire(now)):
+        logger.warning(f"{log_prefix} Unpublishing overdue page {page.pk}")
+        page.unpublish(set_expired=True)
+
+    horizon = now + scheduling.SCHEDULING_HORIZON
+    for revision in scheduling.get_revisions_to_publish(horizon):
+        queue_go_live(revision, now)
+    for page in scheduling.get_pages_to_expire(horizon):
+        queue_expiry(page, now)
+
+
 @app.task
 def invalidate_entire_cdn():
     log_prefix = "[Invalidate entire CDN]"
@@ -28,12 +125,64 @@ def invalidate_entire_cdn():
     invalidate_cdn()
 
 
+@app.task
+def invalidate_cdn_paths(paths):
+    log_prefix = "[Invalidate CDN paths]"
+    logger.info(f"{log_prefix} Issuing purge command for CDN keys: {paths}")
+    invalidate_cdn(invalidation_targets=paths)
+
+
+def queue_cdn_invalidation(paths):
+    """Add the given paths to the CDN invalidation buffer, and schedule it to be
+    flushed once the quiet period is over, or straight away if it's full"""
+    try:
+        buffer_is_full = buffer.add_paths(paths)
+    except buffer.BufferLocked:
+        logger.warning("CDN invalidation buffer is locked, so invalidating now")
+        invalidate_cdn_paths.delay(list(paths))
+        return
+    countdown = 0 if buffer_is_full else settings.CDN_INVALIDATION_QUIET_PERIOD
+    flush_cdn_invalidations.apply_async(countdown=countdown)
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def flush_cdn_invalidations(self, force=False):
+    """Send the paths in the CDN invalidation buffer to the CDN, in one
+    invalidation, if it's due to be flushed.
+
+    Each request to the buffer schedules one of these, so one will run once
+    the buffer has been quiet for long enough, and any running before then
+    will do nothing, unless the buffer is full or has been waiting too long.
+    One is also scheduled every minute, so the buffer is flushed even if the
+    one scheduled for its last request was lost.
+
+    If the invalidation fails, such as when CloudFront throttles us, the paths
+    are put back in the buffer and the flush is retried.
+    """
+    log_prefix = "[Flush CDN invalidations]"
+    paths = buffer.take_paths(force=force)
+    if not paths:
+        return
+
+    logger.info(f"{log_prefix} Issuing purge command for CDN keys: {paths}")
+    try:
+        invalidate_cdn(invalidation_targets=paths)
+    except Exception as ex:
+        logger.warning(f"{log_prefix} Couldn't purge CDN keys, so retrying: {ex}")
+        try:
+            buffer.add_paths(paths)
+        except buffer.BufferLocked:
+            logger.error(f"{log_prefix} Couldn't put CDN keys back in buffer: {paths}")
+        raise self.retry(exc=ex, kwargs={"force": True})
+
+
 @app.task
 def selectively_invalidate_cdn():
-    """Purge certain pages which have content isn't suitable for long-term
-    cacheing by the CDN.
+    """Purge the pages whose content has changed because events have moved from
+    being upcoming to being past, if any have.
 
-    Scheduled to run once a day, after midnight (UTC)
+    Scheduled to run once a day, just after midnight (UTC), which is when
+    get_past_event_cutoff() moves on, so is the only time events move.
 
     A good example of this is the Events page, which shows future and past
     events, and what counts as 'future' or 'past' depends on when the page
@@ -42,22 +191,46 @@ def selectively_invalidate_cdn():
 
     log_prefix = "[Selectively invalidate CDN]"
 
-    events_root_path = Events.objects.first().url
-    people_root_path = People.objects.first().url
-    topics_root_path = Topics.objects.first().url
+    # Cached responses which used the cutoff, whether or not any events have
+    # moved past it, see common.response_cache
+    invalidate_tags([EVENT_CUTOFF_TAG])
 
-    selected_targets = [
-        # Start with the main Events page
-        f"{events_root_path}*",
-        # TODO: in the future, it would be good to make these very specific,
-        # by hitting the DB to work out which People and Topic pages reference
-        # Events which have just gone past
-        f"{people_root_path}*",
-        f"{topics_root_path}*",
-    ]
+    selected_targets = get_event_boundary_invalidation_paths(tz_now().date())
+    if not selected_targets:
+        logger.info(f"{log_prefix} No events have become past events today")
+        return
 
     logger.info(
         f"{log_prefix} Issuing purge command for "
         f"selected CDN keys: {selected_targets}"
     )
     invalidate_cdn(invalidation_targets=selected_targets)
+
+
+def _delete_in_batches(queryset):
+    deleted = 0
+    while True:
+        batch = list(queryset.values_list("pk", flat=True)[:RESULT_CLEANUP_BATCH_SIZE])
+        if not batch:
+            return deleted
+        deleted += TaskResult.objects.filter(pk__in=batch).delete()[0]
+
+
+@app.task
+def delete_expired_task_results():
+    """Delete the task results which have outlived their TTL (see
+    taskqueue.celery.RESULT_TTLS), in batches of RESULT_CLEANUP_BATCH_SIZE, each
+    in its own short transaction"""
+    log_prefix = "[Delete expired task results]"
+    now = tz_now()
+
+    deleted = _delete_in_batches(
+        TaskResult.objects.exclude(task_name__in=RESULT_TTLS).filter(
+            date_done__lt=now - RESULT_TTL_DEFAULT
+        )
+    )
+    for task_name, ttl in RESULT_TTLS.items():
+        deleted += _delete_in_batches(
+            TaskResult.objects.filter(task_name=task_name, date_done__lt=now - ttl)
+        )
+    logger.info(f"{log_prefix} Deleted {deleted} expired task results")
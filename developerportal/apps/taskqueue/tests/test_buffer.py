@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .. import buffer
+from ..buffer import CACHE_KEY_LOCK, add_paths, collapse_paths, take_paths
+
+
+class CollapsePathsTestCase(TestCase):
+    def test_collapse_paths(self):
+        cases = [
+            {"input": [], "expected": []},
+            {"input": ["/b/", "/a/", "/b/"], "expected": ["/a/", "/b/"]},
+            {"input": ["/*", "/a/", "/b/*"], "expected": ["/*"]},
+            {
+                "input": ["/posts/*", "/posts/", "/posts/a/", "/topics/a/"],
+                "expected": ["/posts/*", "/topics/a/"],
+            },
+            {
+                "input": ["/posts/a/*", "/posts/*", "/posts-feed/"],
+                "expected": ["/posts-feed/", "/posts/*"],
+            },
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(collapse_paths(case["input"]), case["expected"])
+
+    def test_collapse_paths__cloudfront_limits(self):
+        self.assertEqual(collapse_paths([f"/{i}/" for i in range(3001)]), ["/*"])
+        self.assertEqual(collapse_paths([f"/{i}/*" for i in range(16)]), ["/*"])
+        self.assertEqual(len(collapse_paths([f"/{i}/*" for i in range(15)])), 15)
+
+
+@override_settings(
+    CDN_INVALIDATION_QUIET_PERIOD=30,
+    CDN_INVALIDATION_MAX_PATHS=5,
+    CDN_INVALIDATION_MAX_WAIT=300,
+)
+@mock.patch("developerportal.apps.taskqueue.buffer.time")
+class BufferTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_flushed_after_quiet_period(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.assertFalse(add_paths(["/posts/a/", "/posts/*"]))
+        mock_time.time.return_value = 1020
+        self.assertFalse(add_paths(["/posts/b/", "/sitemap.xml"]))
+
+        mock_time.time.return_value = 1049
+        self.assertEqual(take_paths(), [])
+        mock_time.time.return_value = 1050
+        self.assertEqual(take_paths(), ["/posts/*", "/sitemap.xml"])
+        self.assertEqual(take_paths(), [])
+
+    def test_flushed_after_max_wait(self, mock_time):
+        for now in range(1000, 1300, 20):
+            mock_time.time.return_value = now
+            add_paths(["/posts/a/"])
+            self.assertEqual(take_paths(), [])
+        mock_time.time.return_value = 1300
+        self.assertEqual(take_paths(), ["/posts/a/"])
+
+    def test_flushed_when_full(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.assertFalse(add_paths(["/1/", "/2/", "/3/", "/4/"]))
+        self.assertTrue(add_paths(["/5/"]))
+        self.assertEqual(take_paths(), ["/1/", "/2/", "/3/", "/4/", "/5/"])
+
+    def test_force(self, mock_time):
+        mock_time.time.return_value = 1000
+        add_paths(["/posts/a/"])
+        self.assertEqual(take_paths(force=True), ["/posts/a/"])
+
+    def test_locked(self, mock_time):
+        mock_time.time.return_value = 1000
+        cache.set(CACHE_KEY_LOCK, True)
+        with self.assertRaises(buffer.BufferLocked):
+            add_paths(["/posts/a/"])
+
+    def test_lock_released(self, mock_time):
+        mock_time.time.return_value = 1000
+        add_paths(["/posts/a/"])
+        self.assertIsNone(cache.get(CACHE_KEY_LOCK))
+
+    def test_expired_lock_not_released(self, mock_time):
+        mock_time.time.return_value = 1000
+        with buffer._lock():
+            # Ours expired while we held it, and another worker has taken it
+            cache.set(CACHE_KEY_LOCK, "another-token")
+        self.assertEqual(cache.get(CACHE_KEY_LOCK), "another-token")
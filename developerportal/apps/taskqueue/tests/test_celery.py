@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase
+
+from ...ingestion import tasks as ingestion_tasks
+from .. import tasks
+from ..celery import QUEUE_CDN, QUEUE_INGESTION, QUEUE_PUBLISHING, QUEUES, app
+
+
+class TaskRoutingTestCase(SimpleTestCase):
+    def get_queue(self, task):
+        return app.amqp.router.route({}, task.name)["queue"].name
+
+    def test_tasks_are_routed_to_their_queues(self):
+        self.assertEqual(self.get_queue(tasks.invalidate_cdn_paths), QUEUE_CDN)
+        self.assertEqual(self.get_queue(tasks.flush_cdn_invalidations), QUEUE_CDN)
+        self.assertEqual(
+            self.get_queue(tasks.publish_scheduled_revision), QUEUE_PUBLISHING
+        )
+        self.assertEqual(self.get_queue(ingestion_tasks.ingest_videos), QUEUE_INGESTION)
+
+    def test_every_task_is_routed(self):
+        project_tasks = [
+            name for name in app.tasks if name.startswith("developerportal.")
+        ]
+        self.assertIn(ingestion_tasks.ingest_articles.name, project_tasks)
+        for name in project_tasks:
+            with self.subTest(task=name):
+                self.assertIn(app.conf.task_routes[name]["queue"], QUEUES)
+
+    def test_scheduled_tasks_are_routed(self):
+        for entry in app.conf.beat_schedule.values():
+            with self.subTest(task=entry["task"]):
+                self.assertIn(entry["task"], app.conf.task_routes)
+
+    def test_cdn_invalidation_buffer_is_flushed_every_minute(self):
+        schedules = [
+            entry["schedule"]
+            for entry in app.conf.beat_schedule.values()
+            if entry["task"] == tasks.flush_cdn_invalidations.name
+        ]
+        self.assertEqual(len(schedules), 1)
+        self.assertEqual(schedules[0].minute, set(range(60)))
+
+
+class TaskResultPolicyTestCase(SimpleTestCase):
+    def test_results_are_only_kept_for_tasks_which_opt_in(self):
+        self.assertTrue(tasks.invalidate_entire_cdn.ignore_result)
+        self.assertTrue(tasks.publish_scheduled_revision.ignore_result)
+        self.assertFalse(ingestion_tasks.ingest_articles.ignore_result)
+        self.assertFalse(ingestion_tasks.ingest_videos.ignore_result)
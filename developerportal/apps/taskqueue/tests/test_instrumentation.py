@@ -0,0 +1,130 @@
+import datetime
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import instrumentation
+from ..instrumentation import (
+    MAX_SAMPLES_PER_BUCKET,
+    get_samples,
+    get_summary,
+    percentile,
+    record_sample,
+    stamp_queued_at,
+)
+from ..tasks import invalidate_cdn_paths
+
+TASK_NAME = "developerportal.apps.taskqueue.tasks.invalidate_cdn_paths"
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3, 1, 2], 90), 3)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summary(self):
+        now = time.time()
+        record_sample(TASK_NAME, 1.0, 2.0, 0, "SUCCESS", now=now)
+        record_sample(TASK_NAME, 3.0, 4.0, 1, "SUCCESS", now=now)
+        record_sample(TASK_NAME, None, 6.0, 0, "FAILURE", now=now - 60 * 60)
+        # Outside the window
+        record_sample(TASK_NAME, 100.0, 100.0, 0, "SUCCESS", now=now - 25 * 60 * 60)
+
+        summary = get_summary(TASK_NAME, now=now)
+        self.assertEqual(summary["runs"], 3)
+        self.assertEqual(summary["outcomes"], {"SUCCESS": 2, "FAILURE": 1, "RETRY": 0})
+        self.assertEqual(summary["retried"], 1)
+        self.assertEqual(summary["latency"], [1.0, 3.0, 3.0])
+        self.assertEqual(summary["runtime"], [4.0, 6.0, 6.0])
+        self.assertEqual(summary["max_runtime"], 6.0)
+        self.assertIsNone(summary["last_error"])
+
+    def test_samples_are_capped(self):
+        now = time.time()
+        for _ in range(MAX_SAMPLES_PER_BUCKET + 5):
+            record_sample(TASK_NAME, 1.0, 1.0, 0, "SUCCESS", now=now)
+
+        self.assertEqual(len(get_samples(TASK_NAME, now=now)), MAX_SAMPLES_PER_BUCKET)
+        # Every run is still counted
+        self.assertEqual(
+            get_summary(TASK_NAME, now=now)["runs"], MAX_SAMPLES_PER_BUCKET + 5
+        )
+
+    @mock.patch("developerportal.apps.taskqueue.instrumentation.time")
+    def test_stamp_queued_at(self, mock_time):
+        mock_time.time.return_value = 1000.0
+        headers = {}
+        stamp_queued_at(headers=headers)
+        self.assertEqual(headers, {"queued_at": 1000.0})
+
+    def test_due_at(self):
+        request = mock.Mock(queued_at=1000.0, eta=None)
+        self.assertEqual(instrumentation._get_due_at(request), 1000.0)
+
+        eta = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        request.eta = eta.isoformat()
+        self.assertEqual(instrumentation._get_due_at(request), eta.timestamp())
+
+        request.queued_at = None
+        self.assertIsNone(instrumentation._get_due_at(request))
+
+    @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn")
+    def test_task_runs_are_recorded(self, mock_invalidate_cdn):
+        invalidate_cdn_paths.apply(args=[["/posts/"]])
+        mock_invalidate_cdn.side_effect = ValueError("Oops")
+        invalidate_cdn_paths.apply(args=[["/posts/"]])
+
+        summary = get_summary(TASK_NAME)
+        self.assertEqual(summary["runs"], 2)
+        self.assertEqual(summary["outcomes"]["FAILURE"], 1)
+        # Run directly, so they weren't stamped when queued
+        self.assertEqual(summary["latency"], [None, None, None])
+        self.assertIsNotNone(summary["runtime"][0])
+        self.assertEqual(summary["last_error"]["error"], "ValueError('Oops')")
+
+
+class TaskTimingsViewTestCase(TestCase):
+    def login(self, **kwargs):
+        user = get_user_model().objects.create_user(
+            "admin", "admin@example.com", "password", **kwargs
+        )
+        user.user_permissions.add(Permission.objects.get(codename="access_admin"))
+        self.client.force_login(user)
+        # So that mozilla_django_oidc doesn't send us to reauthenticate
+        session = self.client.session
+        session["oidc_id_token_expiration"] = time.time() + 60
+        session.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_view(self):
+        record_sample(TASK_NAME, 1.5, 2.25, 0, "SUCCESS")
+        self.login(is_superuser=True)
+
+        response = self.client.get("/admin/reports/task-timings/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, TASK_NAME)
+        self.assertContains(response, "developerportal.apps.ingestion.tasks")
+        self.assertContains(response, "2.25")
+
+    def test_view__requires_superuser(self):
+        self.login()
+        response = self.client.get("/admin/reports/task-timings/")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,191 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from wagtail.core.models import Page
+
+from ...articles.models import Article
+from ...events.models import Event, EventTopic
+from ...externalcontent.models import (
+    ExternalArticle,
+    ExternalArticleTopic,
+    ExternalEvent,
+    ExternalEventTopic,
+    ExternalVideo,
+    ExternalVideoTopic,
+)
+from ...home.models import HomePage
+from ...people.models import Person
+from ...topics.models import Topic
+from ...videos.models import Video, Videos, VideoTopic
+from ..invalidation import (
+    ALL_PATHS,
+    get_event_boundary_invalidation_paths,
+    get_invalidation_paths,
+)
+
+ARTICLE_PATH = "/posts/faster-smarter-javascript-debugging-in-firefox/"
+PERSON_PATH = "/communities/people/josh-marinacci/"
+VIDEO_PATH = "/videos/css-video/"
+
+
+class InvalidationPathsTestCase(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        self.article = Article.objects.get(pk=8)
+        self.person = Person.objects.get(pk=11)
+        self.css = Topic.objects.get(title="CSS")
+
+    def _add_video(self):
+        video = Video(title="CSS video", slug="css-video", date="2020-01-01")
+        video.topics.add(VideoTopic(topic=self.css))
+        Videos.objects.get().add_child(instance=video)
+        return video
+
+    def _add_external_page(self, page, topic_model):
+        # Ingested pages are added to the root page, outside any listing
+        page.topics.add(topic_model(topic=self.css))
+        Page.objects.get(slug="root").add_child(instance=page)
+        return page
+
+    def test_article(self):
+        self.assertEqual(
+            get_invalidation_paths(self.article),
+            [
+                "/posts-feed/",
+                "/posts/*",
+                ARTICLE_PATH,
+                "/sitemap.xml",
+                "/topics/css/",
+                "/topics/javascript/",
+            ],
+        )
+
+    def test_article__related_video(self):
+        self._add_video()
+        # The Video lists the Article as a related resource
+        self.assertIn(VIDEO_PATH, get_invalidation_paths(self.article))
+
+    def test_video(self):
+        video = self._add_video()
+        # Listed on the Articles listing, and with related Articles, which that
+        # listing's wildcard covers
+        self.assertEqual(
+            get_invalidation_paths(video),
+            ["/posts-feed/", "/posts/*", "/sitemap.xml", "/topics/css/", VIDEO_PATH],
+        )
+
+    def test_external_article(self):
+        page = self._add_external_page(
+            ExternalArticle(title="External", external_url="https://example.com/"),
+            ExternalArticleTopic,
+        )
+        self.assertEqual(
+            get_invalidation_paths(page), ["/posts/*", "/sitemap.xml", "/topics/css/"]
+        )
+
+    def test_external_video(self):
+        self._add_video()
+        page = self._add_external_page(
+            ExternalVideo(title="External", external_url="https://example.com/"),
+            ExternalVideoTopic,
+        )
+        self.assertEqual(
+            get_invalidation_paths(page),
+            ["/posts/*", "/sitemap.xml", "/topics/css/", VIDEO_PATH],
+        )
+
+    def test_external_event(self):
+        page = self._add_external_page(
+            ExternalEvent(title="External", external_url="https://example.com/"),
+            ExternalEventTopic,
+        )
+        self.assertEqual(
+            get_invalidation_paths(page), ["/events/*", "/sitemap.xml", "/topics/css/"]
+        )
+
+    def test_article_with_author_featured_on_home_page(self):
+        self.article.authors = [("author", self.person)]
+        self.article.save_revision().publish()
+        home_page = HomePage.objects.get()
+        home_page.featured = [("post", self.article)]
+        home_page.save()
+
+        paths = get_invalidation_paths(Page.objects.get(pk=self.article.pk))
+
+        self.assertIn(PERSON_PATH, paths)
+        self.assertIn("/", paths)
+
+    def test_person(self):
+        self.article.authors = [("author", self.person)]
+        self.article.save_revision().publish()
+
+        self.assertEqual(
+            get_invalidation_paths(self.person),
+            ["/communities/people/*", PERSON_PATH, ARTICLE_PATH, "/sitemap.xml"],
+        )
+
+    def test_pages_shown_on_every_page_invalidate_everything(self):
+        for title in ["Home", "Posts", "Events", "CSS", "People"]:
+            with self.subTest(title=title):
+                page = Page.objects.get(title=title)
+                self.assertEqual(get_invalidation_paths(page), ALL_PATHS)
+
+    def test_dry_run_command(self):
+        out = StringIO()
+        call_command("plan_cdn_invalidation", str(self.person.pk), stdout=out)
+        self.assertEqual(
+            out.getvalue(),
+            "Josh Marinacci (11):\n"
+            "  /communities/people/*\n"
+            f"  {PERSON_PATH}\n"
+            "  /sitemap.xml\n",
+        )
+
+    def test_dry_run_command__missing_page(self):
+        with self.assertRaises(CommandError):
+            call_command("plan_cdn_invalidation", "999", stdout=StringIO())
+
+
+class EventBoundaryInvalidationPathsTestCase(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        self.event = Event(
+            title="Conference",
+            slug="conference",
+            start_date=datetime.date(2020, 6, 10),
+            speakers=[("speaker", Person.objects.get(pk=11))],
+        )
+        self.event.topics.add(EventTopic(topic=Topic.objects.get(title="CSS")))
+        Page.objects.get(title="Events").add_child(instance=self.event)
+
+    def test_get_event_boundary_invalidation_paths(self):
+        expected = [
+            "/communities/people/josh-marinacci/",
+            "/events/*",
+            "/events/conference/",
+            "/topics/css/",
+        ]
+        cases = [
+            {"date": datetime.date(2020, 6, 10), "expected": []},
+            {"date": datetime.date(2020, 6, 11), "expected": expected},
+            {"date": datetime.date(2020, 6, 12), "expected": expected},
+            {"date": datetime.date(2020, 6, 13), "expected": []},
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(
+                    get_event_boundary_invalidation_paths(case["date"]),
+                    case["expected"],
+                )
+
+    def test_get_event_boundary_invalidation_paths__not_live(self):
+        self.event.unpublish()
+        self.assertEqual(
+            get_event_boundary_invalidation_paths(datetime.date(2020, 6, 11)), []
+        )
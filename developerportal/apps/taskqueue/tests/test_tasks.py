@@ -1,8 +1,29 @@
+import datetime
 from unittest import mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.timezone import now as tz_now
+from django.utils.timezone import utc
 
-from ..tasks import invalidate_entire_cdn, selectively_invalidate_cdn
+from celery.exceptions import Retry
+from django_celery_results.models import TaskResult
+from wagtail.core.models import Page, PageRevision
+
+from ...articles.models import Article
+from ...events.models import Event
+from ..buffer import CACHE_KEY_LOCK, add_paths, get_buffered_paths
+from ..tasks import (
+    delete_expired_task_results,
+    expire_scheduled_page,
+    flush_cdn_invalidations,
+    invalidate_entire_cdn,
+    publish_scheduled_revision,
+    queue_cdn_invalidation,
+    queue_go_live,
+    reconcile_scheduled_pages,
+    selectively_invalidate_cdn,
+)
 
 
 class TasksTestCase(TestCase):
@@ -15,11 +36,257 @@ class TasksTestCase(TestCase):
         invalidate_entire_cdn()
         mock_invalidate_cdn.assert_called_once_with()
 
+    @mock.patch("developerportal.apps.taskqueue.tasks.tz_now")
     @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn")
-    def test_selectively_invalidate_cdn(self, mock_invalidate_cdn):
+    def test_selectively_invalidate_cdn(self, mock_invalidate_cdn, mock_tz_now):
+        Page.objects.get(title="Events").add_child(
+            instance=Event(
+                title="Conference",
+                slug="conference",
+                start_date=datetime.date(2020, 6, 10),
+            )
+        )
 
+        mock_tz_now.return_value = datetime.datetime(2020, 6, 10, 0, 1, tzinfo=utc)
+        selectively_invalidate_cdn()
         assert not mock_invalidate_cdn.called
+
+        mock_tz_now.return_value = datetime.datetime(2020, 6, 11, 0, 1, tzinfo=utc)
         selectively_invalidate_cdn()
         mock_invalidate_cdn.assert_called_once_with(
-            invalidation_targets=["/events/*", "/communities/people/*", "/topics/*"]
+            invalidation_targets=["/events/*", "/events/conference/"]
+        )
+
+
+@override_settings(CDN_INVALIDATION_QUIET_PERIOD=30, CDN_INVALIDATION_MAX_PATHS=3)
+class CDNInvalidationBufferTasksTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    @mock.patch("developerportal.apps.taskqueue.tasks.flush_cdn_invalidations")
+    def test_queue_cdn_invalidation(self, mock_flush_cdn_invalidations):
+        queue_cdn_invalidation(["/posts/a/", "/posts/*"])
+        queue_cdn_invalidation(["/topics/a/"])
+
+        self.assertEqual(get_buffered_paths(), ["/posts/*", "/topics/a/"])
+        self.assertEqual(
+            mock_flush_cdn_invalidations.apply_async.call_args_list,
+            [mock.call(countdown=30), mock.call(countdown=30)],
+        )
+
+        mock_flush_cdn_invalidations.reset_mock()
+        queue_cdn_invalidation(["/topics/b/"])
+        mock_flush_cdn_invalidations.apply_async.assert_called_once_with(countdown=0)
+
+    @mock.patch("developerportal.apps.taskqueue.buffer.LOCK_ATTEMPTS", 1)
+    @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn_paths")
+    def test_queue_cdn_invalidation__buffer_locked(self, mock_invalidate_cdn_paths):
+        cache.set(CACHE_KEY_LOCK, True)
+        queue_cdn_invalidation(["/posts/a/"])
+        mock_invalidate_cdn_paths.delay.assert_called_once_with(["/posts/a/"])
+
+    @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn")
+    def test_flush_cdn_invalidations(self, mock_invalidate_cdn):
+        add_paths(["/posts/a/", "/posts/b/"])
+
+        flush_cdn_invalidations()
+        assert not mock_invalidate_cdn.called
+
+        flush_cdn_invalidations(force=True)
+        mock_invalidate_cdn.assert_called_once_with(
+            invalidation_targets=["/posts/a/", "/posts/b/"]
+        )
+        self.assertEqual(get_buffered_paths(), [])
+
+        mock_invalidate_cdn.reset_mock()
+        flush_cdn_invalidations(force=True)
+        assert not mock_invalidate_cdn.called
+
+    @mock.patch.object(flush_cdn_invalidations, "retry")
+    @mock.patch("developerportal.apps.taskqueue.tasks.invalidate_cdn")
+    def test_flush_cdn_invalidations__failed(self, mock_invalidate_cdn, mock_retry):
+        error = Exception("Rate exceeded")
+        mock_invalidate_cdn.side_effect = error
+        mock_retry.return_value = Retry()
+        add_paths(["/posts/a/", "/posts/b/"])
+
+        with self.assertRaises(Retry):
+            flush_cdn_invalidations(force=True)
+        mock_retry.assert_called_once_with(exc=error, kwargs={"force": True})
+        # Put back, so the retry sends them
+        self.assertEqual(get_buffered_paths(), ["/posts/a/", "/posts/b/"])
+
+        mock_invalidate_cdn.side_effect = None
+        flush_cdn_invalidations(force=True)
+        mock_invalidate_cdn.assert_called_with(
+            invalidation_targets=["/posts/a/", "/posts/b/"]
+        )
+        self.assertEqual(get_buffered_paths(), [])
+
+
+@mock.patch.object(expire_scheduled_page, "apply_async")
+@mock.patch.object(publish_scheduled_revision, "apply_async")
+class ScheduledPublishingTasksTestCase(TestCase):
+    fixtures = ["common.json"]
+
+    def setUp(self):
+        cache.clear()
+        # Go-live and expiry times are stored in revisions to the millisecond
+        self.now = tz_now().replace(microsecond=0)
+        # Wagtail checks the time itself when publishing, so both are moved on
+        self.mock_now = mock.Mock(return_value=self.now)
+        for target in (
+            "django.utils.timezone.now",
+            "developerportal.apps.taskqueue.tasks.tz_now",
+        ):
+            patcher = mock.patch(target, self.mock_now)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # So the page has a live revision, which stays live until the
+        # scheduled one goes live
+        Article.objects.get(pk=8).save_revision().publish()
+
+    def tearDown(self):
+        cache.clear()
+
+    def schedule_revision(self, go_live_at, title="A scheduled title"):
+        article = Article.objects.get(pk=8)
+        article.title = title
+        article.go_live_at = go_live_at
+        revision = article.save_revision()
+        revision.publish()
+        revision.refresh_from_db()
+        return revision
+
+    def test_queue_go_live(self, mock_publish_async, mock_expire_async):
+        go_live_at = self.now + datetime.timedelta(minutes=10)
+        revision = self.schedule_revision(go_live_at)
+        mock_publish_async.assert_called_once_with(
+            args=[revision.pk, go_live_at.isoformat()], eta=go_live_at
+        )
+
+        # It's only queued once
+        mock_publish_async.reset_mock()
+        queue_go_live(revision)
+        assert not mock_publish_async.called
+
+    def test_queue_go_live__beyond_horizon(self, mock_publish_async, mock_expire_async):
+        self.schedule_revision(self.now + datetime.timedelta(days=1))
+        assert not mock_publish_async.called
+
+    def test_publish_scheduled_revision(self, mock_publish_async, mock_expire_async):
+        go_live_at = self.now + datetime.timedelta(minutes=10)
+        revision = self.schedule_revision(go_live_at)
+        mock_publish_async.reset_mock()
+
+        # Delivered early, so queued again
+        publish_scheduled_revision(revision.pk, go_live_at.isoformat())
+        mock_publish_async.assert_called_once_with(
+            args=[revision.pk, go_live_at.isoformat()], eta=go_live_at
+        )
+        self.assertNotEqual(Article.objects.get(pk=8).title, "A scheduled title")
+
+        self.mock_now.return_value = go_live_at
+        publish_scheduled_revision(revision.pk, go_live_at.isoformat())
+        article = Article.objects.get(pk=8)
+        self.assertEqual(article.title, "A scheduled title")
+        self.assertEqual(article.live_revision_id, revision.pk)
+
+        # Running it again does nothing
+        with mock.patch.object(PageRevision, "publish") as mock_publish:
+            publish_scheduled_revision(revision.pk, go_live_at.isoformat())
+        assert not mock_publish.called
+
+    def test_publish_scheduled_revision__rescheduled(
+        self, mock_publish_async, mock_expire_async
+    ):
+        go_live_at = self.now + datetime.timedelta(minutes=10)
+        revision = self.schedule_revision(go_live_at)
+        self.schedule_revision(go_live_at + datetime.timedelta(hours=1))
+
+        with mock.patch.object(PageRevision, "publish") as mock_publish:
+            publish_scheduled_revision(revision.pk, go_live_at.isoformat())
+        assert not mock_publish.called
+
+    def test_expire_scheduled_page(self, mock_publish_async, mock_expire_async):
+        expire_at = self.now + datetime.timedelta(minutes=5)
+        article = Article.objects.get(pk=8)
+        article.expire_at = expire_at
+        article.save_revision().publish()
+        mock_expire_async.assert_called_once_with(
+            args=[8, expire_at.isoformat()], eta=expire_at
+        )
+
+        # Rescheduled since
+        expire_scheduled_page(8, self.now.isoformat())
+        self.assertTrue(Page.objects.get(pk=8).live)
+
+        self.mock_now.return_value = expire_at
+        expire_scheduled_page(8, expire_at.isoformat())
+        page = Page.objects.get(pk=8)
+        self.assertFalse(page.live)
+        self.assertTrue(page.expired)
+
+    def test_reconcile_scheduled_pages(self, mock_publish_async, mock_expire_async):
+        overdue_revision = self.schedule_revision(
+            self.now + datetime.timedelta(minutes=5)
+        )
+        upcoming_expire_at = self.now + datetime.timedelta(minutes=20)
+        Page.objects.filter(pk=32).update(expire_at=upcoming_expire_at)
+        mock_publish_async.reset_mock()
+
+        self.mock_now.return_value = self.now + datetime.timedelta(minutes=10)
+        reconcile_scheduled_pages()
+
+        # The overdue revision was published...
+        self.assertEqual(
+            Article.objects.get(pk=8).live_revision_id, overdue_revision.pk
+        )
+        # ...and the upcoming expiry queued
+        assert not mock_publish_async.called
+        mock_expire_async.assert_called_once_with(
+            args=[32, upcoming_expire_at.isoformat()], eta=upcoming_expire_at
+        )
+
+        Page.objects.filter(pk=32).update(expire_at=self.now)
+        reconcile_scheduled_pages()
+        self.assertTrue(Page.objects.get(pk=32).expired)
+
+
+class TaskResultCleanupTestCase(TestCase):
+    def create_result(self, task_name, age):
+        result = TaskResult.objects.create(
+            task_id=f"{task_name}-{age.days}", task_name=task_name, status="SUCCESS"
+        )
+        TaskResult.objects.filter(pk=result.pk).update(date_done=tz_now() - age)
+
+    @mock.patch("developerportal.apps.taskqueue.tasks.RESULT_CLEANUP_BATCH_SIZE", 2)
+    def test_delete_expired_task_results(self):
+        ingest_articles = "developerportal.apps.ingestion.tasks.ingest_articles"
+        for days in (0, 2, 3, 4, 13, 15):
+            self.create_result(ingest_articles, datetime.timedelta(days=days))
+            self.create_result("other", datetime.timedelta(days=days))
+        self.create_result(None, datetime.timedelta(days=2))
+
+        with mock.patch.object(
+            TaskResult.objects, "filter", wraps=TaskResult.objects.filter
+        ) as mock_filter:
+            delete_expired_task_results()
+
+        self.assertEqual(
+            sorted(TaskResult.objects.values_list("task_id", flat=True)),
+            [
+                f"{ingest_articles}-0",
+                f"{ingest_articles}-13",
+                f"{ingest_articles}-2",
+                f"{ingest_articles}-3",
+                f"{ingest_articles}-4",
+                "other-0",
+            ],
         )
+        # Deleted two at a time
+        deletions = [call for call in mock_filter.call_args_list if "pk__in" in call[1]]
+        self.assertEqual(len(deletions), 4)
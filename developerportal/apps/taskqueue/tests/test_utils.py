@@ -3,12 +3,14 @@ from unittest import mock
 
 from django.test import TestCase, override_settings
 
-from developerportal.apps.taskqueue.utils import invalidate_cdn
+from developerportal.apps.taskqueue.utils import get_cloudfront_client, invalidate_cdn
 
 
 @override_settings(AWS_CLOUDFRONT_DISTRIBUTION_ID="testdistribution")
 class CDNInvalidationTests(TestCase):
     def setUp(self):
+        get_cloudfront_client.cache_clear()
+        self.addCleanup(get_cloudfront_client.cache_clear)
         self.mock_bucket = mock.Mock("fake-bucket")
         self.mock_cloudfront_client = mock.Mock(name="cloudfront_client")
 
@@ -151,3 +153,16 @@ class CDNInvalidationTests(TestCase):
                 ).format(_mock_response_content),
             ],
         )
+
+    @mock.patch("developerportal.apps.taskqueue.utils.set_up_boto3")
+    @mock.patch("developerportal.apps.taskqueue.utils.boto3.client")
+    def test_invalidate_cdn__reuses_client(self, mock_client, mock_set_up_boto3):
+        mock_client.return_value = self.mock_cloudfront_client
+        self.mock_cloudfront_client.create_invalidation.return_value = {}
+
+        invalidate_cdn(invalidation_targets=["/foo/"])
+        invalidate_cdn(invalidation_targets=["/bar/"])
+
+        mock_set_up_boto3.assert_called_once_with()
+        mock_client.assert_called_once_with("cloudfront")
+        self.assertEqual(self.mock_cloudfront_client.create_invalidation.call_count, 2)
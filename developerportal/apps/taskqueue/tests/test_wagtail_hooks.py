@@ -1,21 +1,62 @@
+import datetime
 from unittest import mock
 
 from django.test import TestCase
+from django.utils.timezone import now as tz_now
 
 from wagtail.core.models import Page
 from wagtail.core.signals import page_published, page_unpublished
 
+from ...articles.models import Article
+
 
 class SignalsTestCase(TestCase):
-    @mock.patch(
-        "developerportal.apps.taskqueue.wagtail_hooks.invalidate_entire_cdn.delay"
-    )
-    def test_cdn_invalidation_signal_handler(self, mock_invalidate_entire_cdn__delay):
+    fixtures = ["common.json"]
 
+    @mock.patch("developerportal.apps.taskqueue.wagtail_hooks.queue_cdn_invalidation")
+    def test_cdn_invalidation_signal_handler(self, mock_queue_cdn_invalidation):
+        article = Article.objects.get(pk=8)
         cases = [{"signal": page_published}, {"signal": page_unpublished}]
 
         for case in cases:
-            mock_invalidate_entire_cdn__delay.reset_mock()
+            mock_queue_cdn_invalidation.reset_mock()
             with self.subTest(case=case):
-                case["signal"].send(sender=Page, instance=None)
-                mock_invalidate_entire_cdn__delay.assert_called_once_with()
+                case["signal"].send(sender=Article, instance=article)
+                mock_queue_cdn_invalidation.assert_called_once()
+                paths = mock_queue_cdn_invalidation.call_args[0][0]
+                self.assertIn(article.url, paths)
+                self.assertNotIn("/*", paths)
+
+    @mock.patch("developerportal.apps.taskqueue.wagtail_hooks.queue_cdn_invalidation")
+    def test_cdn_invalidation_signal_handler__no_page(
+        self, mock_queue_cdn_invalidation
+    ):
+        page_published.send(sender=Page, instance=None)
+        mock_queue_cdn_invalidation.assert_called_once_with(["/*"])
+
+    @mock.patch("developerportal.apps.taskqueue.wagtail_hooks.queue_go_live")
+    @mock.patch("developerportal.apps.taskqueue.wagtail_hooks.queue_cdn_invalidation")
+    def test_scheduling_a_revision_queues_its_go_live(
+        self, mock_queue_cdn_invalidation, mock_queue_go_live
+    ):
+        article = Article.objects.get(pk=8)
+        article.save_revision()
+        assert not mock_queue_go_live.called
+
+        article.go_live_at = tz_now() + datetime.timedelta(minutes=10)
+        revision = article.save_revision()
+        revision.publish()
+        mock_queue_go_live.assert_called_once_with(revision)
+
+    @mock.patch("developerportal.apps.taskqueue.wagtail_hooks.queue_expiry")
+    @mock.patch("developerportal.apps.taskqueue.wagtail_hooks.queue_cdn_invalidation")
+    def test_publishing_a_page_with_an_expiry_queues_it(
+        self, mock_queue_cdn_invalidation, mock_queue_expiry
+    ):
+        article = Article.objects.get(pk=8)
+        article.save_revision().publish()
+        assert not mock_queue_expiry.called
+
+        article.expire_at = tz_now() + datetime.timedelta(minutes=10)
+        article.save_revision().publish()
+        self.assertEqual(mock_queue_expiry.call_args[0][0].pk, 8)
@@ -1,5 +1,6 @@
 import logging
 import os
+from functools import lru_cache
 from http import HTTPStatus
 
 from django.conf import settings
@@ -29,9 +30,15 @@ def set_up_boto3():
     boto3.setup_default_session(**session_kwargs)
 
 
-def invalidate_cdn(invalidation_targets=None):
-
+@lru_cache(maxsize=None)
+def get_cloudfront_client():
+    """Return a CloudFront client, created once per process, as creating a
+    session and client for each invalidation is slow"""
     set_up_boto3()
+    return boto3.client("cloudfront")
+
+
+def invalidate_cdn(invalidation_targets=None):
 
     distribution_id = settings.AWS_CLOUDFRONT_DISTRIBUTION_ID
 
@@ -43,7 +50,7 @@ def invalidate_cdn(invalidation_targets=None):
         if invalidation_targets is None:
             invalidation_targets = ["/*"]  # this wildcard should catch everything
 
-        client = boto3.client("cloudfront")
+        client = get_cloudfront_client()
 
         # Make a unique string so that this call to invalidate is not ignored
         caller_reference = tz_now().isoformat()
@@ -0,0 +1,24 @@
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import render
+
+from .celery import app
+from .instrumentation import PERCENTILES, WINDOW_HOURS, get_summary
+
+
+def task_timings(request):
+    """Report how long each of our Celery tasks has waited in its queue and
+    taken to run, and how they've turned out, over the last WINDOW_HOURS"""
+    if not request.user.is_superuser:
+        raise PermissionDenied
+    task_names = sorted(
+        name for name in app.tasks if name.startswith("developerportal.")
+    )
+    return render(
+        request,
+        "taskqueue/task_timings.html",
+        {
+            "summaries": [get_summary(name) for name in task_names],
+            "percentiles": PERCENTILES,
+            "window_hours": WINDOW_HOURS,
+        },
+    )
@@ -1,14 +1,52 @@
+from django.conf.urls import url
+from django.db.models.signals import post_save
+from django.urls import reverse
+
+from wagtail.admin.menu import AdminOnlyMenuItem
+from wagtail.core import hooks
+from wagtail.core.models import PageRevision
 from wagtail.core.signals import page_published, page_unpublished
 
-from .tasks import invalidate_entire_cdn
+from .invalidation import ALL_PATHS, get_invalidation_paths
+from .tasks import queue_cdn_invalidation, queue_expiry, queue_go_live
+from .views import task_timings
 
 
 def purge_cdn_on_publish(signal, **kwargs):
-    # TODO: refine this to be more selective and only invalidate the
-    # keys we know we need to. At the moment we're erring on the side
-    # of caution.
-    invalidate_entire_cdn.delay()
+    instance = kwargs.get("instance")
+    # The paths are worked out now, while the page and the pages it relates
+    # to are as they were when it was published
+    paths = ALL_PATHS if instance is None else get_invalidation_paths(instance)
+    queue_cdn_invalidation(paths)
 
 
 page_published.connect(purge_cdn_on_publish)
 page_unpublished.connect(purge_cdn_on_publish)
+
+
+def schedule_go_live(sender, instance, **kwargs):
+    # Wagtail saves a revision with its approved_go_live_at set when it's
+    # published with a go-live time in the future
+    if instance.approved_go_live_at is not None:
+        queue_go_live(instance)
+
+
+def schedule_expiry(sender, instance, **kwargs):
+    if instance is not None and instance.expire_at is not None:
+        queue_expiry(instance)
+
+
+post_save.connect(schedule_go_live, sender=PageRevision)
+page_published.connect(schedule_expiry)
+
+
+@hooks.register("register_admin_urls")
+def register_task_timings_url():
+    return [url(r"^reports/task-timings/$", task_timings, name="task_timings")]
+
+
+@hooks.register("register_reports_menu_item")
+def register_task_timings_menu_item():
+    return AdminOnlyMenuItem(
+        "Task timings", reverse("task_timings"), classnames="icon icon-time"
+    )
@@ -27,6 +27,7 @@ from wagtail.core.models import Orderable
 from wagtail.images.edit_handlers import ImageChooserPanel
 
 from ..common.blocks import FeaturedExternalBlock
+from ..common.cache_policy import SHORT_LIVED_POLICY
 from ..common.constants import COLOR_CHOICES, COLOR_VALUES, RICH_TEXT_FEATURES_SIMPLE
 from ..common.models import BasePage
 from ..common.utils import (
@@ -34,6 +35,9 @@ from ..common.utils import (
     get_combined_events,
     get_combined_videos,
     get_past_event_cutoff,
+    get_resource_cards,
+    prefetch_card_images,
+    use_resource_cards,
 )
 from ..common.validators import check_for_svg_file
 
@@ -69,6 +73,8 @@ class Topic(BasePage):
     parent_page_types = ["Topics"]
     subpage_types = ["Topic", "content.ContentPage"]
     template = "topic.html"
+    # Lists upcoming events
+    cache_policy = SHORT_LIVED_POLICY
 
     # Content fields
     description = RichTextField(
@@ -264,14 +270,28 @@ class Topic(BasePage):
 
     @property
     def articles(self):
-        return get_combined_articles(self, topics__topic__pk=self.pk)
+        if use_resource_cards():
+            return get_resource_cards(self, ["article"], topic_pks=[self.pk])
+        return prefetch_card_images(
+            get_combined_articles(self, topics__topic__pk=self.pk)
+        )
 
     @property
     def events(self):
         """Return upcoming events for this topic,
         ignoring events in the past, ordered by start date"""
-        return get_combined_events(
-            self, topics__topic__pk=self.pk, start_date__gte=get_past_event_cutoff()
+        if use_resource_cards():
+            return get_resource_cards(
+                self,
+                ["event"],
+                topic_pks=[self.pk],
+                date__gte=get_past_event_cutoff(),
+                reverse=False,
+            )
+        return prefetch_card_images(
+            get_combined_events(
+                self, topics__topic__pk=self.pk, start_date__gte=get_past_event_cutoff()
+            )
         )
 
     @property
@@ -282,7 +302,11 @@ class Topic(BasePage):
     @property
     def videos(self):
         """Return the latest videos and external videos for this topic. """
-        return get_combined_videos(self, topics__topic__pk=self.pk)
+        if use_resource_cards():
+            return get_resource_cards(self, ["video"], topic_pks=[self.pk])
+        return prefetch_card_images(
+            get_combined_videos(self, topics__topic__pk=self.pk)
+        )
 
     @property
     def color_value(self):
@@ -30,9 +30,14 @@ from wagtail.embeds.blocks import EmbedBlock
 from wagtail.images.edit_handlers import ImageChooserPanel
 
 from ..common.blocks import ExternalLinkBlock
+from ..common.cache_policy import LONG_LIVED_POLICY
 from ..common.constants import RICH_TEXT_FEATURES, RICH_TEXT_FEATURES_SIMPLE, VIDEO_TYPE
 from ..common.models import BasePage
-from ..common.utils import get_combined_articles_and_videos
+from ..common.utils import (
+    get_combined_articles_and_videos,
+    get_resource_cards,
+    use_resource_cards,
+)
 
 
 class VideosTag(TaggedItemBase):
@@ -114,6 +119,7 @@ class Video(BasePage):
     parent_page_types = ["Videos"]
     subpage_types = []
     template = "video.html"
+    cache_policy = LONG_LIVED_POLICY
 
     # Content fields
     description = RichTextField(
@@ -296,6 +302,8 @@ class Video(BasePage):
         """Returns resources that are related to the current resource, i.e. live,
         public articles and videos which have the same topics."""
         topic_pks = [topic.topic.pk for topic in self.topics.all()]
+        if use_resource_cards():
+            return get_resource_cards(self, ["article", "video"], topic_pks=topic_pks)
         return get_combined_articles_and_videos(self, topics__topic__pk__in=topic_pks)
 
     def has_speaker(self, person):
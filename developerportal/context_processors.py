@@ -20,19 +20,13 @@ def mapbox_access_token(request):
 
 
 def directory_pages(request):
-    from .apps.articles.models import Articles
-    from .apps.events.models import Events
-    from .apps.people.models import People
-    from .apps.topics.models import Topics
+    """The ids, URLs and titles of the Articles, Events, People and Topics
+    pages, from the cached registry in common.directory"""
+    from .apps.common.directory import get_directory_pages
+    from .apps.common.response_cache import DIRECTORY_TAG, record_tags
 
-    return {
-        "directory_pages": {
-            "articles": Articles.published_objects.first(),
-            "events": Events.published_objects.first(),
-            "people": People.published_objects.first(),
-            "topics": Topics.published_objects.first(),
-        }
-    }
+    record_tags(DIRECTORY_TAG)
+    return {"directory_pages": get_directory_pages()}
 
 
 def topics_title(request):
@@ -61,7 +55,12 @@ def topics_title(request):
 def pagination_constants(request):
     from developerportal.apps.common import constants
 
-    return {"PAGINATION_QUERYSTRING_KEY": constants.PAGINATION_QUERYSTRING_KEY}
+    return {
+        "PAGINATION_QUERYSTRING_KEY": constants.PAGINATION_QUERYSTRING_KEY,
+        "PAGINATION_CURSOR_QUERYSTRING_KEY": (
+            constants.PAGINATION_CURSOR_QUERYSTRING_KEY
+        ),
+    }
 
 
 def filtering_constants(request):
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.1/ref/settings/
 """
 
+import json
 import logging
 import os
 from decimal import Decimal
@@ -78,16 +79,23 @@ INSTALLED_APPS = [
 # if Sentry is enabled -- see later in this file
 
 MIDDLEWARE = [
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Outermost, so it sees every query run for the request
+    "developerportal.apps.common.middleware.SQLBudgetMiddleware",
+    # Outside everything which sets cookies or Vary headers, so it can remove
+    # them from responses to public requests
+    "developerportal.apps.common.middleware.PublicRequestMiddleware",
+    "developerportal.apps.common.middleware.PublicSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
+    "developerportal.apps.common.middleware.PublicCsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     # In case someone has their Auth0 revoked while logged in, revalidate it:
-    "mozilla_django_oidc.middleware.SessionRefresh",
+    "developerportal.apps.common.middleware.PublicSessionRefresh",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # After WhiteNoise, so requests for static files don't reach it
+    "developerportal.apps.common.middleware.ResponseCacheMiddleware",
     "wagtail.contrib.redirects.middleware.RedirectMiddleware",
 ]
 
@@ -271,6 +279,13 @@ MEDIA_ROOT = None
 S3_BUCKET = os.environ.get("S3_BUCKET")
 AWS_CLOUDFRONT_DISTRIBUTION_ID = os.environ.get("AWS_CLOUDFRONT_DISTRIBUTION_ID")
 
+# CDN invalidations are buffered, and sent once no more have been requested for
+# the quiet period (in seconds), or once the buffer holds the maximum number of
+# paths, or has been waiting for the maximum wait - see taskqueue.buffer
+CDN_INVALIDATION_QUIET_PERIOD = int(os.environ.get("CDN_INVALIDATION_QUIET_PERIOD", 30))
+CDN_INVALIDATION_MAX_PATHS = int(os.environ.get("CDN_INVALIDATION_MAX_PATHS", 100))
+CDN_INVALIDATION_MAX_WAIT = int(os.environ.get("CDN_INVALIDATION_MAX_WAIT", 60 * 5))
+
 LOGIN_ERROR_URL = "/admin/"
 LOGIN_REDIRECT_URL = "/admin/"
 LOGOUT_REDIRECT_URL = "/admin/"
@@ -344,6 +359,51 @@ USE_CONVENTIONAL_AUTH = False
 AUTOMATICALLY_INGEST_CONTENT = (
     os.environ.get("AUTOMATICALLY_INGEST_CONTENT", "False") == "True"
 )
+# Whether or not to serve resource listings from the denormalised ResourceCard
+# table. Run `manage.py rebuild_resource_cards` before enabling this.
+RESOURCE_CARD_LISTINGS = os.environ.get("RESOURCE_CARD_LISTINGS", "False") == "True"
+# Whether or not the Articles and Events listings paginate by (date, page id)
+# cursor rather than by page number. `?page=N` URLs are redirected to a cursor.
+KEYSET_PAGINATION = os.environ.get("KEYSET_PAGINATION", "False") == "True"
+
+# Per-request SQL query instrumentation - see common.middleware.SQLBudgetMiddleware
+SQL_INSTRUMENTATION = os.environ.get("SQL_INSTRUMENTATION", "False") == "True"
+SQL_INSTRUMENTATION_SERVER_TIMING = (
+    os.environ.get("SQL_INSTRUMENTATION_SERVER_TIMING", "False") == "True"
+)
+# The most queries a request should need, keyed by the "app_label.ModelName" of
+# the Wagtail page type served, or "default" for all other requests. Listing pages
+# are kept tight because that's where N+1 regressions show up first.
+SQL_QUERY_BUDGETS = {
+    "default": int(os.environ.get("SQL_QUERY_BUDGET_DEFAULT", 60)),
+    "articles.Articles": 50,
+    "events.Events": 40,
+    "people.People": 40,
+    "topics.Topic": 40,
+    "videos.Videos": 40,
+}
+
+# Whether or not to cache whole responses to anonymous requests for Wagtail pages,
+# invalidated by the pages they depend on - see common.response_cache
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "False") == "True"
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 60 * 60))
+
+# Whether or not to give Wagtail pages ETag and Last-Modified headers for
+# anonymous requests, and answer conditional requests for them without
+# rendering them if they haven't changed - see common.conditional_get
+CONDITIONAL_GET = os.environ.get("CONDITIONAL_GET", "False") == "True"
+
+# Whether or not to skip the session, CSRF and OIDC refresh middleware for
+# anonymous GET requests for public pages, and remove any cookies and Vary: Cookie
+# from their responses so the CDN can cache them - see
+# common.middleware.PublicRequestMiddleware
+PUBLIC_FAST_PATH = os.environ.get("PUBLIC_FAST_PATH", "False") == "True"
+
+# Overrides for the Cache-Control policies of page types, as JSON, keyed by the
+# "app_label.ModelName" of the page type, eg {"events.Events": {"s_maxage": 300}}
+# - see common.cache_policy
+CACHE_CONTROL_POLICIES = json.loads(os.environ.get("CACHE_CONTROL_POLICIES", "{}"))
+
 # Whether or not to email admins for each item of content automatically ingested
 NOTIFY_AFTER_INGESTING_CONTENT = (
     os.environ.get("NOTIFY_AFTER_INGESTING_CONTENT", "True") == "True"
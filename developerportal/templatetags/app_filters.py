@@ -8,6 +8,8 @@ import pygments
 from pygments import formatters, lexers
 from wagtail.core.models import Page
 
+from developerportal.apps.common.utils import prefetch_featured_images
+
 register = template.Library()
 
 
@@ -47,6 +49,15 @@ def published(items):
     )
 
 
+@register.filter(name="prefetch_images")
+def prefetch_images(items):
+    """Fetches the images shown on the cards for featured StreamField items in
+    bulk, rather than one by one as each card is rendered"""
+    if not items:
+        return items
+    return prefetch_featured_images(items)
+
+
 @register.filter(name="syntax_highlight", is_safe=True)
 def syntax_highlight(value, language):
     """Adds pygments syntax highlighting to a given code input"""
@@ -9,6 +9,7 @@ from django.conf import settings
 from django.contrib.staticfiles.templatetags.staticfiles import static
 from django.utils.safestring import mark_safe
 
+from developerportal.apps.common import menu
 from developerportal.apps.common.constants import (
     COUNTRY_QUERYSTRING_KEY,
     DATE_PARAMS_QUERYSTRING_KEY,
@@ -18,6 +19,7 @@ from developerportal.apps.common.constants import (
     ROLE_QUERYSTRING_KEY,
     TOPIC_QUERYSTRING_KEY,
 )
+from developerportal.apps.common.response_cache import MENU_TAG, record_tags
 
 register = template.Library()
 
@@ -179,6 +181,14 @@ def get_menu_item_icon(page):
     return icon_url
 
 
+@register.simple_tag
+def get_menu_items(site):
+    """Returns the navigation menu for the given Site, as built by
+    developerportal.apps.common.menu"""
+    record_tags(MENU_TAG)
+    return menu.get_menu(site)
+
+
 @register.simple_tag
 def split_featured_items(iterable):
     """For the given `iterable`, return it split into two lists appropriate
@@ -11,10 +11,13 @@ from wagtail.core import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
 from .apps.common.feed import RssFeeds
+from .apps.common.views import set_page_position
 
 urlpatterns = [
     url("", include("developerportal.apps.health.urls")),
     url(r"^django-admin/", admin.site.urls),
+    # Replaces Wagtail's own view, so must come before its admin URLs
+    url(r"^admin/pages/(\d+)/set_position/$", set_page_position),
     url(r"^admin/", include(wagtailadmin_urls)),
     url(r"^documents/", include(wagtaildocs_urls)),
     url(r"^sitemap\.xml$", sitemap),